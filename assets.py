@@ -0,0 +1,154 @@
+"""
+Arquivos estáticos versionados pelo conteúdo, pré-comprimidos e servidos da memória
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from flask import Flask, Response, request
+
+from src.models.compression import Compression
+
+# Referências a arquivos locais em atributos src/href do HTML
+_REFERENCE = re.compile(r'''(\b(?:src|href)=["'])/?([^"'?#:]+)(["'])''')
+
+
+@dataclass
+class Asset:
+    """Arquivo estático carregado em memória"""
+    body: bytes
+    mimetype: str
+    etag: str
+    immutable: bool = False
+    # Conteúdo pré-comprimido por codificação ('br', 'gzip')
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+class StaticAssets:
+    """
+    Pipeline dos arquivos estáticos do frontend
+
+    Na inicialização, cada arquivo ganha um nome com o hash do conteúdo
+    (styles.css -> styles.<hash>.css), as referências no HTML são reescritas
+    para esses nomes e as versões gzip/brotli são geradas uma única vez.
+    Os nomes versionados são servidos com cache imutável de um ano; o HTML e
+    os nomes originais são revalidados pelo ETag (no-cache).
+    Alterações nos arquivos exigem reiniciar o aplicativo (ou chamar build).
+    """
+
+    INDEX = 'index.html'
+    IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+    HASH_LENGTH = 12
+
+    # Compressão máxima: os arquivos são comprimidos só uma vez
+    GZIP_LEVEL = 9
+    BROTLI_QUALITY = 11
+
+    _assets: Dict[str, Asset] = {}
+    _urls: Dict[str, str] = {}
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """Carrega os arquivos da pasta estática do aplicativo"""
+        if app.static_folder is not None:
+            cls.build(app.static_folder)
+
+    @classmethod
+    def build(cls, folder: str) -> None:
+        """
+        Carrega, versiona e comprime os arquivos de uma pasta
+
+        Args:
+            folder: Pasta dos arquivos estáticos
+        """
+        files = {}
+        for root, _, names in os.walk(folder):
+            for name in names:
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, folder).replace(os.sep, '/')
+                with open(full_path, 'rb') as source:
+                    files[path] = source.read()
+
+        assets = {}
+        urls = {}
+        for path, body in files.items():
+            if path.endswith('.html'):
+                continue
+            digest = hashlib.blake2b(body, digest_size=16).hexdigest()[:cls.HASH_LENGTH]
+            base, extension = os.path.splitext(path)
+            fingerprinted = f"{base}.{digest}{extension}"
+            urls[path] = f"/{fingerprinted}"
+            assets[path] = cls._load(path, body)
+            assets[fingerprinted] = cls._load(path, body, immutable=True)
+
+        # O HTML muda a cada versão dos arquivos que referencia, então nunca é imutável
+        for path, body in files.items():
+            if path.endswith('.html'):
+                html = cls._rewrite(body.decode('utf-8'), urls)
+                assets[path] = cls._load(path, html.encode('utf-8'))
+
+        cls._assets = assets
+        cls._urls = urls
+        print(f"Arquivos estáticos carregados: {len(files)} ({len(urls)} versionados)")
+
+    @classmethod
+    def url_for(cls, path: str) -> str:
+        """Endereço versionado de um arquivo (ou o original, se não houver)"""
+        return cls._urls.get(path.lstrip('/'), f"/{path.lstrip('/')}")
+
+    @staticmethod
+    def _rewrite(html: str, urls: Dict[str, str]) -> str:
+        """Troca as referências do HTML pelos nomes versionados"""
+        def replace(match):
+            url = urls.get(match.group(2))
+            return match.group(0) if url is None else f"{match.group(1)}{url}{match.group(3)}"
+        return _REFERENCE.sub(replace, html)
+
+    @classmethod
+    def _load(cls, path: str, body: bytes, immutable: bool = False) -> Asset:
+        """Monta o Asset com as versões comprimidas que valerem a pena"""
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        asset = Asset(body=body, mimetype=mimetype, etag=hashlib.blake2b(body, digest_size=12).hexdigest(),
+                      immutable=immutable)
+        if mimetype in Compression.COMPRESSIBLE_MIMETYPES and len(body) >= Compression.MIN_SIZE:
+            for encoding in Compression.available_encodings():
+                level = cls.BROTLI_QUALITY if encoding == 'br' else cls.GZIP_LEVEL
+                compressed = Compression.compress(body, encoding, level)
+                if len(compressed) < len(body):
+                    asset.encoded[encoding] = compressed
+        return asset
+
+    @classmethod
+    def response(cls, path: str) -> Optional[Response]:
+        """
+        Monta a resposta de um arquivo estático
+
+        Args:
+            path: Caminho relativo à pasta estática
+
+        Returns:
+            Resposta com a codificação aceita pelo cliente, ou None se o arquivo não existir
+        """
+        asset = cls._assets.get(path)
+        if asset is None:
+            return None
+
+        encoding = request.accept_encodings.best_match(list(asset.encoded)) if asset.encoded else None
+        response = Response(asset.encoded[encoding] if encoding else asset.body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.mimetype in Compression.COMPRESSIBLE_MIMETYPES:
+            # Também impede a compressão de novo depois da rota
+            response.vary.add('Accept-Encoding')
+        response.set_etag(f"{asset.etag}-{encoding}" if encoding else asset.etag)
+
+        response.cache_control.public = True
+        if asset.immutable:
+            response.cache_control.max_age = cls.IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
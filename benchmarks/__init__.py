@@ -0,0 +1,8 @@
+"""
+Benchmarks dos caminhos críticos (parsing, busca e serialização)
+
+Uso:
+
+    python -m benchmarks.run --output resultados.json
+    python -m benchmarks.run --compare resultados-anteriores.json
+"""
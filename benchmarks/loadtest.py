@@ -0,0 +1,249 @@
+"""
+Teste de carga de ponta a ponta contra as APIs simuladas
+
+    python -m benchmarks.loadtest --duration 20 --concurrency 16 --latency 80 --error-rate 0.01
+    python -m benchmarks.loadtest --target http://127.0.0.1:5000 --endpoints current,forecast
+
+Sem --target, o aplicativo é servido neste processo (servidor threaded do
+Werkzeug) e apontado para benchmarks.stub_upstream, iniciado aqui com a
+latência e os erros informados. Com --target, o aplicativo e o servidor
+simulado já devem estar rodando (veja as variáveis de ambiente em
+benchmarks.stub_upstream).
+
+O relatório traz, por endpoint, requisições, erros, vazão e os percentis
+p50/p95/p99 da latência.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, redirect_stdout
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+
+from benchmarks.record import LATITUDE, LONGITUDE
+from benchmarks.run import git_commit
+from benchmarks.stub_upstream import StubUpstream, stats_summary
+
+DURATION = 10
+CONCURRENCY = 8
+LOCATIONS = 50
+
+_QUERIES = ('São Paulo', 'sant', 'rio', 'Belo Horizonte', 'nova', 'porto', 'campinas', 'são')
+
+# Requisição: (método, caminho, corpo JSON)
+Request = Tuple[str, str, Optional[Dict]]
+
+
+def build_endpoints(locations: int, seed: int = 1) -> Dict[str, Callable[[random.Random], Request]]:
+    """
+    Monta os geradores de requisição de cada endpoint
+
+    Args:
+        locations: Número de coordenadas distintas sorteadas (controla a taxa de acerto do cache)
+        seed: Semente da lista de coordenadas
+
+    Returns:
+        Função que sorteia uma requisição, por nome do endpoint
+    """
+    rng = random.Random(seed)
+    points = [(round(LATITUDE + rng.uniform(-8, 8), 4), round(LONGITUDE + rng.uniform(-8, 8), 4))
+              for _ in range(max(1, locations))]
+
+    def current(r: random.Random) -> Request:
+        lat, lon = r.choice(points)
+        return 'GET', f'/api/weather/current?lat={lat}&lon={lon}', None
+
+    def forecast(r: random.Random) -> Request:
+        lat, lon = r.choice(points)
+        return 'GET', f'/api/weather/forecast?lat={lat}&lon={lon}&days={r.choice((1, 3, 7, 16))}', None
+
+    def batch(r: random.Random) -> Request:
+        sample = r.sample(points, min(10, len(points)))
+        return 'POST', '/api/weather/current/batch', {'locations': [{'lat': lat, 'lon': lon} for lat, lon in sample]}
+
+    def search(r: random.Random) -> Request:
+        return 'GET', f'/api/weather/search?q={quote(r.choice(_QUERIES))}', None
+
+    return {'current': current, 'forecast': forecast, 'batch': batch, 'search': search}
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo (values já ordenados)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(samples: List[Tuple[float, int]], elapsed: float) -> Dict:
+    """
+    Estatísticas de um conjunto de requisições
+
+    Args:
+        samples: Tuplas (duração em segundos, status HTTP; 0 para falha de conexão)
+        elapsed: Duração do teste, em segundos
+
+    Returns:
+        Requisições, erros, vazão e percentis (em ms)
+    """
+    durations = sorted(duration for duration, _ in samples)
+    errors = sum(1 for _, status in samples if not 200 <= status < 400)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(durations, 50) * 1000,
+        'p95_ms': percentile(durations, 95) * 1000,
+        'p99_ms': percentile(durations, 99) * 1000,
+        'max_ms': (durations[-1] if durations else 0.0) * 1000
+    }
+
+
+def drive(target: str, endpoints: Dict[str, Callable[[random.Random], Request]], duration: float,
+          concurrency: int, seed: int = 0) -> Dict[str, List[Tuple[float, int]]]:
+    """
+    Envia requisições em paralelo até o fim do tempo
+
+    Cada trabalhador mantém sua própria sessão HTTP e sorteia o endpoint a
+    cada requisição.
+
+    Returns:
+        Amostras (duração, status) por endpoint
+    """
+    names = list(endpoints)
+    samples: Dict[str, List[Tuple[float, int]]] = {name: [] for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        local: Dict[str, List[Tuple[float, int]]] = {name: [] for name in names}
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                name = rng.choice(names)
+                method, path, body = endpoints[name](rng)
+                start = time.perf_counter()
+                try:
+                    response = session.request(method, target + path, json=body, timeout=30)
+                    status = response.status_code
+                except requests.RequestException:
+                    status = 0
+                local[name].append((time.perf_counter() - start, status))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadtest') as executor:
+        list(executor.map(worker, range(concurrency)))
+    return samples
+
+
+def serve_app(stack: ExitStack, stub: StubUpstream) -> str:
+    """
+    Serve o aplicativo neste processo, apontado para o servidor simulado
+
+    Returns:
+        Endereço base do aplicativo
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    from src.main import app
+    from src.models.geocoding import GeocodingService
+    from src.models.weather import WeatherService
+
+    environment = stub.environment()
+    WeatherService.BASE_URL = environment['OPEN_METEO_BASE_URL']
+    GeocodingService.OPEN_METEO_GEOCODING_URL = f"{environment['OPEN_METEO_GEOCODING_BASE_URL']}/search"
+    GeocodingService.NOMINATIM_BASE_URL = environment['NOMINATIM_BASE_URL']
+    # Respostas simuladas não devem ir para o cache persistente de geocodificação
+    GeocodingService.GEOCODING_CACHE_PATH = ''
+    GeocodingService._persistent_cache = None
+    WeatherService.clear_cache()
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, name='loadtest-app', daemon=True)
+    thread.start()
+    stack.callback(thread.join)
+    stack.callback(server.shutdown)
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def report(results: Dict[str, Dict]) -> None:
+    """Imprime a tabela de resultados na saída de erro"""
+    print(f"{'endpoint':10s} {'reqs':>7s} {'erros':>6s} {'req/s':>8s} {'p50':>9s} {'p95':>9s} {'p99':>9s} "
+          f"{'máx':>9s}", file=sys.stderr)
+    for name, stats in results.items():
+        print(f"{name:10s} {stats['requests']:7d} {stats['errors']:6d} {stats['rps']:8.1f} "
+              f"{stats['p50_ms']:7.1f}ms {stats['p95_ms']:7.1f}ms {stats['p99_ms']:7.1f}ms "
+              f"{stats['max_ms']:7.1f}ms", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Teste de carga do aplicativo contra as APIs simuladas')
+    parser.add_argument('--target', help='Endereço de um aplicativo já em execução (padrão: serve neste processo)')
+    parser.add_argument('--duration', type=float, default=DURATION, help='Duração do teste, em segundos')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help='Requisições simultâneas')
+    parser.add_argument('--endpoints', default='current,forecast,batch,search',
+                        help='Endpoints exercitados, separados por vírgula')
+    parser.add_argument('--locations', type=int, default=LOCATIONS,
+                        help='Coordenadas distintas consultadas (menos coordenadas, mais acertos no cache)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latência das APIs simuladas, em ms')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Latência aleatória adicional máxima, em ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração de respostas das APIs com erro')
+    parser.add_argument('--seed', type=int, default=0, help='Semente dos sorteios')
+    parser.add_argument('--output', help='Arquivo JSON com o resultado')
+    args = parser.parse_args(argv)
+
+    available = build_endpoints(args.locations, args.seed + 1)
+    names = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        parser.error(f"Endpoints desconhecidos: {', '.join(unknown)} (use {', '.join(available)})")
+    endpoints = {name: available[name] for name in names}
+
+    stub = None
+    with ExitStack() as stack:
+        if args.target:
+            target = args.target.rstrip('/')
+        else:
+            stub = stack.enter_context(StubUpstream(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                                                    error_rate=args.error_rate, seed=args.seed))
+            # Os logs do aplicativo (print) atrapalhariam o relatório e a medição
+            stack.enter_context(redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            target = serve_app(stack, stub)
+
+        start = time.perf_counter()
+        samples = drive(target, endpoints, args.duration, args.concurrency, args.seed)
+        elapsed = time.perf_counter() - start
+
+    results = {name: summarize(values, elapsed) for name, values in samples.items()}
+    results['total'] = summarize([sample for values in samples.values() for sample in values], elapsed)
+    report(results)
+    if stub is not None:
+        print('\n'.join(stats_summary(stub)), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump({
+                'commit': git_commit(),
+                'settings': {name: value for name, value in vars(args).items() if name != 'output'},
+                'elapsed': elapsed,
+                'endpoints': results
+            }, output, indent=2)
+            output.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Gravação das respostas das APIs externas usadas pelos benchmarks
+
+    python -m benchmarks.record              # grava respostas reais das APIs
+    python -m benchmarks.record --synthetic  # gera respostas no mesmo formato, sem rede
+
+As respostas ficam em benchmarks/fixtures/ e são lidas por benchmarks.run,
+de modo que os benchmarks nunca dependem da rede.
+"""
+import argparse
+import json
+import math
+import os
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+import requests
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Local de referência dos benchmarks (São Paulo)
+LATITUDE = -23.5505
+LONGITUDE = -46.6333
+
+FORECAST_DAYS = (1, 7, 16)
+SEARCH_QUERY = 'São'
+
+DAILY_FIELDS = 'temperature_2m_max,temperature_2m_min,weather_code,precipitation_sum'
+HOURLY_FIELDS = 'temperature_2m,relative_humidity_2m,wind_speed_10m,weather_code'
+CURRENT_FIELDS = 'temperature_2m,relative_humidity_2m,wind_speed_10m,wind_direction_10m,weather_code'
+WEATHER_CODES = (0, 1, 2, 3, 45, 51, 61, 63, 80, 95)
+
+
+def fixture_path(name: str) -> str:
+    """Caminho do arquivo de uma resposta gravada"""
+    return os.path.join(FIXTURES_DIR, f'{name}.json')
+
+
+def load_fixture(name: str):
+    """
+    Lê uma resposta gravada
+
+    Args:
+        name: Nome da resposta (ex.: 'forecast_7d')
+
+    Returns:
+        JSON decodificado
+    """
+    with open(fixture_path(name), encoding='utf-8') as source:
+        return json.load(source)
+
+
+def record_live() -> Dict[str, object]:
+    """Consulta as APIs reais e retorna as respostas por nome"""
+    fixtures = {}
+    for days in FORECAST_DAYS:
+        fixtures[f'forecast_{days}d'] = requests.get('https://api.open-meteo.com/v1/forecast', params={
+            'latitude': LATITUDE,
+            'longitude': LONGITUDE,
+            'daily': DAILY_FIELDS,
+            'hourly': HOURLY_FIELDS,
+            'current': CURRENT_FIELDS,
+            'timezone': 'auto',
+            'forecast_days': days
+        }, timeout=10).json()
+
+    fixtures['current'] = requests.get('https://api.open-meteo.com/v1/forecast', params={
+        'latitude': LATITUDE,
+        'longitude': LONGITUDE,
+        'current': CURRENT_FIELDS,
+        'timezone': 'auto'
+    }, timeout=10).json()
+
+    fixtures['geocoding_search'] = requests.get('https://geocoding-api.open-meteo.com/v1/search', params={
+        'name': SEARCH_QUERY,
+        'count': 10,
+        'language': 'pt',
+        'format': 'json'
+    }, timeout=10).json()
+    return fixtures
+
+
+def generate_synthetic(seed: int = 42) -> Dict[str, object]:
+    """
+    Gera respostas determinísticas no mesmo formato das APIs
+
+    Args:
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Respostas por nome
+    """
+    rng = random.Random(seed)
+    start = date(2025, 7, 4)
+    fixtures = {}
+    current = {
+        'time': '2025-07-04T20:00',
+        'temperature_2m': 21.4,
+        'relative_humidity_2m': 68,
+        'wind_speed_10m': 9.7,
+        'wind_direction_10m': 140,
+        'weather_code': 2
+    }
+
+    for days in FORECAST_DAYS:
+        hours = days * 24
+        base = datetime(2025, 7, 4)
+        fixtures[f'forecast_{days}d'] = {
+            'latitude': LATITUDE,
+            'longitude': LONGITUDE,
+            'timezone': 'America/Sao_Paulo',
+            'current': current,
+            'daily': {
+                'time': [(start + timedelta(days=i)).isoformat() for i in range(days)],
+                'temperature_2m_max': [round(24 + rng.uniform(-4, 6), 1) for _ in range(days)],
+                'temperature_2m_min': [round(14 + rng.uniform(-4, 4), 1) for _ in range(days)],
+                'weather_code': [rng.choice(WEATHER_CODES) for _ in range(days)],
+                'precipitation_sum': [round(max(0.0, rng.gauss(1, 3)), 1) for _ in range(days)]
+            },
+            'hourly': {
+                'time': [(base + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M') for i in range(hours)],
+                'temperature_2m': [round(19 + 6 * math.sin((i % 24 - 9) / 24 * 2 * math.pi) + rng.uniform(-1, 1), 1)
+                                   for i in range(hours)],
+                'relative_humidity_2m': [rng.randint(40, 95) for _ in range(hours)],
+                'wind_speed_10m': [round(rng.uniform(0, 25), 1) for _ in range(hours)],
+                'weather_code': [rng.choice(WEATHER_CODES) for _ in range(hours)]
+            }
+        }
+
+    fixtures['current'] = {
+        'latitude': LATITUDE,
+        'longitude': LONGITUDE,
+        'timezone': 'America/Sao_Paulo',
+        'current': current
+    }
+
+    fixtures['geocoding_search'] = {
+        'results': [
+            {
+                'name': f'São {name}',
+                'latitude': round(rng.uniform(-30, -5), 4),
+                'longitude': round(rng.uniform(-55, -35), 4),
+                'country': 'Brasil',
+                'admin1': state
+            }
+            for name, state in (('Paulo', 'São Paulo'), ('Luís', 'Maranhão'), ('Gonçalo', 'Rio de Janeiro'),
+                                ('José dos Campos', 'São Paulo'), ('Bernardo do Campo', 'São Paulo'),
+                                ('Leopoldo', 'Rio Grande do Sul'), ('Carlos', 'São Paulo'),
+                                ('José', 'Santa Catarina'), ('Vicente', 'São Paulo'), ('Caetano do Sul', 'São Paulo'))
+        ]
+    }
+    return fixtures
+
+
+def synthetic_cities(count: int, seed: int = 7) -> List[tuple]:
+    """
+    Gera uma tabela grande de cidades para os benchmarks de busca
+
+    Args:
+        count: Número de cidades
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Lista de tuplas (nome, latitude, longitude, estado, país, população)
+    """
+    rng = random.Random(seed)
+    prefixes = ('São', 'Santa', 'Santo', 'Nova', 'Porto', 'Vila', 'Campo', 'Rio', 'Monte', 'Bom')
+    syllables = ('ba', 'ca', 'da', 'fe', 'go', 'ja', 'lu', 'ma', 'ni', 'po', 'ra', 'si', 'ta', 'vi', 'zu')
+    cities = []
+    for i in range(count):
+        name = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.4:
+            name = f'{rng.choice(prefixes)} {name}'
+        cities.append((name, rng.uniform(-33, 5), rng.uniform(-73, -34), f'Estado {i % 27}', 'Brasil',
+                       rng.randint(500, 2_000_000)))
+    return cities
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grava as respostas das APIs usadas nos benchmarks')
+    parser.add_argument('--synthetic', action='store_true', help='Gera respostas sintéticas sem acessar a rede')
+    args = parser.parse_args()
+
+    fixtures = generate_synthetic() if args.synthetic else record_live()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, data in fixtures.items():
+        with open(fixture_path(name), 'w', encoding='utf-8') as output:
+            json.dump(data, output, ensure_ascii=False, separators=(',', ':'))
+        print(f"{name}: {fixture_path(name)}")
@@ -0,0 +1,392 @@
+"""
+Executa os benchmarks e grava os resultados em JSON
+
+    python -m benchmarks.run                          # todos os casos, resultado na saída padrão
+    python -m benchmarks.run -k forecast --output atual.json
+    python -m benchmarks.run --compare base.json --threshold 0.15
+
+As APIs externas nunca são acessadas: as respostas vêm de benchmarks/fixtures.
+Com --compare, o processo termina com código 1 se algum caso ficar mais lento
+que a referência além do limite informado.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, redirect_stdout
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.record import LATITUDE, LONGITUDE, load_fixture, synthetic_cities
+
+# Os logs da inicialização do aplicativo não devem se misturar ao JSON da saída
+with redirect_stdout(sys.stderr):
+    from src.main import app
+from src.models.gazetteer import CityRow, Gazetteer, build_gazetteer
+from src.models.geocoding import GeocodingService
+from src.models.weather import WeatherService
+
+# Tempo mínimo de cada rodada de medição, em segundos
+MIN_ROUND_TIME = 0.05
+ROUNDS = 5
+
+# Tamanho da tabela grande de cidades (gazetteer)
+LARGE_TABLE_SIZE = 50_000
+# Tabela com o tamanho de uma exportação completa do GeoNames (cities500), para prefixos curtos
+HUGE_TABLE_SIZE = 400_000
+
+_BENCHMARKS: List[tuple] = []
+
+
+def benchmark(group: str, name: str):
+    """Registra uma função que prepara o caso e retorna o código a medir"""
+    def register(setup: Callable[[ExitStack], Callable[[], object]]):
+        _BENCHMARKS.append((group, name, setup))
+        return setup
+    return register
+
+
+def offline(stack: ExitStack, forecast: Optional[Dict] = None, current: Optional[Dict] = None,
+            geocoding: Optional[Dict] = None) -> None:
+    """
+    Isola o caso da rede, dos caches persistentes e do estado de outros casos
+
+    As chamadas às APIs são respondidas com as respostas gravadas; chamadas a
+    provedores sem resposta informada (como o Nominatim) falham.
+    """
+    WeatherService.clear_cache()
+    WeatherService._circuit.reset()
+
+    def recorded(params, provider):
+        if provider == 'open-meteo-forecast':
+            data = forecast if params and 'daily' in params else current
+        elif provider == 'open-meteo-geocoding':
+            data = geocoding
+        else:
+            data = None
+        if data is None:
+            raise AssertionError(f"Benchmark sem resposta gravada para {provider}")
+        return data
+
+    async def upstream_async(url, params=None, provider='other', **kwargs):
+        return httpx.Response(200, json=recorded(params, provider), request=httpx.Request('GET', url))
+
+    stack.enter_context(patch('src.models.http_client.AsyncHttpClient.get', side_effect=upstream_async))
+    stack.enter_context(patch.object(GeocodingService, '_persistent_cache', None))
+    stack.enter_context(patch.object(GeocodingService, 'GEOCODING_CACHE_PATH', ''))
+    stack.enter_context(patch.object(GeocodingService, '_gazetteer', None))
+    stack.enter_context(patch.object(GeocodingService, 'GAZETTEER_PATH', ''))
+    stack.enter_context(patch.object(GeocodingService, '_spatial_indexes', None))
+    stack.callback(WeatherService.clear_cache)
+
+
+# Parsing das respostas de previsão
+
+def _parse_forecast_case(days: int):
+    def setup(stack: ExitStack):
+        data = load_fixture(f'forecast_{days}d')
+        return lambda: WeatherService._parse_forecast(data, LATITUDE, LONGITUDE)
+    return setup
+
+
+def _get_forecast_case(days: int):
+    def setup(stack: ExitStack):
+        offline(stack, forecast=load_fixture(f'forecast_{days}d'))
+
+        def run():
+            # Sem cache: mede requisição simulada, parsing e montagem do resultado
+            WeatherService._cache.clear()
+            forecast = WeatherService.get_forecast(LATITUDE, LONGITUDE, 'São Paulo', days)
+            assert forecast is not None and not forecast.degraded
+            return forecast
+        return run
+    return setup
+
+
+for _days in (1, 7, 16):
+    benchmark('parse', f'parse_forecast_{_days}d')(_parse_forecast_case(_days))
+    benchmark('parse', f'get_forecast_uncached_{_days}d')(_get_forecast_case(_days))
+
+
+@benchmark('parse', 'parse_current')
+def _parse_current(stack: ExitStack):
+    current = load_fixture('current')['current']
+    return lambda: WeatherService._parse_current(current, LATITUDE, LONGITUDE)
+
+
+# Busca de cidades
+
+_SEARCH_QUERIES = ('São Paulo', 'sant', 'rio ba', 'Belo Horizonte', 'nova')
+
+
+def _search_all():
+    for query in _SEARCH_QUERIES:
+        GeocodingService.search_locations(query, 5)
+
+
+@benchmark('search', 'search_locations_builtin')
+def _search_builtin(stack: ExitStack):
+    offline(stack)
+    GeocodingService._get_city_index()
+    return _search_all
+
+
+@benchmark('search', 'search_locations_gazetteer_50k')
+def _search_large(stack: ExitStack):
+    offline(stack)
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    path = os.path.join(directory, 'gazetteer.bin')
+    build_gazetteer((CityRow(*city) for city in synthetic_cities(LARGE_TABLE_SIZE)), path)
+    gazetteer = Gazetteer(path)
+    stack.callback(gazetteer.close)
+    stack.enter_context(patch.object(GeocodingService, '_gazetteer', gazetteer))
+    return _search_all
+
+
+@benchmark('search', 'search_short_prefix_gazetteer_400k')
+def _search_short_prefix(stack: ExitStack):
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    path = os.path.join(directory, 'gazetteer.bin')
+    build_gazetteer((CityRow(*city) for city in synthetic_cities(HUGE_TABLE_SIZE)), path)
+    gazetteer = Gazetteer(path)
+    stack.callback(gazetteer.close)
+
+    # Um caractere casa com dezenas de milhares de nomes
+    def run():
+        gazetteer.search('s', 5)
+    return run
+
+
+@benchmark('search', 'reverse_geocode_gazetteer_50k')
+def _reverse_large(stack: ExitStack):
+    offline(stack)
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    path = os.path.join(directory, 'gazetteer.bin')
+    cities = synthetic_cities(LARGE_TABLE_SIZE)
+    build_gazetteer((CityRow(*city) for city in cities), path)
+    gazetteer = Gazetteer(path)
+    stack.callback(gazetteer.close)
+    stack.enter_context(patch.object(GeocodingService, '_gazetteer', gazetteer))
+    points = [(lat + 0.01, lon - 0.01) for _, lat, lon, *_ in cities[:50]]
+
+    def run():
+        for lat, lon in points:
+            GeocodingService.get_location_by_coordinates(lat, lon)
+    return run
+
+
+# Conversão para dicionário
+
+def _forecast_data(days: int):
+    """Previsão como servida pela rota: todos os dias pedidos e as primeiras 24 horas"""
+    forecast = WeatherService._parse_forecast(load_fixture(f'forecast_{days}d'), LATITUDE, LONGITUDE)
+    return WeatherService._forecast_window(forecast, days)
+
+
+@benchmark('to_dict', 'weather_data_to_dict')
+def _weather_to_dict(stack: ExitStack):
+    weather_data = WeatherService._parse_current(load_fixture('current')['current'], LATITUDE, LONGITUDE)
+    return weather_data.to_dict
+
+
+@benchmark('to_dict', 'forecast_data_to_dict_16d_rows')
+def _forecast_to_dict_rows(stack: ExitStack):
+    forecast_data = _forecast_data(16)
+    return lambda: forecast_data.to_dict()
+
+
+@benchmark('to_dict', 'forecast_data_to_dict_16d_columns')
+def _forecast_to_dict_columns(stack: ExitStack):
+    forecast_data = _forecast_data(16)
+    return lambda: forecast_data.to_dict('columns')
+
+
+# Serialização e rotas completas (cache aquecido)
+
+@benchmark('serialize', 'json_dumps_forecast_16d')
+def _json_forecast(stack: ExitStack):
+    payload = {'data': _forecast_data(16).to_dict()}
+    return lambda: app.json.dumps(payload)
+
+
+def _route_case(path: str, method: str = 'GET', body: Optional[Dict] = None, days: int = 7):
+    def setup(stack: ExitStack):
+        offline(stack, forecast=load_fixture(f'forecast_{days}d'), current=load_fixture('current'),
+                geocoding=load_fixture('geocoding_search'))
+        client = app.test_client()
+
+        def run():
+            response = client.open(path, method=method, json=body)
+            assert response.status_code == 200, response.status_code
+            return response.data
+
+        run()  # aquece o cache
+        return run
+    return setup
+
+
+_LOCATION = f'lat={LATITUDE}&lon={LONGITUDE}'
+_BATCH = {'locations': [{'lat': LATITUDE + i / 100, 'lon': LONGITUDE} for i in range(20)]}
+
+benchmark('route', 'route_current')(_route_case(f'/api/weather/current?{_LOCATION}'))
+benchmark('route', 'route_current_batch_20')(_route_case('/api/weather/current/batch', 'POST', _BATCH))
+for _days in (7, 16):
+    benchmark('route', f'route_forecast_{_days}d')(
+        _route_case(f'/api/weather/forecast?{_LOCATION}&days={_days}', days=_days))
+benchmark('route', 'route_forecast_16d_columns')(
+    _route_case(f'/api/weather/forecast?{_LOCATION}&days=16&layout=columns', days=16))
+benchmark('route', 'route_search')(_route_case('/api/weather/search?q=S%C3%A3o'))
+
+
+# Execução
+
+def measure(fn: Callable[[], object], rounds: int = ROUNDS, min_round_time: float = MIN_ROUND_TIME) -> Dict:
+    """
+    Mede o tempo de uma função
+
+    O número de repetições por rodada é ajustado para que cada rodada dure
+    pelo menos min_round_time; o resultado usa o tempo por chamada.
+
+    Returns:
+        Dicionário com estatísticas em segundos por chamada
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_time:
+            break
+        loops *= 2 if elapsed > min_round_time / 10 else 10
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+
+    median = statistics.median(timings)
+    return {
+        'loops': loops,
+        'rounds': rounds,
+        'min': min(timings),
+        'median': median,
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if rounds > 1 else 0.0,
+        'ops_per_sec': 1 / median if median else None
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Commit atual do repositório, se disponível"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(selected: Optional[str] = None, rounds: int = ROUNDS) -> Dict:
+    """
+    Executa os casos registrados
+
+    Args:
+        selected: Trecho do nome para filtrar os casos (opcional)
+        rounds: Rodadas de medição por caso
+
+    Returns:
+        Resultado completo, pronto para ser gravado em JSON
+    """
+    results = {}
+    for group, name, setup in _BENCHMARKS:
+        if selected and selected not in name:
+            continue
+        # Os logs do aplicativo (print) não devem se misturar ao JSON da saída
+        with ExitStack() as stack, open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            fn = setup(stack)
+            stats = measure(fn, rounds)
+        results[name] = dict(stats, group=group)
+        print(f"{name:40s} {stats['median'] * 1e6:12.1f} µs", file=sys.stderr)
+
+    return {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara dois resultados pela mediana de cada caso
+
+    Args:
+        current: Resultado atual
+        baseline: Resultado de referência
+        threshold: Piora relativa tolerada (0.1 = 10%)
+
+    Returns:
+        Nomes dos casos que ficaram mais lentos que o tolerado
+    """
+    regressions = []
+    print(f"{'caso':40s} {'referência':>12s} {'atual':>12s} {'variação':>9s}", file=sys.stderr)
+    for name, stats in current['benchmarks'].items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            continue
+        change = stats['median'] / reference['median'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  <- mais lento'
+        print(f"{name:40s} {reference['median'] * 1e6:10.1f}µs {stats['median'] * 1e6:10.1f}µs "
+              f"{change:+9.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks dos caminhos críticos do aplicativo')
+    parser.add_argument('-k', dest='selected', help='Executa apenas os casos cujo nome contém o texto')
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='Rodadas de medição por caso')
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: saída padrão)')
+    parser.add_argument('--compare', help='Resultado anterior (JSON) para comparação')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Piora relativa tolerada na comparação')
+    parser.add_argument('--list', action='store_true', help='Lista os casos disponíveis')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for group, name, _ in _BENCHMARKS:
+            print(f"{group:10s} {name}")
+        return 0
+
+    result = run_benchmarks(args.selected, args.rounds)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as source:
+            regressions = compare(result, json.load(source), args.threshold)
+        if regressions:
+            print(f"Casos mais lentos que a referência: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Servidor local que imita as APIs externas usadas pelo aplicativo
+
+    python -m benchmarks.stub_upstream --port 8900 --latency 80 --jitter 40 --error-rate 0.02
+
+Atende os caminhos usados por WeatherService e GeocodingService:
+
+    /v1/forecast  Open-Meteo (previsão, dados atuais e lotes)
+    /v1/search    Open-Meteo Geocoding
+    /search       Nominatim (busca)
+    /reverse      Nominatim (geocodificação reversa)
+
+As respostas são montadas a partir das respostas gravadas em
+benchmarks/fixtures/, com latência e erros injetados. Para apontar o
+aplicativo para o servidor:
+
+    OPEN_METEO_BASE_URL=http://127.0.0.1:8900/v1
+    OPEN_METEO_GEOCODING_BASE_URL=http://127.0.0.1:8900/v1
+    NOMINATIM_BASE_URL=http://127.0.0.1:8900
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.record import load_fixture
+
+
+class StubUpstream:
+    """Servidor HTTP das APIs simuladas, executado em uma thread"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = None):
+        """
+        Args:
+            host: Endereço de escuta
+            port: Porta (0 escolhe uma livre)
+            latency: Atraso fixo de cada resposta, em segundos
+            jitter: Atraso adicional aleatório (0 a jitter), em segundos
+            error_rate: Fração das requisições respondidas com erro (0 a 1)
+            error_status: Status HTTP dos erros injetados
+            seed: Semente do gerador aleatório (None para não determinístico)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+        self._forecast = load_fixture('forecast_16d')
+        self._current = load_fixture('current')
+        self._places = load_fixture('geocoding_search')['results']
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Endereço base do servidor (ex.: http://127.0.0.1:8900)"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        """Variáveis de ambiente que apontam o aplicativo para o servidor"""
+        return {
+            'OPEN_METEO_BASE_URL': f"{self.url}/v1",
+            'OPEN_METEO_GEOCODING_BASE_URL': f"{self.url}/v1",
+            'NOMINATIM_BASE_URL': self.url,
+        }
+
+    def start(self) -> 'StubUpstream':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-upstream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'StubUpstream':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Respostas
+
+    def respond(self, path: str, params: Dict[str, str]):
+        """
+        Monta a resposta de um caminho
+
+        Args:
+            path: Caminho da requisição
+            params: Parâmetros da query string
+
+        Returns:
+            Tupla (status, corpo JSON) ou None se o caminho não existir
+        """
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.errors[path] = self.errors.get(path, 0) + 1
+
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            return self.error_status, {'error': True, 'reason': 'Erro injetado pelo servidor simulado'}
+
+        if path == '/v1/forecast':
+            return 200, self._forecast_response(params)
+        if path == '/v1/search':
+            count = int(params.get('count', 10))
+            return 200, {'results': self._places[:count]}
+        if path == '/search':
+            limit = int(params.get('limit', 5))
+            return 200, [self._nominatim_place(place) for place in self._places[:limit]]
+        if path == '/reverse':
+            place = dict(self._places[0], latitude=float(params['lat']), longitude=float(params['lon']))
+            return 200, self._nominatim_place(place)
+        return None
+
+    def _forecast_response(self, params: Dict[str, str]):
+        """Resposta da Open-Meteo para uma ou várias coordenadas"""
+        latitudes = params['latitude'].split(',')
+        longitudes = params['longitude'].split(',')
+        if 'daily' not in params:
+            template = self._current
+        else:
+            days = int(params.get('forecast_days', 7))
+            template = dict(self._forecast)
+            template['daily'] = {name: values[:days] for name, values in self._forecast['daily'].items()}
+            template['hourly'] = {name: values[:days * 24] for name, values in self._forecast['hourly'].items()}
+
+        items = [dict(template, latitude=float(lat), longitude=float(lon)) for lat, lon in zip(latitudes, longitudes)]
+        return items[0] if len(items) == 1 else items
+
+    @staticmethod
+    def _nominatim_place(place: Dict) -> Dict:
+        """Converte um resultado da Open-Meteo Geocoding para o formato do Nominatim"""
+        return {
+            'lat': str(place['latitude']),
+            'lon': str(place['longitude']),
+            'display_name': f"{place['name']}, {place.get('admin1', '')}, {place.get('country', '')}",
+            'address': {
+                'city': place['name'],
+                'state': place.get('admin1', ''),
+                'country': place.get('country', '')
+            }
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+                try:
+                    result = stub.respond(parts.path, params)
+                except (KeyError, ValueError) as e:
+                    result = 400, {'error': True, 'reason': f'Parâmetro inválido: {e}'}
+                if result is None:
+                    result = 404, {'error': True, 'reason': 'Caminho desconhecido'}
+
+                status, data = result
+                body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def stats_summary(stub: StubUpstream) -> List[str]:
+    """Linhas com o número de requisições e erros injetados por caminho"""
+    return [f"{path}: {count} requisições, {stub.errors.get(path, 0)} erros injetados"
+            for path, count in sorted(stub.requests.items())]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor local que imita a Open-Meteo e o Nominatim')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='Atraso fixo por resposta, em ms')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Atraso aleatório adicional máximo, em ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração de respostas com erro (0 a 1)')
+    parser.add_argument('--error-status', type=int, default=503, help='Status HTTP dos erros injetados')
+    args = parser.parse_args()
+
+    server = StubUpstream(args.host, args.port, args.latency / 1000, args.jitter / 1000,
+                          args.error_rate, args.error_status)
+    for name, value in server.environment().items():
+        print(f"{name}={value}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print('\n'.join(stats_summary(server)))
@@ -0,0 +1,157 @@
+"""
+Cache em memória com expiração (TTL) e remoção LRU
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+
+@dataclass
+class CacheEntry:
+    """Entrada do cache com informações de idade"""
+    value: Any
+    age: float
+    stale: bool = False
+
+
+class TTLCache:
+    """Cache thread-safe com tempo de vida por entrada e limite de tamanho (LRU)"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300):
+        """
+        Args:
+            max_entries: Número máximo de entradas mantidas em memória
+            default_ttl: Tempo de vida padrão das entradas, em segundos
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Obtém um valor do cache
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Valor armazenado ou None se ausente ou expirado
+        """
+        entry = self.lookup(key)
+        return None if entry is None else entry.value
+
+    def lookup(self, key: Hashable, allow_stale: bool = False, count: bool = True) -> Optional[CacheEntry]:
+        """
+        Obtém uma entrada do cache com sua idade
+
+        Args:
+            key: Chave da entrada
+            allow_stale: Aceitar entradas expiradas ainda dentro do prazo de max_stale
+            count: Contar a consulta nos acertos e ausências (falso quando o
+                chamador conta o resultado final com record)
+
+        Returns:
+            CacheEntry ou None se ausente (ou expirada, quando allow_stale é falso)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._record(count, None)
+                return None
+
+            value, stored_at, expires_at, stale_until = entry
+            if stale_until <= now:
+                del self._entries[key]
+                self._record(count, None)
+                return None
+
+            stale = expires_at <= now
+            if stale and not allow_stale:
+                self._record(count, None)
+                return None
+
+            # Marcar como usado recentemente
+            self._entries.move_to_end(key)
+            self._record(count, stale)
+            return CacheEntry(value, now - stored_at, stale)
+
+    def record(self, stale: Optional[bool]) -> None:
+        """
+        Conta o resultado de uma consulta feita com count=False
+
+        Args:
+            stale: None para ausência, False para acerto, True para acerto desatualizado
+        """
+        with self._lock:
+            self._record(True, stale)
+
+    def _record(self, count: bool, stale: Optional[bool]) -> None:
+        """Atualiza os contadores (com o lock já adquirido)"""
+        if not count:
+            return
+        if stale is None:
+            self.misses += 1
+        elif stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, max_stale: float = 0) -> None:
+        """
+        Armazena um valor no cache
+
+        Args:
+            key: Chave da entrada
+            value: Valor a armazenar
+            ttl: Tempo de vida em segundos (padrão: default_ttl)
+            max_stale: Tempo adicional, após expirar, em que a entrada ainda
+                pode ser servida como desatualizada
+        """
+        now = time.monotonic()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, now, expires_at, expires_at + max_stale)
+            self._entries.move_to_end(key)
+
+            # Remover as entradas menos usadas recentemente
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove uma entrada do cache, se existir"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove todas as entradas e zera os contadores"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Retorna os contadores de uso do cache"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
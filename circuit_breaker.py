@@ -0,0 +1,111 @@
+"""
+Disjuntor (circuit breaker) para chamadas a serviços externos
+"""
+import threading
+import time
+from typing import Dict
+
+
+class CircuitBreaker:
+    """
+    Disjuntor thread-safe com três estados:
+
+    - fechado: as chamadas passam normalmente;
+    - aberto: após failure_threshold falhas (ou chamadas lentas) seguidas,
+      as chamadas são recusadas sem acessar o serviço por reset_timeout segundos;
+    - meio aberto: passado esse tempo, uma única chamada de teste é liberada;
+      se der certo o disjuntor fecha, senão volta a abrir.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, slow_call_seconds: float = 5.0, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Falhas seguidas necessárias para abrir o disjuntor
+            slow_call_seconds: Duração a partir da qual uma chamada conta como falha
+            reset_timeout: Tempo em segundos com o disjuntor aberto antes do teste
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Fecha o disjuntor e zera os contadores"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+            self._probing = False
+            self.rejected = 0
+            self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Estado atual do disjuntor"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Verifica se uma chamada pode ser feita
+
+        Returns:
+            True se a chamada deve ser feita (e depois registrada com record)
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+
+            # No estado meio aberto só uma chamada de teste por vez
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record(self, success: bool, duration: float = 0.0) -> None:
+        """
+        Registra o resultado de uma chamada liberada por allow_request
+
+        Args:
+            success: Se a chamada teve sucesso
+            duration: Duração da chamada em segundos
+        """
+        failed = not success or duration >= self.slow_call_seconds
+        with self._lock:
+            probe = self._probing
+            self._probing = False
+
+            if not failed:
+                self._state = self.CLOSED
+                self._failures = 0
+                return
+
+            self._failures += 1
+            if probe or (self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        """Retorna o estado e os contadores do disjuntor"""
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'failures': self._failures,
+                'rejected': self.rejected,
+                'opened': self.opened
+            }
@@ -0,0 +1,207 @@
+"""
+Índice de cidades para busca local por prefixo, sem acentos e sem diferenciar maiúsculas
+"""
+import heapq
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from src.models.geocoding import Location
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza um texto para comparação: remove acentos, converte para
+    minúsculas e une espaços repetidos
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Texto normalizado
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.lower().split())
+
+
+def name_ranks(name_ids: Sequence[int]) -> array:
+    """
+    Calcula a inversa da tabela de posições dos nomes
+
+    Args:
+        name_ids: Posição da cidade de cada nome, na ordem dos nomes
+
+    Returns:
+        Vetor com a posição na tabela de nomes ordenada de cada cidade
+    """
+    ranks = array('I', bytes(array('I').itemsize * len(name_ids)))
+    for rank, position in enumerate(name_ids):
+        ranks[position] = rank
+    return ranks
+
+
+class CityIndex:
+    """Índice ordenado de nomes e palavras de cidades para busca por prefixo"""
+
+    # Níveis de relevância (menor é melhor)
+    EXACT = 0
+    NAME_PREFIX = 1
+    ALL_WORDS = 2
+    ANY_WORD = 3
+
+    def __init__(self, entries: Iterable[Tuple[str, 'Location']]):
+        """
+        Args:
+            entries: Pares (nome da cidade, Location) na ordem de prioridade
+        """
+        self._locations: List['Location'] = []
+        names = []
+        words = []
+
+        for position, (name, location) in enumerate(entries):
+            key = normalize_text(name)
+            self._locations.append(location)
+            names.append((key, position))
+            for word in set(key.split()):
+                words.append((word, position))
+
+        names.sort()
+        words.sort()
+        self._name_keys = [key for key, _ in names]
+        self._name_ids = [position for _, position in names]
+        self._word_keys = [word for word, _ in words]
+        self._word_ids = [position for _, position in words]
+        self._encoding = None
+        self._name_ranks = name_ranks(self._name_ids)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_tables(cls, name_keys: Sequence[Union[str, bytes]], name_ids: Sequence[int],
+                    word_keys: Sequence[Union[str, bytes]], word_ids: Sequence[int],
+                    locations: Sequence['Location'], encoding: Optional[str] = None,
+                    name_ranks: Optional[Sequence[int]] = None) -> 'CityIndex':
+        """
+        Cria um índice a partir de tabelas já ordenadas (por exemplo,
+        mapeadas em memória a partir de um arquivo)
+
+        Args:
+            name_keys: Nomes normalizados em ordem crescente
+            name_ids: Posição da cidade de cada nome
+            word_keys: Palavras normalizadas em ordem crescente
+            word_ids: Posição da cidade de cada palavra
+            locations: Sequência de localizações indexada pela posição
+            encoding: Codificação das chaves, quando as tabelas guardam bytes
+                (a busca binária compara os bytes sem decodificá-los)
+            name_ranks: Inversa de name_ids, se já calculada (sem ela, é
+                calculada na primeira busca por prefixo curto)
+
+        Returns:
+            CityIndex que usa as tabelas sem copiá-las
+        """
+        index = cls.__new__(cls)
+        index._locations = locations
+        index._name_keys = name_keys
+        index._name_ids = name_ids
+        index._word_keys = word_keys
+        index._word_ids = word_ids
+        index._encoding = encoding
+        index._name_ranks = name_ranks
+        index._lock = threading.Lock()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    @staticmethod
+    def _prefix_range(keys: Sequence, prefix: Union[str, bytes]) -> Tuple[int, int]:
+        """Retorna o intervalo [início, fim) das chaves que começam com o prefixo"""
+        start = bisect_left(keys, prefix)
+        # 0xff nunca aparece em UTF-8, então limita qualquer continuação do prefixo
+        end = bisect_left(keys, prefix + (b'\xff' if isinstance(prefix, bytes) else '\uffff'), start)
+        return start, end
+
+    def search(self, query: str, limit: int = 5) -> List['Location']:
+        """
+        Busca cidades cujo nome ou palavras comecem com os termos da query
+
+        A ordem dos resultados é determinística: primeiro o nível de
+        relevância (nome exato, prefixo do nome, todas as palavras,
+        alguma palavra) e depois a ordem original das entradas.
+
+        As posições de cada nível saem direto das tabelas de posições, sem
+        decodificar os nomes, e a busca para assim que o limite é atingido.
+
+        Args:
+            query: Termo de busca
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de localizações encontradas
+        """
+        normalized = normalize_text(query)
+        if not normalized or limit <= 0:
+            return []
+        if self._encoding is not None:
+            normalized = normalized.encode(self._encoding)
+
+        # Os nomes exatos ficam no começo do intervalo do prefixo
+        start, end = self._prefix_range(self._name_keys, normalized)
+        exact_end = bisect_right(self._name_keys, normalized, start, end)
+        positions = heapq.nsmallest(limit, self._name_ids[start:exact_end])
+        if len(positions) < limit:
+            positions += self._first_names(exact_end, end, limit - len(positions))
+
+        # Buscas por palavra só podem entrar depois dos prefixos do nome
+        if len(positions) < limit:
+            positions += self._first_words(normalized.split(), set(positions), limit - len(positions))
+
+        return [self._locations[position] for position in positions]
+
+    def _first_names(self, start: int, end: int, count: int) -> List[int]:
+        """
+        Menores posições das cidades cujo nome está no intervalo [start, end) da tabela de nomes
+
+        Com muitos nomes no intervalo (prefixos curtos), percorre as cidades
+        em ordem de posição e para ao encontrar count; com poucos, seleciona
+        as menores posições do próprio intervalo.
+        """
+        matches = end - start
+        if matches <= 0:
+            return []
+        if matches * matches <= count * len(self._name_ids):
+            return heapq.nsmallest(count, self._name_ids[start:end])
+
+        found = []
+        for position, rank in enumerate(self._name_rank_table()):
+            if start <= rank < end:
+                found.append(position)
+                if len(found) == count:
+                    break
+        return found
+
+    def _first_words(self, words: List[Union[str, bytes]], taken: set, count: int) -> List[int]:
+        """Menores posições com todas as palavras e depois com alguma palavra, sem as já encontradas"""
+        word_matches = []
+        for word in words:
+            start, end = self._prefix_range(self._word_keys, word)
+            word_matches.append(set(self._word_ids[start:end]))
+
+        all_words = set.intersection(*word_matches) - taken
+        positions = heapq.nsmallest(count, all_words)
+        if len(positions) < count and len(word_matches) > 1:
+            any_word = set.union(*word_matches) - taken - all_words
+            positions += heapq.nsmallest(count - len(positions), any_word)
+        return positions
+
+    def _name_rank_table(self) -> Sequence[int]:
+        """Posição na tabela de nomes ordenada de cada cidade (calculada uma única vez se não veio pronta)"""
+        if self._name_ranks is None:
+            with self._lock:
+                if self._name_ranks is None:
+                    self._name_ranks = name_ranks(self._name_ids)
+        return self._name_ranks
+
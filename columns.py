@@ -0,0 +1,133 @@
+"""
+Tabelas em colunas tipadas para séries de previsão
+"""
+from array import array
+from collections import abc
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+
+def typed_column(values: Sequence, typecode: str = 'd') -> Sequence:
+    """
+    Converte uma lista da API em um vetor numérico compacto
+
+    Args:
+        values: Valores da coluna
+        typecode: Tipo do vetor (módulo array), 'd' para float e 'h' para inteiros
+
+    Returns:
+        array com os valores ou a própria lista se houver valores nulos
+        ou incompatíveis com o tipo
+    """
+    try:
+        return array(typecode, values)
+    except (TypeError, OverflowError):
+        return values
+
+
+def map_column(values: Sequence, mapping: Mapping, default: Any = None) -> List:
+    """
+    Traduz uma coluna de códigos consultando o mapeamento uma vez por código distinto
+
+    Args:
+        values: Coluna de códigos
+        mapping: Dicionário código -> valor
+        default: Valor para códigos ausentes do mapeamento
+
+    Returns:
+        Lista com os valores traduzidos
+    """
+    translated = {value: mapping.get(value, default) for value in set(values)}
+    return list(map(translated.__getitem__, values))
+
+
+class ColumnTable(abc.Sequence):
+    """
+    Sequência de linhas (dicionários) guardada como colunas
+
+    As linhas só são montadas quando acessadas. Fatias retornam uma nova
+    tabela que compartilha as mesmas colunas, sem copiá-las.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence], start: int = 0, stop: Optional[int] = None):
+        """
+        Args:
+            columns: Colunas por nome, todas com o mesmo tamanho
+            start: Primeira linha visível
+            stop: Linha final (exclusiva) visível; None usa o tamanho das colunas
+        """
+        self._columns = columns
+        length = min((len(column) for column in columns.values()), default=0)
+        self._stop = length if stop is None else min(stop, length)
+        self._start = min(start, self._stop)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict]) -> 'ColumnTable':
+        """
+        Cria uma tabela a partir de uma lista de linhas
+
+        Args:
+            rows: Linhas com as mesmas chaves (as da primeira linha definem as colunas)
+
+        Returns:
+            ColumnTable com uma lista por coluna
+        """
+        if isinstance(rows, ColumnTable):
+            return rows
+        names = list(rows[0]) if rows else []
+        return cls({name: [row.get(name) for row in rows] for name in names})
+
+    @property
+    def names(self) -> List[str]:
+        """Nomes das colunas, na ordem das chaves de cada linha"""
+        return list(self._columns)
+
+    def column(self, name: str) -> Sequence:
+        """
+        Obtém uma coluna restrita às linhas visíveis
+
+        Args:
+            name: Nome da coluna
+
+        Returns:
+            Sequência com os valores da coluna
+        """
+        return self._columns[name][self._start:self._stop]
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return ColumnTable(self._columns, self._start + start, self._start + stop)
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('índice fora da tabela')
+        row = self._start + index
+        return {name: column[row] for name, column in self._columns.items()}
+
+    def __iter__(self) -> Iterator[Dict]:
+        names = self.names
+        columns = [column[self._start:self._stop] for column in self._columns.values()]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, abc.Sequence) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ColumnTable({self.names}, linhas={len(self)})"
+
+    def to_rows(self) -> List[Dict]:
+        """Monta a lista de linhas (para serialização)"""
+        return list(self)
+
+    def to_columns(self) -> Dict[str, List]:
+        """Monta o dicionário coluna -> lista de valores (para serialização)"""
+        return {name: list(self.column(name)) for name in self._columns}
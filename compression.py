@@ -0,0 +1,124 @@
+"""
+Compressão das respostas (gzip/brotli) negociada pelo cabeçalho Accept-Encoding
+"""
+import gzip
+from typing import List, Optional
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # Brotli é opcional; sem ele só gzip é oferecido
+    brotli = None
+
+
+class Compression:
+    """Compressão de respostas aplicada depois de cada requisição"""
+
+    # Respostas menores que isso (em bytes) não compensam a compressão
+    MIN_SIZE = 500
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+
+    COMPRESSIBLE_MIMETYPES = {
+        'application/json',
+        'application/javascript',
+        'application/msgpack',
+        'application/xml',
+        'image/svg+xml',
+        'text/css',
+        'text/html',
+        'text/javascript',
+        'text/plain',
+    }
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """Registra a compressão no aplicativo"""
+        app.after_request(cls.compress_response)
+
+    @classmethod
+    def available_encodings(cls) -> List[str]:
+        """Codificações suportadas, da preferida para a menos preferida"""
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    @staticmethod
+    def encoded_etag(etag: str, encoding: str) -> str:
+        """ETag da representação comprimida (cada codificação tem o seu)"""
+        return f"{etag}-{encoding}"
+
+    @classmethod
+    def etag_variants(cls, etag: str) -> List[str]:
+        """ETags que uma resposta pode ter depois da compressão: o original e um por codificação"""
+        return [etag] + [cls.encoded_etag(etag, encoding) for encoding in cls.available_encodings()]
+
+    @classmethod
+    def compress(cls, data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+        """
+        Comprime um conteúdo
+
+        Args:
+            data: Conteúdo original
+            encoding: 'br' ou 'gzip'
+            level: Nível de compressão (padrão: BROTLI_QUALITY ou GZIP_LEVEL)
+
+        Returns:
+            Conteúdo comprimido
+        """
+        if encoding == 'br':
+            return brotli.compress(data, quality=cls.BROTLI_QUALITY if level is None else level)
+        return gzip.compress(data, compresslevel=cls.GZIP_LEVEL if level is None else level, mtime=0)
+
+    @classmethod
+    def compress_response(cls, response: Response) -> Response:
+        """
+        Comprime a resposta se o cliente aceitar e valer a pena
+
+        Args:
+            response: Resposta gerada pela rota
+
+        Returns:
+            A mesma resposta, comprimida ou não
+        """
+        if (response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in cls.COMPRESSIBLE_MIMETYPES):
+            return response
+
+        # Respostas em fluxo (eventos, por exemplo) não podem ser bufferizadas;
+        # arquivos estáticos (direct_passthrough) são lidos por inteiro
+        if response.is_streamed and not response.direct_passthrough:
+            return response
+
+        # A rota já escolheu a codificação (arquivos estáticos pré-comprimidos)
+        if 'Accept-Encoding' in response.vary:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(cls.available_encodings())
+        if encoding is None:
+            return response
+
+        if response.content_length is not None and response.content_length < cls.MIN_SIZE:
+            return response
+
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < cls.MIN_SIZE:
+            return response
+
+        compressed = cls.compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # Intervalos de bytes se referem ao arquivo original, não ao comprimido
+        response.headers.pop('Accept-Ranges', None)
+
+        # Cada codificação é uma representação diferente, com ETag próprio
+        etag, weak = response.get_etag()
+        if etag is not None:
+            response.set_etag(cls.encoded_etag(etag, encoding), weak=weak)
+
+        return response
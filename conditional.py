@@ -0,0 +1,35 @@
+"""
+Respostas condicionais (304 Not Modified) a partir do ETag final da resposta
+"""
+from flask import Flask, Response, request
+
+
+class ConditionalGet:
+    """Responde 304 quando o If-None-Match do cliente coincide com o ETag"""
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registra a verificação no aplicativo
+
+        Deve ser registrada antes dos ganchos que alteram o ETag (como a
+        compressão), pois o Flask executa os after_request em ordem inversa.
+        """
+        app.after_request(cls.evaluate)
+
+    @classmethod
+    def evaluate(cls, response: Response) -> Response:
+        """
+        Converte a resposta em 304 se o cliente já tiver esta versão
+
+        Args:
+            response: Resposta gerada pela rota
+
+        Returns:
+            A mesma resposta, possivelmente como 304 sem corpo
+        """
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return response
+        if response.get_etag()[0] is None or not request.if_none_match:
+            return response
+        return response.make_conditional(request)
@@ -9,6 +9,36 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.main import app
+from src.models.geocache import PersistentCache
+from src.models.geocoding import GeocodingService
+from src.models.rate_limiter import RateLimiter
+from src.models.weather import WeatherService
+
+
+@pytest.fixture(autouse=True)
+def limpar_caches():
+    """Garante que cada teste comece com os caches vazios"""
+    WeatherService.clear_cache()
+    WeatherService._circuit.reset()
+    yield
+    WeatherService.clear_cache()
+    WeatherService._circuit.reset()
+
+
+@pytest.fixture(autouse=True)
+def cache_geocodificacao(tmp_path, monkeypatch):
+    """Usa um cache persistente de geocodificação vazio e temporário em cada teste"""
+    cache = PersistentCache(str(tmp_path / 'geocoding_cache.sqlite3'))
+    monkeypatch.setattr(GeocodingService, '_persistent_cache', cache)
+    yield cache
+
+
+@pytest.fixture(autouse=True)
+def limitador_nominatim(monkeypatch):
+    """Usa um limitador do Nominatim novo e sem espera em cada teste"""
+    limiter = RateLimiter(rate=1000, burst=1000)
+    monkeypatch.setattr(GeocodingService, '_nominatim_limiter', limiter)
+    yield limiter
 
 
 @pytest.fixture
@@ -0,0 +1,358 @@
+"""
+Base local de cidades (gazetteer) em formato binário compacto mapeado em memória
+
+O arquivo guarda as cidades em colunas (coordenadas em float32, textos em
+blocos UTF-8 com tabelas de deslocamento) e já traz os índices ordenados de
+nomes e palavras, com a inversa do índice de nomes, e a grade espacial da
+busca reversa. Ao abrir, nada é copiado: o arquivo é mapeado com mmap e
+as colunas são lidas diretamente das páginas do sistema operacional, que
+são compartilhadas entre os processos de trabalho.
+
+Para gerar o arquivo a partir de uma exportação do GeoNames (cities500.txt,
+cities15000.txt etc.):
+
+    python -m src.models.gazetteer cities500.txt gazetteer.bin --admin1 admin1CodesASCII.txt
+"""
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from collections import abc
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from src.models.city_index import CityIndex, name_ranks, normalize_text
+from src.models.geocoding import Location
+from src.models.spatial_index import GridIndex, grid_cells
+
+
+MAGIC = b'GZT1'
+VERSION = 3
+
+# Seções do arquivo, na ordem em que são gravadas
+SECTIONS = (
+    'latitudes', 'longitudes',
+    'label_offsets', 'labels',
+    'name_offsets', 'names', 'name_ids', 'name_ranks',
+    'word_offsets', 'words', 'word_ids',
+    'cell_size', 'cell_keys', 'cell_offsets', 'cell_ids',
+)
+
+# Cabeçalho: magic, versão, número de cidades, número de palavras
+HEADER = struct.Struct('<4sIII')
+# Cada seção: deslocamento e tamanho em bytes
+SECTION_ENTRY = struct.Struct('<QQ')
+
+# Separador dos campos do rótulo (nome, estado, país)
+LABEL_SEPARATOR = '\x1f'
+
+# Tamanho, em graus, das células da grade espacial gravada no arquivo
+CELL_SIZE = 0.5
+
+
+class CityRow(NamedTuple):
+    """Linha de entrada para a construção do gazetteer"""
+    name: str
+    latitude: float
+    longitude: float
+    state: str = ""
+    country: str = ""
+    population: int = 0
+
+
+class _StringTable(abc.Sequence):
+    """Sequência de textos UTF-8 lidos sob demanda de um bloco de bytes"""
+
+    def __init__(self, offsets: Sequence[int], blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+
+class _BytesTable(_StringTable):
+    """Como _StringTable, mas devolve os bytes sem decodificar (para a busca binária)"""
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+
+class _LocationTable(abc.Sequence):
+    """Sequência de Location criadas sob demanda a partir das colunas"""
+
+    def __init__(self, gazetteer: 'Gazetteer'):
+        self._gazetteer = gazetteer
+
+    def __len__(self) -> int:
+        return len(self._gazetteer)
+
+    def __getitem__(self, row: int) -> Location:
+        return self._gazetteer.location(row)
+
+
+class Gazetteer:
+    """Tabela de cidades mapeada em memória com busca por prefixo"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Caminho do arquivo gerado por build_gazetteer
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, rows, words = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Arquivo de gazetteer inválido: {path}")
+
+        sections = {}
+        position = HEADER.size
+        for name in SECTIONS:
+            offset, length = SECTION_ENTRY.unpack_from(self._buffer, position)
+            sections[name] = self._buffer[offset:offset + length]
+            position += SECTION_ENTRY.size
+
+        self._rows = rows
+        self.latitudes = self._numbers(sections['latitudes'], 'f')
+        self.longitudes = self._numbers(sections['longitudes'], 'f')
+        self._labels = _StringTable(self._numbers(sections['label_offsets'], 'I'), sections['labels'])
+
+        self.index = CityIndex.from_tables(
+            name_keys=_BytesTable(self._numbers(sections['name_offsets'], 'I'), sections['names']),
+            name_ids=self._numbers(sections['name_ids'], 'I'),
+            word_keys=_BytesTable(self._numbers(sections['word_offsets'], 'I'), sections['words']),
+            word_ids=self._numbers(sections['word_ids'], 'I'),
+            locations=_LocationTable(self),
+            encoding='utf-8',
+            name_ranks=self._numbers(sections['name_ranks'], 'I')
+        )
+        self.spatial_index = GridIndex.from_tables(
+            self.latitudes, self.longitudes,
+            cell_keys=self._numbers(sections['cell_keys'], 'q'),
+            cell_offsets=self._numbers(sections['cell_offsets'], 'I'),
+            cell_ids=self._numbers(sections['cell_ids'], 'I'),
+            cell_size=self._numbers(sections['cell_size'], 'd')[0]
+        )
+
+    @staticmethod
+    def _numbers(section: memoryview, typecode: str) -> Sequence:
+        """Interpreta uma seção como vetor numérico (little-endian)"""
+        if sys.byteorder == 'little':
+            return section.cast(typecode)
+        # Em máquinas big-endian é preciso copiar para inverter os bytes
+        values = array(typecode, section.tobytes())
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def location(self, row: int) -> Location:
+        """
+        Monta a Location de uma linha da tabela
+
+        Args:
+            row: Posição da cidade (0 é a mais populosa)
+
+        Returns:
+            Location correspondente
+        """
+        name, state, country = self._labels[row].split(LABEL_SEPARATOR)
+        return Location(
+            name=f"{name}, {state}" if state else name,
+            latitude=round(self.latitudes[row], 4),
+            longitude=round(self.longitudes[row], 4),
+            country=country,
+            state=state
+        )
+
+    def search(self, query: str, limit: int = 5) -> List[Location]:
+        """
+        Busca cidades por prefixo do nome ou das palavras, sem acentos
+
+        Args:
+            query: Termo de busca
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de localizações, das mais relevantes e populosas para as menos
+        """
+        return self.index.search(query, limit)
+
+    def close(self) -> None:
+        """Libera o mapeamento do arquivo"""
+        # As visões precisam ser liberadas antes de fechar o mmap
+        self.index = self.spatial_index = None
+        self.latitudes = self.longitudes = self._labels = None
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Ainda há visões em uso; o mapeamento será liberado pelo coletor
+            pass
+        self._file.close()
+
+
+def _to_bytes(values: array) -> bytes:
+    """Serializa um vetor numérico em little-endian"""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _string_section(texts: Iterable[str]):
+    """Monta o bloco UTF-8 e a tabela de deslocamentos de uma lista de textos"""
+    offsets = array('I', [0])
+    blob = bytearray()
+    for text in texts:
+        blob += text.encode('utf-8')
+        offsets.append(len(blob))
+    return _to_bytes(offsets), bytes(blob)
+
+
+def build_gazetteer(rows: Iterable[CityRow], path: str) -> int:
+    """
+    Gera o arquivo binário do gazetteer
+
+    As cidades são ordenadas por população (decrescente), de modo que a
+    posição de cada linha também define a prioridade nos resultados.
+
+    Args:
+        rows: Cidades a incluir
+        path: Caminho do arquivo de saída
+
+    Returns:
+        Número de cidades gravadas
+    """
+    cities = sorted(rows, key=lambda row: (-row.population, row.name))
+
+    names = []
+    words = []
+    for position, city in enumerate(cities):
+        key = normalize_text(city.name)
+        names.append((key, position))
+        for word in set(key.split()):
+            words.append((word, position))
+    names.sort()
+    words.sort()
+    name_ids = array('I', (position for _, position in names))
+
+    label_offsets, labels = _string_section(
+        LABEL_SEPARATOR.join((city.name, city.state, city.country)) for city in cities
+    )
+    name_offsets, name_blob = _string_section(key for key, _ in names)
+    word_offsets, word_blob = _string_section(word for word, _ in words)
+
+    latitudes = array('f', (city.latitude for city in cities))
+    longitudes = array('f', (city.longitude for city in cities))
+    # Calculada com as coordenadas já em float32, exatamente como são lidas do arquivo
+    cell_keys, cell_offsets, cell_ids = grid_cells(latitudes, longitudes, CELL_SIZE)
+
+    payloads = {
+        'latitudes': _to_bytes(latitudes),
+        'longitudes': _to_bytes(longitudes),
+        'label_offsets': label_offsets,
+        'labels': labels,
+        'name_offsets': name_offsets,
+        'names': name_blob,
+        'name_ids': _to_bytes(name_ids),
+        # Usada pela busca por prefixos curtos; gravada para não ser recalculada em cada processo
+        'name_ranks': _to_bytes(name_ranks(name_ids)),
+        'word_offsets': word_offsets,
+        'words': word_blob,
+        'word_ids': _to_bytes(array('I', (position for _, position in words))),
+        'cell_size': _to_bytes(array('d', [CELL_SIZE])),
+        'cell_keys': _to_bytes(cell_keys),
+        'cell_offsets': _to_bytes(cell_offsets),
+        'cell_ids': _to_bytes(cell_ids),
+    }
+
+    with open(path, 'wb') as output:
+        position = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+        table = []
+        for name in SECTIONS:
+            # Alinhar cada seção em 8 bytes
+            position += -position % 8
+            table.append((position, len(payloads[name])))
+            position += len(payloads[name])
+
+        output.write(HEADER.pack(MAGIC, VERSION, len(cities), len(words)))
+        for offset, length in table:
+            output.write(SECTION_ENTRY.pack(offset, length))
+        for name, (offset, _) in zip(SECTIONS, table):
+            output.write(b'\0' * (offset - output.tell()))
+            output.write(payloads[name])
+
+    return len(cities)
+
+
+def read_admin1_names(path: str) -> Dict[str, str]:
+    """
+    Lê o arquivo admin1CodesASCII.txt do GeoNames
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Dicionário 'PAÍS.CÓDIGO' -> nome do estado/província
+    """
+    names = {}
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) >= 2:
+                names[fields[0]] = fields[1]
+    return names
+
+
+def read_geonames(path: str, admin1_names: Optional[Dict[str, str]] = None) -> Iterator[CityRow]:
+    """
+    Lê uma exportação de cidades do GeoNames (formato TSV)
+
+    Args:
+        path: Caminho do arquivo (cities500.txt, cities15000.txt, ...)
+        admin1_names: Nomes dos estados por 'PAÍS.CÓDIGO' (opcional)
+
+    Returns:
+        Iterador de CityRow
+    """
+    admin1_names = admin1_names or {}
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 15:
+                continue
+            try:
+                country = fields[8]
+                yield CityRow(
+                    name=fields[1],
+                    latitude=float(fields[4]),
+                    longitude=float(fields[5]),
+                    state=admin1_names.get(f"{country}.{fields[10]}", ''),
+                    country=country,
+                    population=int(fields[14] or 0)
+                )
+            except ValueError:
+                continue
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera o arquivo binário do gazetteer a partir do GeoNames')
+    parser.add_argument('source', help='Arquivo de cidades do GeoNames (TSV)')
+    parser.add_argument('output', help='Arquivo binário de saída')
+    parser.add_argument('--admin1', help='Arquivo admin1CodesASCII.txt para nomes de estados')
+    args = parser.parse_args()
+
+    admin1 = read_admin1_names(args.admin1) if args.admin1 else None
+    total = build_gazetteer(read_geonames(args.source, admin1), args.output)
+    print(f"{total} cidades gravadas em {args.output}")
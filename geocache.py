@@ -0,0 +1,141 @@
+"""
+Cache persistente em SQLite para resultados de geocodificação
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class PersistentCache:
+    """Cache chave/valor em SQLite (modo WAL) compartilhado entre processos"""
+
+    # Intervalo, em gravações, entre as limpezas de entradas antigas
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, default_ttl: float = 30 * 24 * 3600, max_entries: int = 100000):
+        """
+        Args:
+            path: Caminho do arquivo SQLite
+            default_ttl: Tempo de vida padrão das entradas, em segundos
+            max_entries: Número máximo de entradas mantidas no arquivo
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Obtém a conexão da thread atual, criando o banco se necessário"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, count: bool = True) -> Optional[Any]:
+        """
+        Obtém um valor do cache
+
+        Args:
+            key: Chave da entrada
+            count: Contar a consulta nos acertos e ausências (falso quando o
+                chamador conta o resultado final com record)
+
+        Returns:
+            Valor armazenado (decodificado de JSON) ou None se ausente, expirado ou em caso de erro
+        """
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Erro ao ler cache de geocodificação: {e}")
+            return None
+
+        if count:
+            self.record(row is not None)
+        return None if row is None else json.loads(row[0])
+
+    def record(self, hit: bool) -> None:
+        """Conta o resultado de uma consulta feita com count=False"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor serializável em JSON
+
+        Args:
+            key: Chave da entrada
+            value: Valor a armazenar
+            ttl: Tempo de vida em segundos (padrão: default_ttl)
+        """
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now, expires_at)
+            )
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar cache de geocodificação: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove entradas expiradas e as mais antigas além de max_entries"""
+        try:
+            connection = self._connection()
+            connection.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+            connection.execute(
+                'DELETE FROM cache WHERE key IN ('
+                ' SELECT key FROM cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+        except sqlite3.Error as e:
+            print(f"Erro ao limpar cache de geocodificação: {e}")
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        try:
+            self._connection().execute('DELETE FROM cache')
+        except sqlite3.Error as e:
+            print(f"Erro ao limpar cache de geocodificação: {e}")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Retorna os contadores de uso do cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses
+            }
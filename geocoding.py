@@ -1,9 +1,17 @@
 """
 Serviço de geocodificação para busca de cidades
 """
-import requests
+import asyncio
+import os
+import httpx
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from src.models.city_index import CityIndex, normalize_text
+from src.models.geocache import PersistentCache
+from src.models.rate_limiter import RateLimiter
+from src.models.http_client import AsyncHttpClient
+from src.models.singleflight import SingleFlight
+from src.models.spatial_index import GridIndex
 
 
 @dataclass
@@ -29,6 +37,16 @@ class Location:
 class GeocodingService:
     """Serviço de geocodificação usando APIs gratuitas"""
     
+    # Endereços das APIs (configuráveis para apontar para um servidor local nos testes de carga)
+    OPEN_METEO_GEOCODING_BASE_URL = os.environ.get(
+        'OPEN_METEO_GEOCODING_BASE_URL', "https://geocoding-api.open-meteo.com/v1"
+    ).rstrip('/')
+    OPEN_METEO_GEOCODING_URL = f"{OPEN_METEO_GEOCODING_BASE_URL}/search"
+    NOMINATIM_BASE_URL = os.environ.get('NOMINATIM_BASE_URL', "https://nominatim.openstreetmap.org").rstrip('/')
+    
+    # Consultas idênticas em andamento são compartilhadas entre threads
+    _inflight = SingleFlight()
+    
     # Cidades brasileiras pré-definidas para fallback
     BRAZILIAN_CITIES = {
         'são paulo': Location('São Paulo, SP', -23.5505, -46.6333, 'Brasil', 'SP'),
@@ -86,6 +104,39 @@ class GeocodingService:
         'vitória': Location('Vitória, ES', -20.3155, -40.3128, 'Brasil', 'ES'),
     }
     
+    # Índice de busca local, construído sob demanda
+    _city_index: Optional[CityIndex] = None
+    
+    # Distância máxima para responder a geocodificação reversa localmente
+    REVERSE_MAX_DISTANCE_KM = 10
+    _spatial_indexes = None
+    
+    # Cache persistente dos resultados das APIs de geocodificação ('' desativa)
+    GEOCODING_CACHE_PATH = os.environ.get(
+        'GEOCODING_CACHE_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'geocoding_cache.sqlite3')
+    )
+    GEOCODING_CACHE_TTL = 30 * 24 * 3600
+    GEOCODING_NEGATIVE_TTL = 24 * 3600
+    GEOCODING_CACHE_MAX_ENTRIES = 100000
+    _persistent_cache: Optional[PersistentCache] = None
+    
+    # Limite de uso do Nominatim (cerca de 1 requisição por segundo). Com
+    # NOMINATIM_RATE_STATE_PATH o limite é dividido entre os processos.
+    NOMINATIM_RATE = float(os.environ.get('NOMINATIM_RATE', '1'))
+    NOMINATIM_MAX_QUEUE = 10
+    # Espera máxima pela vez antes de desistir da requisição
+    NOMINATIM_MAX_WAIT = 3
+    _nominatim_limiter = RateLimiter(
+        rate=NOMINATIM_RATE,
+        max_queue=NOMINATIM_MAX_QUEUE,
+        state_path=os.environ.get('NOMINATIM_RATE_STATE_PATH') or None
+    )
+    
+    # Base de cidades offline (arquivo gerado por src.models.gazetteer)
+    GAZETTEER_PATH = os.environ.get('GAZETTEER_PATH', '')
+    _gazetteer = None
+    
     @classmethod
     def search_locations(cls, query: str, limit: int = 5) -> List[Location]:
         """
@@ -98,26 +149,18 @@ class GeocodingService:
         Returns:
             Lista de localizações encontradas
         """
-        query_lower = query.lower().strip()
-        results = []
-        
-        # Buscar nas cidades brasileiras pré-definidas
-        for city_key, location in cls.BRAZILIAN_CITIES.items():
-            if query_lower in city_key or city_key.startswith(query_lower):
-                results.append(location)
-                if len(results) >= limit:
-                    break
+        # Buscar nas cidades brasileiras pré-definidas (sem acentos, por prefixo)
+        results = cls._get_city_index().search(query, limit)
         
-        # Se não encontrou resultados suficientes, tentar busca mais flexível
-        if len(results) < limit:
-            for city_key, location in cls.BRAZILIAN_CITIES.items():
-                if any(word in city_key for word in query_lower.split()) and location not in results:
+        # Completar com a base offline, ignorando cidades já encontradas
+        gazetteer = cls._get_gazetteer()
+        if gazetteer is not None and len(results) < limit:
+            for location in gazetteer.search(query, limit):
+                if not any(cls._same_place(location, found) for found in results):
                     results.append(location)
-                    if len(results) >= limit:
-                        break
         
         # Tentar geocodificação online como fallback (usando Nominatim)
-        if len(results) == 0:
+        if len(results) == 0 and query.strip():
             try:
                 online_results = cls._search_nominatim(query, limit)
                 results.extend(online_results)
@@ -126,11 +169,127 @@ class GeocodingService:
         
         return results[:limit]
     
+    @classmethod
+    def _get_city_index(cls) -> CityIndex:
+        """Obtém o índice das cidades pré-definidas, construindo-o na primeira chamada"""
+        if cls._city_index is None:
+            cls._city_index = CityIndex(cls.BRAZILIAN_CITIES.items())
+        return cls._city_index
+    
+    @classmethod
+    def _get_gazetteer(cls):
+        """
+        Obtém a base offline de cidades, abrindo o arquivo na primeira chamada
+        
+        Returns:
+            Gazetteer ou None se GAZETTEER_PATH não estiver configurado
+        """
+        if cls._gazetteer is None and cls.GAZETTEER_PATH:
+            from src.models.gazetteer import Gazetteer
+            try:
+                cls._gazetteer = Gazetteer(cls.GAZETTEER_PATH)
+                print(f"Gazetteer carregado: {len(cls._gazetteer)} cidades")
+            except (OSError, ValueError) as e:
+                print(f"Erro ao carregar gazetteer: {e}")
+                cls.GAZETTEER_PATH = ''
+        return cls._gazetteer
+    
+    @classmethod
+    def collect_metrics(cls) -> List[tuple]:
+        """
+        Amostras para o endpoint /metrics (cache persistente, limitador do Nominatim
+        e chamadas em andamento)
+        
+        Returns:
+            Lista de tuplas (nome, tipo, ajuda, [(rótulos, valor), ...])
+        """
+        samples = []
+        cache = cls._persistent_cache
+        if cache is not None:
+            stats = cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            samples += [
+                ('weather_cache_lookups_total', 'counter', 'Consultas aos caches, por resultado', [
+                    ({'cache': 'geocoding', 'result': 'hit'}, stats['hits']),
+                    ({'cache': 'geocoding', 'result': 'miss'}, stats['misses'])
+                ]),
+                ('weather_cache_hit_ratio', 'gauge', 'Fração das consultas atendidas pelo cache', [
+                    ({'cache': 'geocoding'}, stats['hits'] / lookups if lookups else 0)
+                ])
+            ]
+        
+        limiter = cls._nominatim_limiter.stats()
+        samples += [
+            ('weather_rate_limiter_waiting', 'gauge', 'Chamadas aguardando vez no limitador de taxa', [
+                ({'provider': 'nominatim'}, limiter['waiting'])
+            ]),
+            ('weather_rate_limiter_rejected_total', 'counter', 'Chamadas recusadas pelo limitador de taxa', [
+                ({'provider': 'nominatim'}, limiter['rejected'])
+            ]),
+            ('weather_upstream_in_flight', 'gauge', 'Chamadas distintas às APIs externas em andamento', [
+                ({'provider': 'geocoding'}, cls._inflight.in_flight())
+            ])
+        ]
+        return samples
+    
+    @classmethod
+    def _get_persistent_cache(cls) -> Optional[PersistentCache]:
+        """
+        Obtém o cache persistente de geocodificação, criando-o na primeira chamada
+        
+        Returns:
+            PersistentCache ou None se GEOCODING_CACHE_PATH estiver vazio
+        """
+        if cls._persistent_cache is None and cls.GEOCODING_CACHE_PATH:
+            cls._persistent_cache = PersistentCache(
+                cls.GEOCODING_CACHE_PATH,
+                default_ttl=cls.GEOCODING_CACHE_TTL,
+                max_entries=cls.GEOCODING_CACHE_MAX_ENTRIES
+            )
+        return cls._persistent_cache
+    
+    @staticmethod
+    def _same_place(a: Location, b: Location, tolerance: float = 0.1) -> bool:
+        """Verifica se duas localizações representam a mesma cidade"""
+        return abs(a.latitude - b.latitude) < tolerance and abs(a.longitude - b.longitude) < tolerance
+    
     @classmethod
     def _search_nominatim(cls, query: str, limit: int = 5) -> List[Location]:
         """
         Busca usando a API Nominatim (OpenStreetMap)
         
+        Args:
+            query: Termo de busca
+            limit: Número máximo de resultados
+            
+        Returns:
+            Lista de localizações encontradas
+        """
+        cache_key = f"nominatim:search:{normalize_text(query)}:{limit}"
+        cache = cls._get_persistent_cache()
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            return [Location(**item) for item in cached]
+        
+        return list(AsyncHttpClient.run(
+            cls._inflight.do_async(cache_key, cls._load_nominatim_search_async, cache_key, query, limit)))
+    
+    @classmethod
+    async def _load_nominatim_search_async(cls, cache_key: str, query: str, limit: int) -> List[Location]:
+        """Consulta o Nominatim e grava os resultados no cache persistente"""
+        results = await cls._request_nominatim_search_async(query, limit)
+        
+        # Lista vazia também indica erro na requisição, então não é armazenada
+        cache = cls._get_persistent_cache()
+        if results and cache is not None:
+            cache.set(cache_key, [asdict(location) for location in results], cls.GEOCODING_CACHE_TTL)
+        return results
+    
+    @classmethod
+    async def _request_nominatim_search_async(cls, query: str, limit: int) -> List[Location]:
+        """
+        Executa a requisição de busca ao Nominatim
+        
         Args:
             query: Termo de busca
             limit: Número máximo de resultados
@@ -139,7 +298,7 @@ class GeocodingService:
             Lista de localizações encontradas
         """
         try:
-            url = "https://nominatim.openstreetmap.org/search"
+            url = f"{cls.NOMINATIM_BASE_URL}/search"
             params = {
                 'q': query,
                 'format': 'json',
@@ -152,7 +311,13 @@ class GeocodingService:
                 'User-Agent': 'WeatherApp/1.0 (Educational Project)'
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=5)
+            # A espera pela vez bloqueia, então roda fora do event loop
+            if not await asyncio.to_thread(cls._nominatim_limiter.acquire, timeout=cls.NOMINATIM_MAX_WAIT):
+                print("Limite de requisições ao Nominatim atingido")
+                return []
+            
+            response = await AsyncHttpClient.get(url, params=params, headers=headers,
+                                                 timeout=AsyncHttpClient.NOMINATIM_TIMEOUT, provider='nominatim-search')
             response.raise_for_status()
             
             data = response.json()
@@ -212,7 +377,7 @@ class GeocodingService:
             
             return results
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Erro na requisição para Nominatim: {e}")
             return []
         except Exception as e:
@@ -224,6 +389,93 @@ class GeocodingService:
         """
         Obtém informações de localização baseadas em coordenadas (geocodificação reversa)
         
+        Args:
+            lat: Latitude
+            lon: Longitude
+            
+        Returns:
+            Location ou None se não encontrar
+        """
+        # Usar a cidade conhecida mais próxima, se estiver perto o suficiente
+        nearby = cls._nearest_known_city(lat, lon)
+        if nearby is not None:
+            return Location(
+                name=nearby.name,
+                latitude=lat,
+                longitude=lon,
+                country=nearby.country,
+                state=nearby.state
+            )
+        
+        # Coordenadas arredondadas (~100 m) compartilham o mesmo resultado
+        cache_key = f"nominatim:reverse:{lat:.3f},{lon:.3f}"
+        cache = cls._get_persistent_cache()
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            return Location(**dict(cached, latitude=lat, longitude=lon))
+        
+        return AsyncHttpClient.run(
+            cls._inflight.do_async(cache_key, cls._load_nominatim_reverse_async, cache_key, lat, lon))
+    
+    @classmethod
+    async def _load_nominatim_reverse_async(cls, cache_key: str, lat: float, lon: float) -> Optional[Location]:
+        """Consulta o Nominatim e grava o resultado no cache persistente"""
+        location = await cls._request_nominatim_reverse_async(lat, lon)
+        
+        cache = cls._get_persistent_cache()
+        if location is not None and cache is not None:
+            cache.set(cache_key, asdict(location), cls.GEOCODING_CACHE_TTL)
+        return location
+    
+    @classmethod
+    def _nearest_known_city(cls, lat: float, lon: float) -> Optional[Location]:
+        """
+        Busca a cidade conhecida mais próxima (pré-definidas e base offline)
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            
+        Returns:
+            Location da cidade ou None se nenhuma estiver a até REVERSE_MAX_DISTANCE_KM
+        """
+        best = None
+        best_distance = None
+        for index, get_location in cls._get_spatial_indexes():
+            match = index.nearest(lat, lon, cls.REVERSE_MAX_DISTANCE_KM)
+            if match is not None and (best_distance is None or match[1] < best_distance):
+                best = get_location(match[0])
+                best_distance = match[1]
+        return best
+    
+    @classmethod
+    def _get_spatial_indexes(cls) -> List[tuple]:
+        """
+        Obtém os índices espaciais das cidades conhecidas, construindo-os na primeira chamada
+        
+        Returns:
+            Lista de pares (GridIndex, função que devolve a Location de uma posição)
+        """
+        if cls._spatial_indexes is None:
+            cities = list(cls.BRAZILIAN_CITIES.values())
+            indexes = [(
+                GridIndex([city.latitude for city in cities], [city.longitude for city in cities]),
+                cities.__getitem__
+            )]
+            
+            # A grade do gazetteer já vem pronta do arquivo, sem percorrer todas as cidades
+            gazetteer = cls._get_gazetteer()
+            if gazetteer is not None:
+                indexes.append((gazetteer.spatial_index, gazetteer.location))
+            
+            cls._spatial_indexes = indexes
+        return cls._spatial_indexes
+    
+    @classmethod
+    async def _request_nominatim_reverse_async(cls, lat: float, lon: float) -> Optional[Location]:
+        """
+        Executa a requisição de geocodificação reversa ao Nominatim
+        
         Args:
             lat: Latitude
             lon: Longitude
@@ -232,7 +484,7 @@ class GeocodingService:
             Location ou None se não encontrar
         """
         try:
-            url = "https://nominatim.openstreetmap.org/reverse"
+            url = f"{cls.NOMINATIM_BASE_URL}/reverse"
             params = {
                 'lat': lat,
                 'lon': lon,
@@ -245,7 +497,13 @@ class GeocodingService:
                 'User-Agent': 'WeatherApp/1.0 (Educational Project)'
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=5)
+            # A espera pela vez bloqueia, então roda fora do event loop
+            if not await asyncio.to_thread(cls._nominatim_limiter.acquire, timeout=cls.NOMINATIM_MAX_WAIT):
+                print("Limite de requisições ao Nominatim atingido")
+                return None
+            
+            response = await AsyncHttpClient.get(url, params=params, headers=headers,
+                                                 timeout=AsyncHttpClient.NOMINATIM_TIMEOUT, provider='nominatim-reverse')
             response.raise_for_status()
             
             data = response.json()
@@ -295,10 +553,158 @@ class GeocodingService:
                 state=state_code
             )
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Erro na geocodificação reversa: {e}")
             return None
         except Exception as e:
             print(f"Erro inesperado na geocodificação reversa: {e}")
             return None
-
+    
+    @classmethod
+    def search_cities(cls, query: str, count: int = 10) -> Optional[List[Dict]]:
+        """
+        Busca cidades usando a API de geocodificação da Open-Meteo
+        
+        Args:
+            query: Termo de busca
+            count: Número máximo de resultados
+            
+        Returns:
+            Lista de cidades (dicionários) ou None em caso de erro
+        """
+        cached = cls.get_cached_cities(query, count)
+        if cached is not None:
+            return cached
+        
+        return AsyncHttpClient.run(cls.search_cities_async(query, count))
+    
+    @classmethod
+    def get_cached_cities(cls, query: str, count: int = 10) -> Optional[List[Dict]]:
+        """
+        Resultado de search_cities já gravado no cache persistente, sem consultar a API
+        
+        Na ausência, a consulta é contada por search_cities_async, que consulta a API.
+        
+        Returns:
+            Lista de cidades (dicionários) ou None se não estiver no cache
+        """
+        cache = cls._get_persistent_cache()
+        if cache is None:
+            return None
+        cities = cache.get(cls._open_meteo_cache_key(query, count), count=False)
+        if cities is not None:
+            cache.record(True)
+        return cities
+    
+    @staticmethod
+    def _open_meteo_cache_key(query: str, count: int) -> str:
+        """Chave da busca na Open-Meteo no cache persistente"""
+        return f"open-meteo:search:{normalize_text(query)}:{count}"
+    
+    @classmethod
+    async def search_cities_async(cls, query: str, count: int = 10) -> Optional[List[Dict]]:
+        """
+        Versão assíncrona de search_cities (consulta a API na ausência do cache)
+        
+        Args:
+            query: Termo de busca
+            count: Número máximo de resultados
+            
+        Returns:
+            Lista de cidades (dicionários) ou None em caso de erro
+        """
+        cache_key = cls._open_meteo_cache_key(query, count)
+        cache = cls._get_persistent_cache()
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            return cached
+        
+        return await cls._inflight.do_async(cache_key, cls._load_open_meteo_search_async, cache_key, query, count)
+    
+    @classmethod
+    async def _load_open_meteo_search_async(cls, cache_key: str, query: str, count: int) -> Optional[List[Dict]]:
+        """Consulta a Open-Meteo e grava o resultado no cache persistente"""
+        cities = await cls._request_open_meteo_search_async(query, count)
+        cls._store_open_meteo_search(cache_key, cities)
+        return cities
+    
+    @classmethod
+    def _store_open_meteo_search(cls, cache_key: str, cities: Optional[List[Dict]]) -> None:
+        """Grava o resultado de uma busca na Open-Meteo no cache persistente"""
+        cache = cls._get_persistent_cache()
+        if cities is None or cache is None:
+            return
+        
+        # Buscas sem resultado ficam armazenadas por menos tempo
+        ttl = cls.GEOCODING_CACHE_TTL if cities else cls.GEOCODING_NEGATIVE_TTL
+        cache.set(cache_key, cities, ttl)
+    
+    @classmethod
+    async def _request_open_meteo_search_async(cls, query: str, count: int) -> Optional[List[Dict]]:
+        """
+        Executa a requisição de busca à API de geocodificação da Open-Meteo
+        
+        Args:
+            query: Termo de busca
+            count: Número máximo de resultados
+            
+        Returns:
+            Lista de cidades (dicionários) ou None em caso de erro
+        """
+        try:
+            print(f"Buscando cidades: {query}")
+            
+            response = await AsyncHttpClient.get(cls.OPEN_METEO_GEOCODING_URL,
+                                                 params=cls._open_meteo_params(query, count),
+                                                 timeout=AsyncHttpClient.GEOCODING_TIMEOUT,
+                                                 provider='open-meteo-geocoding')
+            response.raise_for_status()
+            
+            return cls._parse_open_meteo_cities(response.json())
+            
+        except httpx.HTTPError as e:
+            print(f"Erro na requisição de geocoding: {e}")
+            return None
+    
+    @staticmethod
+    def _open_meteo_params(query: str, count: int) -> Dict:
+        """Monta os parâmetros da busca na API de geocodificação da Open-Meteo"""
+        return {
+            'name': query,
+            'count': count,
+            'language': 'pt',
+            'format': 'json'
+        }
+    
+    @staticmethod
+    def _parse_open_meteo_cities(data: Dict) -> List[Dict]:
+        """
+        Converte a resposta da API de geocodificação da Open-Meteo
+        
+        Args:
+            data: Resposta JSON da API
+            
+        Returns:
+            Lista de cidades com nome completo, coordenadas, país e estado
+        """
+        cities = []
+        for result in data.get('results', []):
+            city = {
+                'name': result.get('name', ''),
+                'lat': result.get('latitude', 0),
+                'lon': result.get('longitude', 0),
+                'country': result.get('country', ''),
+                'admin1': result.get('admin1', ''),  # Estado/província
+            }
+            
+            # Criar nome completo da cidade
+            name_parts = [city['name']]
+            if city['admin1']:
+                name_parts.append(city['admin1'])
+            if city['country']:
+                name_parts.append(city['country'])
+            
+            city['name'] = ', '.join(name_parts)
+            cities.append(city)
+        
+        return cities
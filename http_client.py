@@ -0,0 +1,158 @@
+"""
+Cliente HTTP compartilhado com pool de conexões para as APIs externas
+
+Todas as consultas usam o mesmo event loop e o mesmo pool (httpx); o
+código síncrono chama as funções assíncronas por AsyncHttpClient.run.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+import httpx
+
+from src.models.metrics import Metrics
+
+T = TypeVar('T')
+
+
+def http_error_reason(status_code: int) -> Optional[str]:
+    """Classifica o status HTTP de uma resposta para as métricas de erro"""
+    if status_code == 429:
+        return 'http_429'
+    if status_code >= 500:
+        return 'http_5xx'
+    if status_code >= 400:
+        return 'http_4xx'
+    return None
+
+
+class AsyncHttpClient:
+    """Cliente HTTP assíncrono executado em um único event loop compartilhado
+
+    Todas as requisições são multiplexadas em um event loop mantido em uma
+    thread dedicada, com um único httpx.AsyncClient (conexões keep-alive).
+    O código síncrono (views, lotes, fluxo de eventos) entrega a esse loop,
+    via run, só as consultas que o cache não responde, sem criar um event
+    loop por requisição.
+    """
+
+    # Limite de conexões abertas e conexões mantidas entre requisições
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 20
+
+    # Timeouts (em segundos) centralizados para cada provedor
+    CONNECT_TIMEOUT = 3.05
+    WEATHER_TIMEOUT = 10
+    GEOCODING_TIMEOUT = 10
+    NOMINATIM_TIMEOUT = 5
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _client: Optional[httpx.AsyncClient] = None
+    _thread: Optional[threading.Thread] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        """
+        Obtém o event loop compartilhado, iniciando-o na primeira chamada
+
+        Returns:
+            Event loop em execução na thread dedicada
+        """
+        if cls._loop is None:
+            with cls._lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name='async-http-client', daemon=True)
+                    thread.start()
+                    cls._client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=cls.POOL_CONNECTIONS * cls.POOL_MAXSIZE,
+                            max_keepalive_connections=cls.POOL_MAXSIZE
+                        )
+                    )
+                    cls._thread = thread
+                    cls._loop = loop
+        return cls._loop
+
+    @classmethod
+    async def get(cls, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                  timeout: Optional[float] = None, provider: str = 'other') -> httpx.Response:
+        """
+        Executa uma requisição GET no event loop compartilhado
+
+        Args:
+            url: URL de destino
+            params: Parâmetros da query string
+            headers: Cabeçalhos adicionais
+            timeout: Timeout de leitura em segundos (padrão: WEATHER_TIMEOUT)
+            provider: Nome do provedor usado nas métricas
+
+        Returns:
+            Resposta HTTP
+        """
+        loop = cls.get_loop()
+        coro = cls._get(url, params, headers, timeout, provider)
+
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    @classmethod
+    def run(cls, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Executa uma corrotina no event loop compartilhado e aguarda o resultado
+
+        Ponte para o código síncrono: a thread chamadora só bloqueia
+        esperando o resultado, sem criar um event loop próprio.
+
+        Args:
+            coro: Corrotina a executar
+            timeout: Espera máxima em segundos (None espera indefinidamente)
+
+        Returns:
+            Resultado da corrotina
+        """
+        loop = cls.get_loop()
+        if threading.current_thread() is cls._thread:
+            coro.close()
+            raise RuntimeError("AsyncHttpClient.run não pode ser chamado no event loop compartilhado")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    @classmethod
+    async def _get(cls, url: str, params: Optional[Dict], headers: Optional[Dict],
+                   timeout: Optional[float], provider: str = 'other') -> httpx.Response:
+        """Executa a requisição usando o cliente do event loop compartilhado"""
+        read_timeout = cls.WEATHER_TIMEOUT if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            response = await cls._client.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=httpx.Timeout(read_timeout, connect=cls.CONNECT_TIMEOUT)
+            )
+        except httpx.TimeoutException:
+            Metrics.observe_upstream(provider, time.perf_counter() - start, 'timeout')
+            raise
+        except httpx.HTTPError:
+            Metrics.observe_upstream(provider, time.perf_counter() - start, 'connection')
+            raise
+
+        Metrics.observe_upstream(provider, time.perf_counter() - start, http_error_reason(response.status_code))
+        return response
+
+    @classmethod
+    def close(cls) -> None:
+        """Fecha o cliente assíncrono e encerra o event loop compartilhado"""
+        with cls._lock:
+            if cls._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(cls._client.aclose(), cls._loop).result()
+            cls._loop.call_soon_threadsafe(cls._loop.stop)
+            cls._thread.join()
+            cls._loop.close()
+            cls._loop = None
+            cls._client = None
+            cls._thread = None
@@ -0,0 +1,60 @@
+"""
+Provedor JSON do Flask baseado em orjson
+"""
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Sem orjson, o provedor se comporta como o padrão do Flask
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provedor JSON que serializa com orjson, direto para bytes
+
+    Datas e demais tipos não nativos continuam passando por
+    DefaultJSONProvider.default, então a saída é compatível com a do Flask.
+    Sem orjson instalado (ou para valores que ele não aceita, como inteiros
+    maiores que 64 bits) é usado o json da biblioteca padrão.
+    """
+
+    def _encode(self, obj: Any, indent: bool, sort_keys: bool) -> bytes:
+        """Serializa com orjson (levanta TypeError para valores não suportados)"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serializa para texto JSON"""
+        if orjson is None or kwargs.keys() - {'indent', 'separators', 'sort_keys'}:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj, bool(kwargs.get('indent')),
+                                kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        """Interpreta texto ou bytes JSON"""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Cria a resposta JSON sem a conversão intermediária para str"""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent, self.sort_keys)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,214 @@
+"""
+Publicação de atualizações para clientes conectados (fluxo de eventos)
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class Subscription:
+    """Fila de atualizações de um cliente inscrito em um conjunto de tópicos
+
+    Guarda só a atualização mais recente de cada tópico ainda não entregue,
+    então um cliente lento recebe o estado atual, e não o histórico, e a
+    memória usada é limitada pelo número de tópicos.
+    """
+
+    def __init__(self, topics: Iterable[Hashable]):
+        self.topics: Tuple[Hashable, ...] = tuple(dict.fromkeys(topics))
+        self._pending: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self.closed = False
+
+    def push(self, topic: Hashable, value: Any) -> None:
+        """Enfileira a atualização de um tópico, substituindo a anterior ainda não entregue"""
+        with self._lock:
+            self._pending.pop(topic, None)
+            self._pending[topic] = value
+            self._event.set()
+
+    def get(self, timeout: Optional[float] = None) -> List[Tuple[Hashable, Any]]:
+        """
+        Aguarda e retira as atualizações pendentes
+
+        Args:
+            timeout: Tempo máximo de espera em segundos (None espera indefinidamente)
+
+        Returns:
+            Lista de tuplas (tópico, valor) na ordem de chegada; vazia se o
+            tempo se esgotar ou a inscrição for encerrada
+        """
+        self._event.wait(timeout)
+        with self._lock:
+            self._event.clear()
+            updates = list(self._pending.items())
+            self._pending.clear()
+        return updates
+
+    def close(self) -> None:
+        """Encerra a inscrição e libera quem estiver aguardando em get"""
+        self.closed = True
+        self._event.set()
+
+
+class LiveFeed:
+    """Consulta periodicamente os tópicos com inscritos e publica só o que mudou
+
+    Uma única thread consulta todos os tópicos de uma vez a cada intervalo,
+    não importa quantos clientes estejam inscritos em cada um; o valor só é
+    entregue quando sua versão muda. Um cliente novo recebe na hora o último
+    valor conhecido dos seus tópicos, e tópicos ainda sem valor antecipam a
+    próxima consulta.
+    """
+
+    def __init__(self, fetch: Callable[[List[Hashable]], Sequence[Any]], interval: float,
+                 version: Callable[[Any], Hashable] = lambda value: value, name: str = 'live-feed'):
+        """
+        Args:
+            fetch: Função que recebe a lista de tópicos e retorna os valores
+                na mesma ordem (None para tópicos com erro)
+            interval: Intervalo entre as consultas, em segundos
+            version: Função que extrai do valor o identificador comparado
+                entre consultas
+            name: Nome da thread de consulta
+        """
+        self.fetch = fetch
+        self.interval = interval
+        self.version = version
+        self.name = name
+        self._subscriptions: Set[Subscription] = set()
+        self._topics: Dict[Hashable, Set[Subscription]] = {}
+        # Último valor publicado por tópico: (versão, valor)
+        self._latest: Dict[Hashable, Tuple[Hashable, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.published = 0
+
+    def subscribe(self, topics: Iterable[Hashable]) -> Subscription:
+        """
+        Inscreve um cliente e inicia a thread de consulta, se necessário
+
+        Args:
+            topics: Tópicos de interesse
+
+        Returns:
+            Inscrição com os últimos valores conhecidos já enfileirados
+        """
+        subscription = Subscription(topics)
+        unknown = False
+        with self._lock:
+            self._subscriptions.add(subscription)
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+                latest = self._latest.get(topic)
+                if latest is None:
+                    unknown = True
+                else:
+                    subscription.push(topic, latest[1])
+
+        self.start()
+        if unknown:
+            self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a inscrição; tópicos sem inscritos deixam de ser consultados"""
+        subscription.close()
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+                    self._latest.pop(topic, None)
+
+    def refresh(self) -> int:
+        """
+        Consulta todos os tópicos com inscritos e publica os valores alterados
+
+        Returns:
+            Número de tópicos publicados
+        """
+        with self._lock:
+            topics = list(self._topics)
+        if not topics:
+            return 0
+
+        values = self.fetch(topics)
+        self.refreshes += 1
+
+        published = 0
+        for topic, value in zip(topics, values):
+            if value is None:
+                continue
+            version = self.version(value)
+            with self._lock:
+                subscribers = self._topics.get(topic)
+                # Tópico abandonado durante a consulta ou sem mudança
+                if subscribers is None:
+                    continue
+                latest = self._latest.get(topic)
+                if latest is not None and latest[0] == version:
+                    continue
+                self._latest[topic] = (version, value)
+                targets = list(subscribers)
+            for subscription in targets:
+                subscription.push(topic, value)
+            published += 1
+
+        self.published += published
+        return published
+
+    def start(self) -> None:
+        """Inicia a thread de consulta (uma vez)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Para a thread de consulta (as inscrições continuam registradas)"""
+        self._stopped.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erro ao atualizar o fluxo {self.name}: {e}")
+
+    def subscription_count(self) -> int:
+        """Retorna o número de clientes inscritos"""
+        with self._lock:
+            return len(self._subscriptions)
+
+    def topics(self) -> List[Hashable]:
+        """Retorna os tópicos com inscritos"""
+        with self._lock:
+            return list(self._topics)
+
+    def stats(self) -> Dict:
+        """Retorna inscritos, tópicos e contadores de consultas e publicações"""
+        with self._lock:
+            return {
+                'subscriptions': len(self._subscriptions),
+                'topics': len(self._topics),
+                'refreshes': self.refreshes,
+                'published': self.published
+            }
@@ -3,19 +3,49 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
-from src.routes.weather import weather_bp
+from src.models.assets import StaticAssets
+from src.models.compression import Compression
+from src.models.conditional import ConditionalGet
+from src.models.geocoding import GeocodingService
+from src.models.json_provider import FastJSONProvider
+from src.models.metrics import Metrics
+from src.models.warmup import WarmUp
+from src.routes.weather import WeatherService, weather_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
+# Serialização JSON com orjson
+app.json = FastJSONProvider(app)
+
+# Métricas no formato do Prometheus em /metrics (o after_request registrado
+# primeiro roda por último, então a duração inclui a compressão)
+Metrics.init_app(app)
+Metrics.registry.register_collector(WeatherService.collect_metrics)
+Metrics.registry.register_collector(GeocodingService.collect_metrics)
+
+# Responder 304 a revalidações (registrado antes da compressão para rodar
+# depois dela e comparar com o ETag final)
+ConditionalGet.init_app(app)
+
+# Comprimir respostas (gzip/brotli) conforme o Accept-Encoding do cliente
+Compression.init_app(app)
+
 # Configurar CORS para permitir requisições do frontend
 CORS(app)
 
 # Registrar blueprint das rotas meteorológicas
 app.register_blueprint(weather_bp, url_prefix='/api/weather')
 
+# Aquecimento do cache das cidades mais consultadas (WARMUP_ENABLED=1) e
+# prontidão em /ready
+WarmUp.init_app(app)
+
+# Arquivos do frontend versionados, pré-comprimidos e mantidos em memória
+StaticAssets.init_app(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -23,16 +53,18 @@ def serve(path):
     if static_folder_path is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
-
+    # Caminhos que não são arquivos (rotas do frontend) recebem a página inicial
+    response = StaticAssets.response(path) if path != "" else None
+    if response is None:
+        response = StaticAssets.response(StaticAssets.INDEX)
+    if response is None:
+        return "index.html not found", 404
+    return response
 
+# Servidor de desenvolvimento. Em produção, um servidor WSGI com threads
+# (ex.: gunicorn --worker-class gthread): as views são síncronas, o cache é
+# respondido na thread da requisição e só as consultas às APIs vão para o
+# event loop compartilhado do AsyncHttpClient
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
 
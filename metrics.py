@@ -0,0 +1,284 @@
+"""
+Métricas no formato de texto do Prometheus, sem dependências externas
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import Flask, Response, request
+
+# Amostra produzida por um coletor: (nome, tipo, ajuda, [(rótulos, valor), ...])
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+# Limites padrão dos histogramas de latência, em segundos
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """Escapa o valor de um rótulo"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Formata os rótulos de uma amostra ({a="1",b="2"})"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Formata um valor numérico"""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base das métricas com rótulos"""
+
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        """Converte os rótulos informados na chave interna"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Rótulos de {self.name} devem ser {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def clear(self) -> None:
+        """Remove todos os valores registrados"""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Contador que só aumenta"""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Valor que pode subir e descer"""
+
+    type = 'gauge'
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribuição de valores em faixas cumulativas"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Contagem por faixa (não cumulativa), soma e total
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return 0 if state is None else state[2]
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        for key, (counts, total, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(dict(labels, le=_format_value(bound)))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(dict(labels, le='+Inf'))} {count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas e coletores exportados juntos"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Registra uma função chamada a cada exportação
+
+        Args:
+            collector: Função que retorna amostras calculadas na hora
+                (por exemplo, a partir dos contadores de um cache)
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Gera o texto no formato de exposição do Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+
+        # Coletores diferentes podem contribuir para a mesma métrica
+        collected: Dict[str, Tuple[str, str, list]] = {}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                print(f"Erro ao coletar métricas: {e}")
+                continue
+            for name, metric_type, documentation, values in samples:
+                collected.setdefault(name, (metric_type, documentation, []))[2].extend(values)
+
+        for name, (metric_type, documentation, values) in collected.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+    def clear(self) -> None:
+        """Zera os valores das métricas (os coletores são mantidos)"""
+        for metric in self._metrics:
+            metric.clear()
+
+
+class Metrics:
+    """Métricas do aplicativo e instrumentação das requisições do Flask"""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    registry = MetricsRegistry()
+
+    REQUEST_DURATION = registry.histogram(
+        'weather_http_request_duration_seconds',
+        'Duração das requisições atendidas, por rota',
+        ('route', 'method', 'status')
+    )
+    REQUESTS_IN_FLIGHT = registry.gauge(
+        'weather_http_requests_in_flight',
+        'Requisições sendo atendidas no momento'
+    )
+    UPSTREAM_DURATION = registry.histogram(
+        'weather_upstream_request_duration_seconds',
+        'Duração das chamadas às APIs externas, por provedor',
+        ('provider',)
+    )
+    UPSTREAM_ERRORS = registry.counter(
+        'weather_upstream_errors_total',
+        'Chamadas às APIs externas com erro, por provedor e motivo',
+        ('provider', 'reason')
+    )
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """Instrumenta as requisições do aplicativo e registra o endpoint /metrics"""
+        app.before_request(cls._start_request)
+        app.after_request(cls._finish_request)
+        app.teardown_request(cls._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', cls.metrics_view)
+
+    @classmethod
+    def metrics_view(cls) -> Response:
+        """Endpoint com as métricas no formato do Prometheus"""
+        return Response(cls.registry.render(), content_type=cls.CONTENT_TYPE)
+
+    @classmethod
+    def observe_upstream(cls, provider: str, duration: float, error: Optional[str] = None) -> None:
+        """
+        Registra uma chamada a uma API externa
+
+        Args:
+            provider: Nome do provedor (ex.: 'open-meteo-forecast', 'nominatim-search')
+            duration: Duração em segundos
+            error: Motivo do erro ('timeout', 'connection', 'http_5xx', ...) ou None
+        """
+        cls.UPSTREAM_DURATION.observe(duration, provider=provider)
+        if error is not None:
+            cls.UPSTREAM_ERRORS.inc(provider=provider, reason=error)
+
+    # Chave no environ da requisição com o instante de início
+    _START_KEY = 'weather.metrics_start'
+
+    @classmethod
+    def _start_request(cls) -> None:
+        request.environ[cls._START_KEY] = time.perf_counter()
+        cls.REQUESTS_IN_FLIGHT.inc()
+
+    @classmethod
+    def _finish_request(cls, response: Response) -> Response:
+        start = request.environ.get(cls._START_KEY)
+        if start is not None:
+            # Usar o padrão da rota (e não o caminho) para limitar a cardinalidade
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            cls.REQUEST_DURATION.observe(time.perf_counter() - start, route=route,
+                                         method=request.method, status=str(response.status_code))
+        return response
+
+    @classmethod
+    def _teardown_request(cls, exc: Optional[BaseException]) -> None:
+        if request.environ.pop(cls._START_KEY, None) is not None:
+            cls.REQUESTS_IN_FLIGHT.dec()
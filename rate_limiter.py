@@ -0,0 +1,128 @@
+"""
+Limitador de taxa (token bucket) com fila de espera limitada
+"""
+import os
+import struct
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem estado compartilhado entre processos
+    fcntl = None
+
+
+class RateLimiter:
+    """
+    Token bucket thread-safe, implementado como agendamento de horários
+    (GCRA): cada chamada reserva o próximo horário livre e espera até ele.
+
+    Com state_path, o horário reservado fica num arquivo protegido por
+    flock, de modo que todos os processos de trabalho dividem a mesma taxa.
+    """
+
+    # Formato do estado gravado em arquivo: próximo horário livre (time.time)
+    _STATE = struct.Struct('<d')
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, max_queue: int = 10,
+                 state_path: Optional[str] = None):
+        """
+        Args:
+            rate: Requisições permitidas por segundo
+            burst: Requisições que podem sair de uma vez quando o limitador está ocioso
+            max_queue: Número máximo de chamadas esperando a vez neste processo
+            state_path: Arquivo para compartilhar o limite entre processos (opcional)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.state_path = state_path if fcntl is not None else None
+        self._interval = 1.0 / rate
+        self._next_free = 0.0
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda a vez de fazer uma requisição
+
+        Args:
+            timeout: Espera máxima aceita em segundos (None espera o necessário)
+
+        Returns:
+            True se a requisição pode ser feita; False se a fila está cheia ou
+            a espera passaria do timeout (nesse caso nada é reservado)
+        """
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+
+            wait = self._reserve(timeout)
+            if wait is None:
+                self.rejected += 1
+                return False
+
+            self.acquired += 1
+            if wait <= 0:
+                return True
+            self.waiting += 1
+
+        try:
+            time.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        return True
+
+    def _reserve(self, timeout: Optional[float]) -> Optional[float]:
+        """Reserva o próximo horário livre e retorna a espera até ele"""
+        if self.state_path is None:
+            wait, self._next_free = self._schedule(self._next_free, time.monotonic(), timeout)
+            return wait
+
+        try:
+            fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            print(f"Erro ao abrir estado do limitador de taxa: {e}")
+            wait, self._next_free = self._schedule(self._next_free, time.monotonic(), timeout)
+            return wait
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, self._STATE.size, 0)
+            next_free = self._STATE.unpack(data)[0] if len(data) == self._STATE.size else 0.0
+            wait, next_free = self._schedule(next_free, time.time(), timeout)
+            os.pwrite(fd, self._STATE.pack(next_free), 0)
+            return wait
+        finally:
+            os.close(fd)
+
+    def _schedule(self, next_free: float, now: float, timeout: Optional[float]):
+        """
+        Calcula a espera para a próxima requisição
+
+        Returns:
+            Tupla (espera em segundos ou None se recusada, novo próximo horário livre)
+        """
+        start = max(next_free, now)
+        # Até burst requisições podem adiantar o horário reservado
+        wait = start - now - (self.burst - 1) * self._interval
+        wait = max(wait, 0.0)
+        if timeout is not None and wait > timeout:
+            return None, next_free
+        return wait, start + self._interval
+
+    def stats(self) -> Dict:
+        """Retorna os contadores de uso do limitador"""
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'waiting': self.waiting,
+                'acquired': self.acquired,
+                'rejected': self.rejected
+            }
@@ -1,11 +1,43 @@
 """
 Modelo para dados meteorológicos
 """
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
-import requests
-from dataclasses import dataclass
-from flask import Blueprint, jsonify, request
+from typing import Dict, List, Optional, Sequence, Tuple
+from array import array
+import httpx
+from dataclasses import dataclass, replace
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.models.cache import TTLCache
+from src.models.circuit_breaker import CircuitBreaker
+from src.models.columns import ColumnTable, map_column, typed_column
+from src.models.compression import Compression
+from src.models.geocoding import GeocodingService
+from src.models.http_client import AsyncHttpClient
+from src.models.live import LiveFeed
+from src.models.singleflight import SingleFlight
+
+try:
+    import msgpack
+except ImportError:  # Dependência do requirements.txt; sem ela, format=msgpack responde 406
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # Sem orjson, a versão do conteúdo usa o json da biblioteca padrão
+    orjson = None
+
+
+def _canonical_json(content) -> bytes:
+    """Serializa com chaves ordenadas, para que o mesmo conteúdo gere sempre os mesmos bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(content, sort_keys=True, default=str).encode('utf-8')
 
 
 @dataclass
@@ -21,6 +53,11 @@ class WeatherData:
     weather_code: int
     timestamp: datetime
     description: str = ""
+    age: float = 0
+    stale: bool = False
+    degraded: bool = False
+    # Identificador do conteúdo recebido da API (base do ETag)
+    version: str = ""
     
     def to_dict(self) -> Dict:
         """Converte os dados para dicionário"""
@@ -34,7 +71,10 @@ class WeatherData:
             'wind_direction': self.wind_direction,
             'weather_code': self.weather_code,
             'timestamp': self.timestamp.isoformat(),
-            'description': self.description
+            'description': self.description,
+            'age': int(self.age),
+            'stale': self.stale,
+            'degraded': self.degraded
         }
 
 
@@ -44,24 +84,98 @@ class ForecastData:
     location: str
     latitude: float
     longitude: float
-    daily_forecast: List[Dict]
-    hourly_forecast: List[Dict]
+    daily_forecast: Sequence[Dict]
+    hourly_forecast: Sequence[Dict]
+    age: float = 0
+    stale: bool = False
+    degraded: bool = False
+    # Identificador do conteúdo recebido da API (base do ETag)
+    version: str = ""
+    # Condições atuais vindas na mesma requisição (não fazem parte de to_dict)
+    current: Optional[WeatherData] = None
     
-    def to_dict(self) -> Dict:
-        """Converte os dados para dicionário"""
+    def to_dict(self, layout: str = 'rows') -> Dict:
+        """
+        Converte os dados para dicionário
+        
+        Args:
+            layout: 'rows' (lista de dicionários por dia/hora) ou
+                'columns' (dicionário com uma lista por variável)
+        """
+        if layout == 'columns':
+            daily = ColumnTable.from_rows(self.daily_forecast).to_columns()
+            hourly = ColumnTable.from_rows(self.hourly_forecast).to_columns()
+        else:
+            daily = list(self.daily_forecast)
+            hourly = list(self.hourly_forecast)
+        
         return {
             'location': self.location,
             'latitude': self.latitude,
             'longitude': self.longitude,
-            'daily_forecast': self.daily_forecast,
-            'hourly_forecast': self.hourly_forecast
+            'daily_forecast': daily,
+            'hourly_forecast': hourly,
+            'age': int(self.age),
+            'stale': self.stale,
+            'degraded': self.degraded
         }
 
 
 class WeatherService:
     """Serviço para obter dados meteorológicos da Open-Meteo API"""
     
-    BASE_URL = "https://api.open-meteo.com/v1"
+    # Endereço da API (configurável para apontar para um servidor local nos testes de carga)
+    BASE_URL = os.environ.get('OPEN_METEO_BASE_URL', "https://api.open-meteo.com/v1").rstrip('/')
+    
+    # Configuração do cache em memória (tempos em segundos)
+    CURRENT_CACHE_TTL = 600
+    FORECAST_CACHE_TTL = 1800
+    CACHE_MAX_ENTRIES = 1024
+    _cache = TTLCache(max_entries=CACHE_MAX_ENTRIES)
+    
+    # Tempo após a expiração em que dados antigos ainda são servidos enquanto
+    # uma atualização roda em segundo plano (0 desativa)
+    STALE_MAX_AGE = 1800
+    _refreshing = set()
+    _refreshing_lock = threading.Lock()
+    
+    # Requisições idênticas em andamento são compartilhadas entre os chamadores
+    _inflight = SingleFlight()
+    
+    # Disjuntor das chamadas à Open-Meteo: abre após falhas ou chamadas lentas
+    # seguidas e, enquanto aberto, serve o último dado válido (degradado)
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_SLOW_CALL_SECONDS = 5
+    CIRCUIT_RESET_TIMEOUT = 30
+    _circuit = CircuitBreaker(
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        slow_call_seconds=CIRCUIT_SLOW_CALL_SECONDS,
+        reset_timeout=CIRCUIT_RESET_TIMEOUT
+    )
+    LAST_GOOD_TTL = 24 * 3600
+    _last_good = TTLCache(max_entries=CACHE_MAX_ENTRIES, default_ttl=LAST_GOOD_TTL)
+    
+    # Máximo de coordenadas enviadas em uma única requisição em lote
+    BATCH_CHUNK_SIZE = 50
+    
+    # Passo da grade, em graus, em que as coordenadas são arredondadas antes de
+    # consultar a API e o cache (0.01° ≈ 1,1 km, abaixo da resolução dos modelos
+    # da Open-Meteo); usuários próximos compartilham a mesma entrada. 0 desativa.
+    COORDINATE_GRID = float(os.environ.get('WEATHER_COORDINATE_GRID', '0.01'))
+    
+    # A previsão é sempre consultada no horizonte máximo da Open-Meteo e
+    # guardada uma vez por localização; dias e janelas de horas são recortes
+    MAX_FORECAST_DAYS = 16
+    DEFAULT_FORECAST_HOURS = 24
+    
+    # A requisição de previsão também traz as condições atuais, guardadas no
+    # cache de dados atuais. Com esta opção, um /current sem dados atuais
+    # frescos é atendido pela previsão (do cache ou da mesma consulta em
+    # andamento do /forecast), respeitando CURRENT_CACHE_TTL; desligada,
+    # consulta só os dados atuais, numa requisição bem menor.
+    CURRENT_FROM_FORECAST = os.environ.get('WEATHER_CURRENT_FROM_FORECAST', '1').lower() in ('1', 'true', 'yes')
+    
+    CURRENT_FIELDS = 'temperature_2m,relative_humidity_2m,wind_speed_10m,wind_direction_10m,weather_code'
     
     # Códigos de tempo WMO para descrições
     WEATHER_CODES = {
@@ -108,122 +222,562 @@ class WeatherService:
         Returns:
             WeatherData ou None em caso de erro
         """
+        weather_data = cls.get_cached_current_weather(latitude, longitude, location)
+        if weather_data is not None:
+            return weather_data
+        
+        return AsyncHttpClient.run(cls.get_current_weather_async(latitude, longitude, location))
+    
+    @classmethod
+    def _cached_current(cls, latitude: float, longitude: float) -> Optional[WeatherData]:
+        """Dados atuais ainda frescos no cache (guardados com uma previsão ou por uma consulta em lote)"""
+        entry = cls._cache.lookup(cls._cache_key('current', latitude, longitude), count=False)
+        return None if entry is None else replace(entry.value, age=entry.age)
+    
+    @classmethod
+    def _peek_current(cls, latitude: float, longitude: float) -> Optional[WeatherData]:
+        """Dados atuais só do cache, sem contar a consulta nas estatísticas"""
+        if cls.CURRENT_FROM_FORECAST:
+            weather_data = cls._cached_current(latitude, longitude)
+            if weather_data is None:
+                key = cls._cache_key('forecast', latitude, longitude)
+                weather_data = cls._current_of(cls._peek(key, cls.FORECAST_CACHE_TTL, cls._fetch_forecast_async,
+                                                         key[1], key[2]), key)
+            return weather_data
+        
+        key = cls._cache_key('current', latitude, longitude)
+        return cls._peek(key, cls.CURRENT_CACHE_TTL, cls._fetch_current_weather_async, key[1], key[2])
+    
+    @classmethod
+    def _current_of(cls, forecast_data: Optional[ForecastData], key: tuple) -> Optional[WeatherData]:
+        """
+        Dados atuais que vieram na requisição da previsão
+        
+        A idade e o estado (desatualizado, degradado) vêm da entrada da
+        previsão, mas os prazos são os dos dados atuais. Depois de
+        CURRENT_CACHE_TTL, os dados são servidos como desatualizados e a
+        previsão é atualizada em segundo plano. Depois de mais STALE_MAX_AGE,
+        deixam de ser servidos e o chamador consulta a API.
+        
+        Args:
+            forecast_data: Previsão do cache (ou recém-consultada)
+            key: Chave de cache da previsão
+            
+        Returns:
+            WeatherData ou None se não houver dados atuais utilizáveis
+        """
+        if forecast_data is None or forecast_data.current is None:
+            return None
+        
+        stale = forecast_data.stale
+        # Dados degradados já são o último recurso após uma falha: servidos como estão
+        if not forecast_data.degraded and forecast_data.age >= cls.CURRENT_CACHE_TTL:
+            if forecast_data.age >= cls.CURRENT_CACHE_TTL + cls.STALE_MAX_AGE:
+                return None
+            stale = True
+            cls._schedule_refresh(key, cls.FORECAST_CACHE_TTL, cls._fetch_forecast_async, key[1], key[2])
+        
+        return replace(forecast_data.current, age=forecast_data.age, stale=stale,
+                       degraded=forecast_data.degraded)
+    
+    @classmethod
+    def get_current_weather_batch(cls, locations: List[Tuple]) -> List[Optional[WeatherData]]:
+        """
+        Obtém dados meteorológicos atuais para várias localizações
+        
+        As coordenadas que não estão no cache são agrupadas em poucas
+        requisições à Open-Meteo (até BATCH_CHUNK_SIZE por requisição).
+        
+        Args:
+            locations: Lista de tuplas (latitude, longitude) ou (latitude, longitude, nome)
+            
+        Returns:
+            Lista de WeatherData (ou None em caso de erro) na mesma ordem da entrada
+        """
+        return cls._lookup_batch(locations, cls.CURRENT_CACHE_TTL, cls._fetch_current_weather_batch_async, 'current')
+    
+    @classmethod
+    def get_forecast_batch(cls, locations: List[Tuple], days: int = 7, hour_offset: int = 0,
+                           hours: int = DEFAULT_FORECAST_HOURS) -> List[Optional[ForecastData]]:
+        """
+        Obtém previsões para várias localizações, agrupando as consultas como em get_current_weather_batch
+        
+        Args:
+            locations: Lista de tuplas (latitude, longitude) ou (latitude, longitude, nome)
+            days: Número de dias de previsão (padrão: 7)
+            hour_offset: Primeira hora da previsão horária
+            hours: Número de horas da previsão horária (padrão: 24)
+            
+        Returns:
+            Lista de ForecastData (ou None em caso de erro) na mesma ordem da entrada
+        """
+        results = cls._lookup_batch(locations, cls.FORECAST_CACHE_TTL, cls._fetch_forecast_batch_async, 'forecast')
+        return [None if item is None else cls._forecast_window(item, days, hour_offset, hours) for item in results]
+    
+    @classmethod
+    def get_live_updates(cls, topics: List[tuple]) -> List:
+        """
+        Consulta os tópicos do fluxo de eventos (/stream)
+        
+        Os tópicos são as chaves de cache ('current' ou 'forecast', latitude,
+        longitude); entradas frescas vêm do cache e as expiradas são
+        consultadas em lote, uma vez para todos os clientes inscritos.
+        
+        Args:
+            topics: Lista de chaves de cache
+            
+        Returns:
+            Lista de valores (previsões completas) ou None, na mesma ordem
+        """
+        lookups = {
+            'current': (cls.CURRENT_CACHE_TTL, cls._fetch_current_weather_batch_async),
+            'forecast': (cls.FORECAST_CACHE_TTL, cls._fetch_forecast_batch_async)
+        }
+        values = {}
+        for kind, (ttl, fetch_batch) in lookups.items():
+            selected = [topic for topic in topics if topic[0] == kind]
+            if selected:
+                results = cls._lookup_batch([topic[1:3] for topic in selected], ttl, fetch_batch, kind)
+                values.update(zip(selected, results))
+        return [values.get(topic) for topic in topics]
+    
+    @classmethod
+    def _lookup_batch(cls, locations: List[Tuple], ttl: float, fetch_batch, kind: str, *extra) -> List:
+        """
+        Obtém vários valores do cache e consulta os ausentes em lotes
+        
+        Args:
+            locations: Lista de tuplas (latitude, longitude) ou (latitude, longitude, nome)
+            ttl: Tempo de vida das entradas em segundos
+            fetch_batch: Função assíncrona que consulta a API para uma lista de coordenadas
+            kind: Tipo da consulta na chave de cache ('current' ou 'forecast')
+            *extra: Demais partes da chave, também passadas a fetch_batch
+            
+        Returns:
+            Lista de valores (ou None em caso de erro) na mesma ordem da entrada
+        """
+        found = {}
+        missing = []
+        seen = set()
+        for entry in locations:
+            key = cls._cache_key(kind, entry[0], entry[1], *extra)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = cls._cache.lookup(key)
+            if entry is None:
+                missing.append(key)
+            else:
+                found[key] = replace(entry.value, age=entry.age)
+        
+        for start in range(0, len(missing), cls.BATCH_CHUNK_SIZE):
+            chunk = missing[start:start + cls.BATCH_CHUNK_SIZE]
+            coordinates = [(key[1], key[2]) for key in chunk]
+            fetched = AsyncHttpClient.run(cls._call_upstream_async(fetch_batch, coordinates, *extra))
+            for key, value in zip(chunk, fetched or [None] * len(chunk)):
+                if value is not None:
+                    found[key] = cls._store(key, value, ttl)
+                else:
+                    value = cls._fallback(key)
+                    if value is not None:
+                        found[key] = value
+        
+        results = []
+        for entry in locations:
+            latitude, longitude = entry[0], entry[1]
+            location = entry[2] if len(entry) > 2 else ""
+            value = found.get(cls._cache_key(kind, latitude, longitude, *extra))
+            if value is None:
+                results.append(None)
+            else:
+                results.append(cls._for_caller(value, latitude, longitude, location))
+        
+        return results
+    
+    @classmethod
+    async def _fetch_current_weather_batch_async(cls, coordinates: List[Tuple[float, float]]) -> List[Optional[WeatherData]]:
+        """
+        Consulta a Open-Meteo para várias coordenadas em uma única requisição
+        
+        Args:
+            coordinates: Lista de tuplas (latitude, longitude)
+            
+        Returns:
+            Lista de WeatherData sem nome de localização (None nas posições com erro)
+        """
+        print(f"Fazendo requisição em lote para {len(coordinates)} localizações")
+        params = {
+            'current': cls.CURRENT_FIELDS,
+            'timezone': 'auto'
+        }
+        
+        def parse(item: Dict, latitude: float, longitude: float) -> Optional[WeatherData]:
+            current = item.get('current', {})
+            return cls._parse_current(current, latitude, longitude) if current else None
+        
+        return await cls._fetch_batch_async(coordinates, params, parse)
+    
+    @classmethod
+    async def _fetch_forecast_batch_async(cls, coordinates: List[Tuple[float, float]]) -> List[Optional[ForecastData]]:
+        """
+        Consulta a previsão completa de várias coordenadas em uma única requisição
+        
+        Args:
+            coordinates: Lista de tuplas (latitude, longitude)
+            
+        Returns:
+            Lista de ForecastData sem nome de localização (None nas posições com erro)
+        """
+        params = cls._forecast_params(0, 0)
+        return await cls._fetch_batch_async(coordinates, params, cls._parse_forecast)
+    
+    @classmethod
+    async def _fetch_batch_async(cls, coordinates: List[Tuple[float, float]], params: Dict, parse) -> List:
+        """
+        Executa uma requisição em lote à Open-Meteo
+        
+        Args:
+            coordinates: Lista de tuplas (latitude, longitude)
+            params: Parâmetros da requisição (latitude e longitude são substituídas)
+            parse: Função (item, latitude, longitude) que converte cada resultado
+            
+        Returns:
+            Lista de resultados (None nas posições com erro)
+        """
         try:
             url = f"{cls.BASE_URL}/forecast"
-            params = {
-                'latitude': latitude,
-                'longitude': longitude,
-                'current': 'temperature_2m,relative_humidity_2m,wind_speed_10m,wind_direction_10m,weather_code',
-                'timezone': 'auto'
-            }
-            
-            print(f"Fazendo requisição para: {url}")
-            print(f"Parâmetros: {params}")
+            params = dict(
+                params,
+                latitude=','.join(str(lat) for lat, _ in coordinates),
+                longitude=','.join(str(lon) for _, lon in coordinates)
+            )
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await AsyncHttpClient.get(url, params=params, timeout=AsyncHttpClient.WEATHER_TIMEOUT,
+                                                 provider='open-meteo-forecast')
             response.raise_for_status()
             
             data = response.json()
-            print(f"Resposta da API: {data}")
-            current = data.get('current', {})
+            
+            # A API retorna um objeto para uma localização e uma lista para várias
+            if isinstance(data, dict):
+                data = [data]
+            
+            if len(data) != len(coordinates):
+                print(f"ERRO: {len(data)} resultados para {len(coordinates)} localizações")
+                return [None] * len(coordinates)
+            
+            return [parse(item, latitude, longitude) for (latitude, longitude), item in zip(coordinates, data)]
+            
+        except httpx.HTTPError as e:
+            print(f"Erro na requisição da API: {e}")
+            return [None] * len(coordinates)
+        except Exception as e:
+            print(f"Erro inesperado: {e}")
+            return [None] * len(coordinates)
+    
+    @classmethod
+    def _parse_current(cls, current: Dict, latitude: float, longitude: float) -> WeatherData:
+        """
+        Converte o bloco 'current' da resposta da Open-Meteo em WeatherData
+        
+        Args:
+            current: Dados atuais retornados pela API
+            latitude: Latitude da localização
+            longitude: Longitude da localização
+            
+        Returns:
+            WeatherData sem nome de localização
+        """
+        return WeatherData(
+            location="",
+            latitude=latitude,
+            longitude=longitude,
+            temperature=current.get('temperature_2m', 0),
+            humidity=current.get('relative_humidity_2m', 0),
+            wind_speed=current.get('wind_speed_10m', 0),
+            wind_direction=current.get('wind_direction_10m', 0),
+            weather_code=current.get('weather_code', 0),
+            timestamp=datetime.fromisoformat(current['time']) if current.get('time') else datetime.now(),
+            description=cls.WEATHER_CODES.get(current.get('weather_code', 0), "Desconhecido")
+        )
+    
+    @classmethod
+    def get_forecast(cls, latitude: float, longitude: float, location: str = "", days: int = 7,
+                     hour_offset: int = 0, hours: int = DEFAULT_FORECAST_HOURS) -> Optional[ForecastData]:
+        """
+        Obtém previsão meteorológica para uma localização
+        
+        Args:
+            latitude: Latitude da localização
+            longitude: Longitude da localização
+            location: Nome da localização (opcional)
+            days: Número de dias de previsão (padrão: 7)
+            hour_offset: Primeira hora da previsão horária, a partir do início do dia atual
+            hours: Número de horas da previsão horária (padrão: 24)
+            
+        Returns:
+            ForecastData ou None em caso de erro
+        """
+        forecast_data = cls.get_cached_forecast(latitude, longitude, location, days, hour_offset, hours)
+        if forecast_data is not None:
+            return forecast_data
+        
+        return AsyncHttpClient.run(cls.get_forecast_async(latitude, longitude, location, days, hour_offset, hours))
+    
+    @classmethod
+    def _current_params(cls, latitude: float, longitude: float) -> Dict:
+        """Monta os parâmetros da requisição de dados atuais"""
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'current': cls.CURRENT_FIELDS,
+            'timezone': 'auto'
+        }
+    
+    @classmethod
+    def _forecast_params(cls, latitude: float, longitude: float) -> Dict:
+        """Monta os parâmetros da requisição de previsão (horizonte máximo e dados atuais)"""
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'daily': 'temperature_2m_max,temperature_2m_min,weather_code,precipitation_sum',
+            'hourly': 'temperature_2m,relative_humidity_2m,wind_speed_10m,weather_code',
+            'current': cls.CURRENT_FIELDS,
+            'timezone': 'auto',
+            'forecast_days': cls.MAX_FORECAST_DAYS
+        }
+    
+    @staticmethod
+    def _forecast_window(forecast_data: ForecastData, days: int, hour_offset: int = 0,
+                         hours: int = DEFAULT_FORECAST_HOURS) -> ForecastData:
+        """
+        Recorta os dias e a janela de horas pedidos da previsão completa
+        
+        Os recortes de ColumnTable são visões sobre as mesmas colunas, sem cópia.
+        
+        Args:
+            forecast_data: Previsão completa, como guardada no cache
+            days: Número de dias
+            hour_offset: Primeira hora da janela
+            hours: Número de horas da janela
+            
+        Returns:
+            ForecastData com as séries recortadas
+        """
+        hour_offset = max(0, hour_offset)
+        return replace(
+            forecast_data,
+            daily_forecast=forecast_data.daily_forecast[:max(0, days)],
+            hourly_forecast=forecast_data.hourly_forecast[hour_offset:hour_offset + max(0, hours)]
+        )
+    
+    @classmethod
+    def _parse_forecast(cls, data: Dict, latitude: float, longitude: float) -> ForecastData:
+        """
+        Converte a resposta de previsão da Open-Meteo em ForecastData
+        
+        Args:
+            data: Resposta JSON da API
+            latitude: Latitude da localização
+            longitude: Longitude da localização
+            
+        Returns:
+            ForecastData sem nome de localização
+        """
+        # As séries da API já vêm em colunas: manter assim, com vetores
+        # tipados, e montar as linhas só quando forem acessadas
+        daily_data = data['daily']
+        daily_codes = typed_column(daily_data['weather_code'], 'h')
+        daily_forecast = ColumnTable({
+            'date': daily_data['time'],
+            'temperature_max': typed_column(daily_data['temperature_2m_max']),
+            'temperature_min': typed_column(daily_data['temperature_2m_min']),
+            'weather_code': daily_codes,
+            'precipitation': typed_column(daily_data['precipitation_sum']),
+            'description': map_column(daily_codes, cls.WEATHER_CODES, "Desconhecido")
+        })
+        
+        hourly_data = data['hourly']
+        hourly_codes = typed_column(hourly_data['weather_code'], 'h')
+        hourly_forecast = ColumnTable({
+            'time': hourly_data['time'],
+            'temperature': typed_column(hourly_data['temperature_2m']),
+            'humidity': typed_column(hourly_data['relative_humidity_2m']),
+            'wind_speed': typed_column(hourly_data['wind_speed_10m']),
+            'weather_code': hourly_codes,
+            'description': map_column(hourly_codes, cls.WEATHER_CODES, "Desconhecido")
+        })
+        
+        current = data.get('current')
+        
+        return ForecastData(
+            location="",
+            latitude=latitude,
+            longitude=longitude,
+            daily_forecast=daily_forecast,
+            hourly_forecast=hourly_forecast,
+            current=cls._parse_current(current, latitude, longitude) if current else None
+        )
+    
+    @classmethod
+    def get_cached_current_weather(cls, latitude: float, longitude: float,
+                                   location: str = "") -> Optional[WeatherData]:
+        """
+        Dados atuais já disponíveis no cache, sem consultar a API
+        
+        Responde sem sair da thread chamadora; na ausência, a consulta vai
+        para get_current_weather_async, que é quem a conta nas estatísticas.
+        
+        Returns:
+            WeatherData ou None se não estiver no cache
+        """
+        weather_data = cls._peek_current(latitude, longitude)
+        if weather_data is None:
+            return None
+        
+        cls._cache.record(weather_data.stale)
+        return cls._for_caller(weather_data, latitude, longitude, location)
+    
+    @classmethod
+    def get_cached_forecast(cls, latitude: float, longitude: float, location: str = "", days: int = 7,
+                            hour_offset: int = 0, hours: int = DEFAULT_FORECAST_HOURS) -> Optional[ForecastData]:
+        """
+        Previsão já disponível no cache, sem consultar a API
+        
+        Returns:
+            ForecastData ou None se não estiver no cache
+        """
+        key = cls._cache_key('forecast', latitude, longitude)
+        forecast_data = cls._peek(key, cls.FORECAST_CACHE_TTL, cls._fetch_forecast_async, key[1], key[2])
+        
+        if forecast_data is None:
+            return None
+        
+        cls._cache.record(forecast_data.stale)
+        forecast_data = cls._forecast_window(forecast_data, days, hour_offset, hours)
+        return cls._for_caller(forecast_data, latitude, longitude, location)
+    
+    @classmethod
+    async def get_current_weather_async(cls, latitude: float, longitude: float,
+                                        location: str = "") -> Optional[WeatherData]:
+        """
+        Versão assíncrona de get_current_weather
+        
+        Args:
+            latitude: Latitude da localização
+            longitude: Longitude da localização
+            location: Nome da localização (opcional)
+            
+        Returns:
+            WeatherData ou None em caso de erro
+        """
+        # Uma contagem por requisição, com o resultado final das consultas ao cache
+        weather_data = cls._peek_current(latitude, longitude)
+        cls._cache.record(None if weather_data is None else weather_data.stale)
+        
+        if weather_data is None and cls.CURRENT_FROM_FORECAST:
+            # Mesma chave e mesma consulta em andamento do /forecast: as duas
+            # rotas pedidas juntas pela página fazem uma única requisição
+            # (também quando a previsão ainda vale, mas é antiga demais para os dados atuais)
+            key = cls._cache_key('forecast', latitude, longitude)
+            forecast_data = await cls._inflight.do_async(key, cls._load_async, key, cls.FORECAST_CACHE_TTL,
+                                                         cls._fetch_forecast_async, key[1], key[2])
+            weather_data = cls._current_of(forecast_data, key)
+        elif weather_data is None:
+            key = cls._cache_key('current', latitude, longitude)
+            weather_data = await cls._inflight.do_async(key, cls._load_async, key, cls.CURRENT_CACHE_TTL,
+                                                        cls._fetch_current_weather_async, key[1], key[2])
+        
+        if weather_data is None:
+            return None
+        
+        return cls._for_caller(weather_data, latitude, longitude, location)
+    
+    @classmethod
+    async def _fetch_current_weather_async(cls, latitude: float, longitude: float) -> Optional[WeatherData]:
+        """
+        Consulta assíncrona dos dados meteorológicos atuais
+        
+        Args:
+            latitude: Latitude da localização
+            longitude: Longitude da localização
+            
+        Returns:
+            WeatherData sem nome de localização ou None em caso de erro
+        """
+        try:
+            url = f"{cls.BASE_URL}/forecast"
+            params = cls._current_params(latitude, longitude)
+            
+            response = await AsyncHttpClient.get(url, params=params, timeout=AsyncHttpClient.WEATHER_TIMEOUT,
+                                                 provider='open-meteo-forecast')
+            response.raise_for_status()
+            
+            current = response.json().get('current', {})
             
             if not current:
                 print("ERRO: 'current' não encontrado na resposta da API")
                 return None
             
-            weather_data = WeatherData(
-                location=location or f"{latitude}, {longitude}",
-                latitude=latitude,
-                longitude=longitude,
-                temperature=current.get('temperature_2m', 0),
-                humidity=current.get('relative_humidity_2m', 0),
-                wind_speed=current.get('wind_speed_10m', 0),
-                wind_direction=current.get('wind_direction_10m', 0),
-                weather_code=current.get('weather_code', 0),
-                timestamp=datetime.fromisoformat(current['time']) if current.get('time') else datetime.now(),
-                description=cls.WEATHER_CODES.get(current.get('weather_code', 0), "Desconhecido")
-            )
-            
-            print(f"WeatherData criado: {weather_data.to_dict()}")
-            return weather_data
+            return cls._parse_current(current, latitude, longitude)
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Erro na requisição da API: {e}")
             return None
-        except KeyError as e:
-            print(f"Erro ao processar dados da API: {e}")
-            return None
         except Exception as e:
             print(f"Erro inesperado: {e}")
             return None
     
     @classmethod
-    def get_forecast(cls, latitude: float, longitude: float, location: str = "", days: int = 7) -> Optional[ForecastData]:
+    async def get_forecast_async(cls, latitude: float, longitude: float, location: str = "", days: int = 7,
+                                 hour_offset: int = 0, hours: int = DEFAULT_FORECAST_HOURS) -> Optional[ForecastData]:
         """
-        Obtém previsão meteorológica para uma localização
+        Versão assíncrona de get_forecast
         
         Args:
             latitude: Latitude da localização
             longitude: Longitude da localização
             location: Nome da localização (opcional)
             days: Número de dias de previsão (padrão: 7)
+            hour_offset: Primeira hora da previsão horária, a partir do início do dia atual
+            hours: Número de horas da previsão horária (padrão: 24)
             
         Returns:
             ForecastData ou None em caso de erro
         """
+        key = cls._cache_key('forecast', latitude, longitude)
+        forecast_data = await cls._lookup_async(key, cls.FORECAST_CACHE_TTL, cls._fetch_forecast_async,
+                                                key[1], key[2])
+        
+        if forecast_data is None:
+            return None
+        
+        forecast_data = cls._forecast_window(forecast_data, days, hour_offset, hours)
+        return cls._for_caller(forecast_data, latitude, longitude, location)
+    
+    @classmethod
+    async def _fetch_forecast_async(cls, latitude: float, longitude: float) -> Optional[ForecastData]:
+        """
+        Consulta assíncrona da previsão meteorológica completa
+        
+        Args:
+            latitude: Latitude da localização
+            longitude: Longitude da localização
+            
+        Returns:
+            ForecastData sem nome de localização ou None em caso de erro
+        """
         try:
             url = f"{cls.BASE_URL}/forecast"
-            params = {
-                'latitude': latitude,
-                'longitude': longitude,
-                'daily': 'temperature_2m_max,temperature_2m_min,weather_code,precipitation_sum',
-                'hourly': 'temperature_2m,relative_humidity_2m,wind_speed_10m,weather_code',
-                'timezone': 'auto',
-                'forecast_days': days
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            params = cls._forecast_params(latitude, longitude)
             
-            data = response.json()
-            
-            # Processar previsão diária
-            daily_data = data['daily']
-            daily_forecast = []
-            for i in range(len(daily_data['time'])):
-                daily_forecast.append({
-                    'date': daily_data['time'][i],
-                    'temperature_max': daily_data['temperature_2m_max'][i],
-                    'temperature_min': daily_data['temperature_2m_min'][i],
-                    'weather_code': daily_data['weather_code'][i],
-                    'precipitation': daily_data['precipitation_sum'][i],
-                    'description': cls.WEATHER_CODES.get(daily_data['weather_code'][i], "Desconhecido")
-                })
-            
-            # Processar previsão horária (próximas 24 horas)
-            hourly_data = data['hourly']
-            hourly_forecast = []
-            for i in range(min(24, len(hourly_data['time']))):
-                hourly_forecast.append({
-                    'time': hourly_data['time'][i],
-                    'temperature': hourly_data['temperature_2m'][i],
-                    'humidity': hourly_data['relative_humidity_2m'][i],
-                    'wind_speed': hourly_data['wind_speed_10m'][i],
-                    'weather_code': hourly_data['weather_code'][i],
-                    'description': cls.WEATHER_CODES.get(hourly_data['weather_code'][i], "Desconhecido")
-                })
-            
-            forecast_data = ForecastData(
-                location=location or f"{latitude}, {longitude}",
-                latitude=latitude,
-                longitude=longitude,
-                daily_forecast=daily_forecast,
-                hourly_forecast=hourly_forecast
-            )
+            response = await AsyncHttpClient.get(url, params=params, timeout=AsyncHttpClient.WEATHER_TIMEOUT,
+                                                 provider='open-meteo-forecast')
+            response.raise_for_status()
             
-            return forecast_data
+            return cls._parse_forecast(response.json(), latitude, longitude)
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Erro na requisição da API: {e}")
             return None
         except KeyError as e:
@@ -232,11 +786,452 @@ class WeatherService:
         except Exception as e:
             print(f"Erro inesperado: {e}")
             return None
+    
+    @classmethod
+    async def _lookup_async(cls, key: tuple, ttl: float, fetch, *args):
+        """
+        Obtém um valor do cache ou consulta a API em caso de ausência
+        
+        Entradas expiradas há menos de STALE_MAX_AGE segundos são servidas
+        imediatamente (marcadas como desatualizadas) enquanto uma atualização
+        é feita em segundo plano. A consulta é contada uma vez nas
+        estatísticas do cache, como acerto ou ausência.
+        
+        Args:
+            key: Chave de cache
+            ttl: Tempo de vida da entrada em segundos
+            fetch: Função assíncrona que consulta a API
+            *args: Argumentos de fetch
+            
+        Returns:
+            Valor com idade preenchida ou None em caso de erro
+        """
+        cached = cls._peek(key, ttl, fetch, *args)
+        cls._cache.record(None if cached is None else cached.stale)
+        if cached is not None:
+            return cached
+        
+        return await cls._inflight.do_async(key, cls._load_async, key, ttl, fetch, *args)
+    
+    @classmethod
+    def _peek(cls, key: tuple, ttl: float, fetch, *args):
+        """
+        Obtém um valor só do cache, sem consultar a API
+        
+        Entradas desatualizadas (até STALE_MAX_AGE) também são servidas e
+        agendam a atualização em segundo plano, como em _lookup_async. A
+        consulta não é contada: quem chama conta o resultado com record.
+        
+        Returns:
+            Valor com idade preenchida ou None se não estiver no cache
+        """
+        entry = cls._cache.lookup(key, allow_stale=cls.STALE_MAX_AGE > 0, count=False)
+        if entry is None:
+            return None
+        if entry.stale:
+            cls._schedule_refresh(key, ttl, fetch, *args)
+        return replace(entry.value, age=entry.age, stale=entry.stale)
+    
+    @classmethod
+    def _schedule_refresh(cls, key: tuple, ttl: float, fetch, *args) -> None:
+        """Agenda no event loop compartilhado a atualização de uma entrada desatualizada"""
+        with cls._refreshing_lock:
+            if key in cls._refreshing:
+                return
+            cls._refreshing.add(key)
+        
+        async def refresh():
+            try:
+                await cls._inflight.do_async(key, cls._load_async, key, ttl, fetch, *args)
+            finally:
+                with cls._refreshing_lock:
+                    cls._refreshing.discard(key)
+        
+        asyncio.run_coroutine_threadsafe(refresh(), AsyncHttpClient.get_loop())
+    
+    @classmethod
+    async def _load_async(cls, key: tuple, ttl: float, fetch, *args):
+        """
+        Consulta a API e armazena o resultado no cache
+        
+        Args:
+            key: Chave de cache
+            ttl: Tempo de vida da entrada em segundos
+            fetch: Função assíncrona que consulta a API
+            *args: Argumentos de fetch
+            
+        Returns:
+            Resultado de fetch (em caso de erro, o último dado válido ou None)
+        """
+        result = await cls._call_upstream_async(fetch, *args)
+        if result is None:
+            return cls._fallback(key)
+        return cls._store(key, result, ttl)
+    
+    @classmethod
+    async def _call_upstream_async(cls, fetch, *args):
+        """
+        Executa uma consulta à API protegida pelo disjuntor
+        
+        Args:
+            fetch: Função assíncrona que consulta a API (retorna None em caso de erro)
+            *args: Argumentos de fetch
+            
+        Returns:
+            Resultado de fetch ou None se o disjuntor estiver aberto
+        """
+        if not cls._circuit.allow_request():
+            print("Disjuntor da Open-Meteo aberto: requisição não enviada")
+            return None
+        
+        start = time.monotonic()
+        result = None
+        try:
+            result = await fetch(*args)
+            return result
+        finally:
+            cls._circuit.record(cls._succeeded(result), time.monotonic() - start)
+    
+    @staticmethod
+    def _succeeded(result) -> bool:
+        """Indica se o resultado de uma consulta representa sucesso"""
+        if isinstance(result, list):
+            return any(item is not None for item in result)
+        return result is not None
+    
+    @classmethod
+    def _store(cls, key: tuple, value, ttl: float):
+        """
+        Armazena um resultado no cache e como último dado válido
+        
+        Returns:
+            Valor armazenado, com a versão do conteúdo preenchida
+        """
+        # Condições atuais que vieram com a previsão também atendem as consultas
+        # em lote e o fluxo de eventos, que usam a chave dos dados atuais
+        if isinstance(value, ForecastData) and value.current is not None:
+            value = replace(value, current=cls._store(('current',) + key[1:3], value.current,
+                                                      cls.CURRENT_CACHE_TTL))
+        
+        value = replace(value, version=cls._content_version(value))
+        cls._cache.set(key, value, ttl, cls.STALE_MAX_AGE)
+        cls._last_good.set(key, value)
+        return value
+    
+    @staticmethod
+    def _content_version(value) -> str:
+        """Calcula um identificador do conteúdo (sem nome da localização nem idade)"""
+        digest = hashlib.blake2b(digest_size=12)
+        if isinstance(value, ForecastData):
+            # Previsões completas têm centenas de horas: as colunas numéricas
+            # entram como bytes do vetor, sem montar linhas nem serializar números
+            digest.update(_canonical_json([value.latitude, value.longitude]))
+            for series in (value.daily_forecast, value.hourly_forecast):
+                table = ColumnTable.from_rows(series)
+                for name in table.names:
+                    column = table.column(name)
+                    digest.update(name.encode('utf-8') + b'\0')
+                    digest.update(column.tobytes() if isinstance(column, array) else _canonical_json(list(column)))
+                digest.update(b'\0')
+        else:
+            content = value.to_dict()
+            for field in ('location', 'age', 'stale', 'degraded'):
+                content.pop(field, None)
+            digest.update(_canonical_json(content))
+        return digest.hexdigest()
+    
+    @classmethod
+    def _fallback(cls, key: tuple):
+        """
+        Obtém o último dado válido de uma consulta que falhou
+        
+        Returns:
+            Valor marcado como degradado ou None se não houver dado anterior
+        """
+        entry = cls._last_good.lookup(key)
+        if entry is None:
+            return None
+        return replace(entry.value, age=entry.age, stale=True, degraded=True)
+    
+    @classmethod
+    def _snap(cls, latitude: float, longitude: float) -> Tuple[float, float]:
+        """Arredonda as coordenadas para o ponto mais próximo da grade (COORDINATE_GRID)"""
+        step = cls.COORDINATE_GRID
+        if step <= 0:
+            return latitude, longitude
+        # round(..., 6) remove o ruído de ponto flutuante (-23.55 e não -23.550000000000001)
+        return round(round(latitude / step) * step, 6), round(round(longitude / step) * step, 6)
+    
+    @classmethod
+    def _cache_key(cls, kind: str, latitude: float, longitude: float, *extra) -> tuple:
+        """
+        Monta a chave de cache para uma consulta
+        
+        As coordenadas da chave são as do ponto da grade; são elas que vão
+        para a API.
+        """
+        return (kind,) + cls._snap(latitude, longitude) + extra
+    
+    @staticmethod
+    def _for_caller(value, latitude: float, longitude: float, location: str):
+        """Devolve o valor do ponto da grade com as coordenadas e o nome pedidos"""
+        return replace(value, latitude=latitude, longitude=longitude,
+                       location=location or f"{latitude}, {longitude}")
+    
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Retorna os contadores de acerto, falha e remoção do cache"""
+        return cls._cache.stats()
+    
+    @classmethod
+    def collect_metrics(cls) -> List[tuple]:
+        """
+        Amostras para o endpoint /metrics (cache, disjuntor e chamadas em andamento)
+        
+        Returns:
+            Lista de tuplas (nome, tipo, ajuda, [(rótulos, valor), ...])
+        """
+        cache = cls._cache.stats()
+        lookups = cache['hits'] + cache['stale_hits'] + cache['misses']
+        served = cache['hits'] + cache['stale_hits']
+        circuit = cls._circuit.stats()
+        
+        return [
+            ('weather_cache_lookups_total', 'counter', 'Consultas aos caches, por resultado', [
+                ({'cache': 'weather', 'result': 'hit'}, cache['hits']),
+                ({'cache': 'weather', 'result': 'stale'}, cache['stale_hits']),
+                ({'cache': 'weather', 'result': 'miss'}, cache['misses'])
+            ]),
+            ('weather_cache_hit_ratio', 'gauge', 'Fração das consultas atendidas pelo cache', [
+                ({'cache': 'weather'}, served / lookups if lookups else 0)
+            ]),
+            ('weather_cache_entries', 'gauge', 'Entradas armazenadas no cache', [
+                ({'cache': 'weather'}, cache['size'])
+            ]),
+            ('weather_cache_evictions_total', 'counter', 'Entradas removidas por falta de espaço', [
+                ({'cache': 'weather'}, cache['evictions'])
+            ]),
+            ('weather_circuit_open', 'gauge', 'Disjuntor aberto (1) ou fechado (0), por provedor', [
+                ({'provider': 'open-meteo-forecast'}, 0 if circuit['state'] == 'closed' else 1)
+            ]),
+            ('weather_circuit_rejected_total', 'counter', 'Chamadas recusadas pelo disjuntor', [
+                ({'provider': 'open-meteo-forecast'}, circuit['rejected'])
+            ]),
+            ('weather_upstream_in_flight', 'gauge', 'Chamadas distintas às APIs externas em andamento', [
+                ({'provider': 'open-meteo-forecast'}, cls._inflight.in_flight())
+            ]),
+            ('weather_background_refreshes', 'gauge', 'Atualizações em segundo plano em andamento', [
+                ({}, len(cls._refreshing))
+            ]),
+            ('weather_stream_clients', 'gauge', 'Clientes conectados ao fluxo de eventos', [
+                ({}, live_feed.subscription_count())
+            ]),
+            ('weather_stream_topics', 'gauge', 'Localizações acompanhadas pelo fluxo de eventos, por tipo', [
+                ({'kind': kind}, sum(1 for topic in live_feed.topics() if topic[0] == kind))
+                for kind in ('current', 'forecast')
+            ]),
+            ('weather_stream_published_total', 'counter', 'Atualizações publicadas no fluxo de eventos', [
+                ({}, live_feed.published)
+            ])
+        ]
+    
+    @classmethod
+    def circuit_stats(cls) -> Dict:
+        """Retorna o estado e os contadores do disjuntor da Open-Meteo"""
+        return cls._circuit.stats()
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Limpa o cache de dados meteorológicos"""
+        cls._cache.clear()
+        cls._last_good.clear()
 
 
 # Blueprint para as rotas da API de clima
 weather_bp = Blueprint('weather', __name__)
 
+# Limite de localizações aceitas pelo endpoint em lote
+MAX_BATCH_LOCATIONS = 100
+
+# Codificações e layouts aceitos nas respostas
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+RESPONSE_FORMATS = ('json', 'msgpack')
+FORECAST_LAYOUTS = ('rows', 'columns')
+
+# Fluxo de eventos (/stream): uma consulta periódica por localização,
+# compartilhada por todos os clientes inscritos; só mudanças são enviadas
+STREAM_REFRESH_INTERVAL = float(os.environ.get('WEATHER_STREAM_REFRESH', '60'))
+# Cada cliente conectado ocupa uma thread do servidor durante toda a conexão
+STREAM_MAX_CLIENTS = int(os.environ.get('WEATHER_STREAM_MAX_CLIENTS', '100'))
+# Comentário enviado sem atualizações, para manter a conexão e detectar clientes desconectados
+STREAM_HEARTBEAT = 15
+# Espera sugerida ao navegador antes de reconectar, em milissegundos
+STREAM_RETRY_MS = 5000
+
+live_feed = LiveFeed(WeatherService.get_live_updates, STREAM_REFRESH_INTERVAL,
+                     version=lambda value: value.version, name='weather-stream')
+
+def _response_format() -> str:
+    """Escolhe a codificação pelo parâmetro format ou, na falta dele, pelo cabeçalho Accept"""
+    response_format = request.args.get('format')
+    if response_format:
+        return response_format.lower()
+    
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES,
+                                               default='application/json')
+    return 'msgpack' if best in MSGPACK_MIMETYPES else 'json'
+
+def _format_error(response_format: str):
+    """Retorna a resposta de erro para uma codificação não suportada, ou None"""
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'error': f'Formato inválido. Use um de: {", ".join(RESPONSE_FORMATS)}'}), 400
+    if response_format == 'msgpack' and msgpack is None:
+        return jsonify({'error': 'Formato msgpack indisponível neste servidor'}), 406
+    return None
+
+def _encode_response(payload: Dict, response_format: str) -> Response:
+    """Codifica a resposta em JSON ou MessagePack"""
+    if response_format == 'msgpack':
+        response = Response(msgpack.packb(payload, use_bin_type=True), mimetype='application/msgpack')
+    else:
+        response = jsonify(payload)
+    response.vary.add('Accept')
+    return response
+
+def _forecast_window_args():
+    """
+    Lê e valida os parâmetros days, hour_offset e hours
+    
+    Returns:
+        Tupla ((days, hour_offset, hours), None) ou (None, resposta de erro)
+    """
+    days = request.args.get('days', default=7, type=int)
+    hour_offset = request.args.get('hour_offset', default=0, type=int)
+    hours = request.args.get('hours', default=WeatherService.DEFAULT_FORECAST_HOURS, type=int)
+    
+    # Todos os recortes saem da mesma previsão completa em cache
+    max_days = WeatherService.MAX_FORECAST_DAYS
+    max_hours = max_days * 24
+    if not 1 <= days <= max_days:
+        return None, (jsonify({'error': f'Parâmetro days deve estar entre 1 e {max_days}'}), 400)
+    if not 0 <= hour_offset < max_hours:
+        return None, (jsonify({'error': f'Parâmetro hour_offset deve estar entre 0 e {max_hours - 1}'}), 400)
+    if not 1 <= hours <= max_hours:
+        return None, (jsonify({'error': f'Parâmetro hours deve estar entre 1 e {max_hours}'}), 400)
+    return (days, hour_offset, hours), None
+
+def _parse_stream_locations(value: str) -> Optional[List[Tuple]]:
+    """
+    Interpreta localizações no formato "lat,lon[,nome];lat,lon[,nome]"
+    
+    Returns:
+        Lista de tuplas (latitude, longitude, nome) ou None se alguma for inválida
+    """
+    locations = []
+    for item in value.split(';'):
+        if not item.strip():
+            continue
+        parts = [part.strip() for part in item.split(',', 2)]
+        try:
+            locations.append((float(parts[0]), float(parts[1]), parts[2] if len(parts) > 2 else ''))
+        except (IndexError, ValueError):
+            return None
+    return locations
+
+def _stream_events(subscription, targets: Dict[tuple, List[Tuple]], window: Tuple[int, int, int],
+                   layout: str, json_provider):
+    """
+    Gera os eventos de uma inscrição no formato Server-Sent Events
+    
+    Args:
+        subscription: Inscrição em live_feed
+        targets: Localizações pedidas pelo cliente, por tópico
+        window: Recorte (days, hour_offset, hours) das previsões
+        layout: Layout das séries das previsões
+        json_provider: Serializador JSON do aplicativo
+    """
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    while not subscription.closed:
+        updates = subscription.get(timeout=STREAM_HEARTBEAT)
+        if not updates:
+            yield ": keepalive\n\n"
+            continue
+        
+        for topic, value in updates:
+            kind = topic[0]
+            if kind == 'forecast':
+                value = WeatherService._forecast_window(value, *window)
+            for latitude, longitude, location in targets[topic]:
+                data = WeatherService._for_caller(value, latitude, longitude, location)
+                result = data.to_dict(layout) if kind == 'forecast' else data.to_dict()
+                yield f"event: {kind}\ndata: {json_provider.dumps({'data': result})}\n\n"
+
+def _etag(data, *variant) -> str:
+    """
+    ETag de uma resposta com dados meteorológicos
+    
+    Derivado só da versão do conteúdo vindo da API e de tudo o que muda a
+    representação (coordenadas e nome da localização, formato, layout):
+    o mesmo conteúdo atualizado ou servido como degradado mantém o ETag e
+    continua sendo revalidado com 304.
+    """
+    parts = (data.version, data.latitude, data.longitude, data.location) + variant
+    return hashlib.blake2b('|'.join(map(str, parts)).encode('utf-8'), digest_size=16).hexdigest()
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """
+    ETag que o cliente já tem desta versão, em qualquer codificação, antes de montar o corpo
+    
+    Returns:
+        A variante (original, -gzip ou -br) citada em If-None-Match, ou None
+    """
+    if not request.if_none_match:
+        return None
+    for candidate in Compression.etag_variants(etag):
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+def _weather_response(data, ttl: float, build_body, *variant) -> Response:
+    """
+    Monta a resposta de dados meteorológicos, ou 304 se o cliente já tiver esta versão
+    
+    A revalidação é decidida antes da serialização, então um 304 não paga
+    a codificação nem a compressão do corpo. O 304 devolve o mesmo ETag
+    (com a codificação) que o cliente guardou.
+    
+    Args:
+        data: WeatherData ou ForecastData
+        ttl: Validade da entrada no cache, em segundos
+        build_body: Função sem argumentos que monta a resposta completa
+        *variant: Parâmetros que mudam a representação (formato, layout, recorte)
+    """
+    etag = _etag(data, *variant)
+    matched = _matching_etag(etag)
+    if matched is not None:
+        response = Response(status=304)
+        response.vary.update(('Accept', 'Accept-Encoding'))
+        response.set_etag(matched)
+    else:
+        response = build_body()
+        response.set_etag(etag)
+    response.headers['Age'] = str(int(data.age))
+    return _set_cache_headers(response, data, ttl)
+
+def _set_cache_headers(response: Response, data, ttl: float) -> Response:
+    """
+    Define o Cache-Control de uma resposta com dados meteorológicos
+    
+    O max-age é a validade total da entrada; os caches descontam sozinhos
+    a idade enviada no cabeçalho Age.
+    """
+    if data.stale or data.degraded:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = int(ttl)
+    return response
+
 @weather_bp.route('/current')
 def get_current_weather():
     """Endpoint para obter clima atual"""
@@ -251,21 +1246,58 @@ def get_current_weather():
         if lat is None or lon is None:
             return jsonify({'error': 'Parâmetros lat e lon são obrigatórios'}), 400
         
+        response_format = _response_format()
+        error = _format_error(response_format)
+        if error is not None:
+            return error
+        
         # Usar o WeatherService para obter dados
+        # Cache respondido na própria thread; só a consulta à API vai para o event loop compartilhado
         weather_data = WeatherService.get_current_weather(lat, lon, location)
         
         if weather_data is None:
             print("ERRO: WeatherService retornou None")
             return jsonify({'error': 'Erro ao obter dados meteorológicos'}), 500
         
-        result = weather_data.to_dict()
-        print(f"Retornando dados: {result}")
-        return jsonify({'data': result})  # CORRIGIDO: envolver em 'data'
+        def build_body():
+            result = weather_data.to_dict()
+            print(f"Retornando dados: {result}")
+            return _encode_response({'data': result}, response_format)  # CORRIGIDO: envolver em 'data'
+        
+        return _weather_response(weather_data, WeatherService.CURRENT_CACHE_TTL, build_body, response_format)
         
     except Exception as e:
         print(f"ERRO na rota /current: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@weather_bp.route('/current/batch', methods=['POST'])
+def get_current_weather_batch():
+    """Endpoint para obter clima atual de várias localizações"""
+    try:
+        body = request.get_json(silent=True) or {}
+        locations = body.get('locations')
+        
+        if not isinstance(locations, list) or not locations:
+            return jsonify({'error': 'Campo locations deve ser uma lista não vazia'}), 400
+        
+        if len(locations) > MAX_BATCH_LOCATIONS:
+            return jsonify({'error': f'Máximo de {MAX_BATCH_LOCATIONS} localizações por requisição'}), 400
+        
+        coordinates = []
+        for item in locations:
+            try:
+                coordinates.append((float(item['lat']), float(item['lon']), str(item.get('location', ''))))
+            except (KeyError, TypeError, ValueError):
+                return jsonify({'error': 'Cada localização deve conter lat e lon numéricos'}), 400
+        
+        results = WeatherService.get_current_weather_batch(coordinates)
+        
+        return jsonify({'data': [item.to_dict() if item is not None else None for item in results]})
+        
+    except Exception as e:
+        print(f"ERRO na rota /current/batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @weather_bp.route('/forecast')
 def get_forecast():
     """Endpoint para obter previsão do tempo"""
@@ -274,21 +1306,95 @@ def get_forecast():
         lat = request.args.get('lat', type=float)
         lon = request.args.get('lon', type=float)
         location = request.args.get('location', '')
-        days = request.args.get('days', default=7, type=int)
         
         if lat is None or lon is None:
             return jsonify({'error': 'Parâmetros lat e lon são obrigatórios'}), 400
         
+        window, error = _forecast_window_args()
+        if error is not None:
+            return error
+        days, hour_offset, hours = window
+        
+        # Layout das séries: uma linha por dia/hora (padrão) ou uma lista por variável
+        layout = request.args.get('layout', 'rows')
+        if layout not in FORECAST_LAYOUTS:
+            return jsonify({'error': f'Layout inválido. Use um de: {", ".join(FORECAST_LAYOUTS)}'}), 400
+        
+        response_format = _response_format()
+        error = _format_error(response_format)
+        if error is not None:
+            return error
+        
         # Usar o WeatherService para obter previsão
-        forecast_data = WeatherService.get_forecast(lat, lon, location, days)
+        forecast_data = WeatherService.get_forecast(lat, lon, location, days, hour_offset, hours)
         
         if forecast_data is None:
             return jsonify({'error': 'Erro ao obter previsão meteorológica'}), 500
         
-        result = forecast_data.to_dict()
-        return jsonify({'data': result})  # CORRIGIDO: envolver em 'data'
+        def build_body():
+            result = forecast_data.to_dict(layout)
+            return _encode_response({'data': result}, response_format)  # CORRIGIDO: envolver em 'data'
+        
+        return _weather_response(forecast_data, WeatherService.FORECAST_CACHE_TTL, build_body,
+                                 response_format, layout, days, hour_offset, hours)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@weather_bp.route('/stream')
+def stream_weather():
+    """
+    Endpoint de eventos (Server-Sent Events) com as atualizações das localizações
+    
+    Parâmetros: locations (dados atuais) e forecast (previsões), no formato
+    "lat,lon[,nome];...", e days, hour_offset, hours e layout como em /forecast.
+    Cada mudança chega como um evento 'current' ou 'forecast' com o mesmo
+    conteúdo das rotas /current e /forecast; ao conectar, o cliente recebe
+    os últimos valores já conhecidos.
+    """
+    try:
+        locations = _parse_stream_locations(request.args.get('locations', ''))
+        forecast_locations = _parse_stream_locations(request.args.get('forecast', ''))
+        
+        if locations is None or forecast_locations is None:
+            return jsonify({'error': 'Localizações devem estar no formato lat,lon[,nome];...'}), 400
+        if not locations and not forecast_locations:
+            return jsonify({'error': 'Parâmetro locations ou forecast é obrigatório'}), 400
+        if len(locations) + len(forecast_locations) > MAX_BATCH_LOCATIONS:
+            return jsonify({'error': f'Máximo de {MAX_BATCH_LOCATIONS} localizações por conexão'}), 400
+        
+        window, error = _forecast_window_args()
+        if error is not None:
+            return error
+        
+        layout = request.args.get('layout', 'rows')
+        if layout not in FORECAST_LAYOUTS:
+            return jsonify({'error': f'Layout inválido. Use um de: {", ".join(FORECAST_LAYOUTS)}'}), 400
+        
+        if live_feed.subscription_count() >= STREAM_MAX_CLIENTS:
+            response = jsonify({'error': 'Limite de conexões ao fluxo de eventos atingido'})
+            response.headers['Retry-After'] = str(STREAM_RETRY_MS // 1000)
+            return response, 503
+        
+        # Localizações na mesma célula da grade compartilham o tópico (a chave de cache)
+        targets: Dict[tuple, List[Tuple]] = {}
+        for kind, items in (('current', locations), ('forecast', forecast_locations)):
+            for latitude, longitude, location in items:
+                targets.setdefault(WeatherService._cache_key(kind, latitude, longitude), []).append(
+                    (latitude, longitude, location))
+        
+        subscription = live_feed.subscribe(targets)
+        response = Response(_stream_events(subscription, targets, window, layout, current_app.json),
+                            mimetype='text/event-stream')
+        # O servidor fecha a resposta também quando o cliente desconecta
+        response.call_on_close(lambda: live_feed.unsubscribe(subscription))
+        response.cache_control.no_cache = True
+        # Proxies como o nginx não devem acumular os eventos
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
         
     except Exception as e:
+        print(f"ERRO na rota /stream: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @weather_bp.route('/test')
@@ -306,49 +1412,14 @@ def search_cities():
             return jsonify({'error': 'Parâmetro q (query) é obrigatório'}), 400
         
         # Usar API de geocoding do Open-Meteo
-        geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
-        params = {
-            'name': query,
-            'count': 10,
-            'language': 'pt',
-            'format': 'json'
-        }
+        cities = GeocodingService.search_cities(query)
         
-        print(f"Buscando cidades: {query}")
-        
-        response = requests.get(geocoding_url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Processar resultados
-        cities = []
-        if 'results' in data:
-            for result in data['results']:
-                city = {
-                    'name': result.get('name', ''),
-                    'lat': result.get('latitude', 0),
-                    'lon': result.get('longitude', 0),
-                    'country': result.get('country', ''),
-                    'admin1': result.get('admin1', ''),  # Estado/província
-                }
-                
-                # Criar nome completo da cidade
-                name_parts = [city['name']]
-                if city['admin1']:
-                    name_parts.append(city['admin1'])
-                if city['country']:
-                    name_parts.append(city['country'])
-                
-                city['name'] = ', '.join(name_parts)
-                cities.append(city)
+        if cities is None:
+            return jsonify({'error': 'Erro ao buscar cidades'}), 500
         
         print(f"Encontradas {len(cities)} cidades")
         return jsonify({'data': cities})
         
-    except requests.RequestException as e:
-        print(f"Erro na requisição de geocoding: {e}")
-        return jsonify({'error': 'Erro ao buscar cidades'}), 500
     except Exception as e:
         print(f"ERRO na rota /search: {str(e)}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
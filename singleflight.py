@@ -0,0 +1,105 @@
+"""
+Agrupamento de chamadas idênticas em andamento (single-flight)
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Garante uma única execução por chave enquanto ela estiver em andamento
+
+    Chamadores síncronos e assíncronos compartilham a mesma tabela de
+    chamadas, então uma consulta iniciada por uma view assíncrona também
+    atende threads que pedem a mesma chave, e vice-versa.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def _join(self, key: Hashable):
+        """
+        Registra o chamador para a chave
+
+        Returns:
+            Tupla (future da chamada, True se o chamador deve executá-la)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None) -> None:
+        """Libera a chave e entrega o resultado aos chamadores em espera"""
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Executa fn uma única vez para a chave; chamadores concorrentes
+        aguardam e recebem o mesmo resultado (ou a mesma exceção)
+
+        Args:
+            key: Chave que identifica a chamada
+            fn: Função a executar
+            *args: Argumentos posicionais de fn
+            **kwargs: Argumentos nomeados de fn
+
+        Returns:
+            Resultado de fn
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """
+        Versão assíncrona de do: aguarda sem bloquear o event loop
+
+        Args:
+            key: Chave que identifica a chamada
+            fn: Função assíncrona a executar
+            *args: Argumentos posicionais de fn
+            **kwargs: Argumentos nomeados de fn
+
+        Returns:
+            Resultado de fn
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        """Retorna o número de chamadas em andamento"""
+        with self._lock:
+            return len(self._calls)
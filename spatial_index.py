@@ -0,0 +1,175 @@
+"""
+Índice espacial em grade para busca da cidade mais próxima
+"""
+import math
+from array import array
+from typing import Dict, Optional, Sequence, Tuple
+
+# Raio médio da Terra em quilômetros
+EARTH_RADIUS_KM = 6371.0088
+
+# Quilômetros por grau de latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Chave numérica de uma célula: linha * CELL_KEY_STRIDE + coluna (ordena como (linha, coluna))
+CELL_KEY_STRIDE = 1 << 20
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calcula a distância entre dois pontos na superfície da Terra
+
+    Args:
+        lat1: Latitude do primeiro ponto
+        lon1: Longitude do primeiro ponto
+        lat2: Latitude do segundo ponto
+        lon2: Longitude do segundo ponto
+
+    Returns:
+        Distância em quilômetros
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def grid_cells(latitudes: Sequence[float], longitudes: Sequence[float],
+               cell_size: float) -> Tuple[array, array, array]:
+    """
+    Monta a grade em tabelas ordenadas, para gravar em arquivo e usar com GridIndex.from_tables
+
+    Args:
+        latitudes: Latitude de cada ponto
+        longitudes: Longitude de cada ponto
+        cell_size: Tamanho da célula em graus
+
+    Returns:
+        Tupla (chaves das células em ordem crescente, início de cada célula
+        em ids mais o fim da última, posições dos pontos agrupadas por célula)
+    """
+    keys = [math.floor(latitudes[position] / cell_size) * CELL_KEY_STRIDE
+            + math.floor(longitudes[position] / cell_size) for position in range(len(latitudes))]
+    ids = array('I', sorted(range(len(keys)), key=keys.__getitem__))
+
+    cell_keys = array('q')
+    cell_offsets = array('I')
+    for offset, position in enumerate(ids):
+        if not cell_keys or cell_keys[-1] != keys[position]:
+            cell_keys.append(keys[position])
+            cell_offsets.append(offset)
+    cell_offsets.append(len(ids))
+    return cell_keys, cell_offsets, ids
+
+
+class _CellTable:
+    """Células de uma grade lidas de tabelas ordenadas"""
+
+    def __init__(self, keys: Sequence[int], offsets: Sequence[int], ids: Sequence[int]):
+        # Só as chaves das células (não os pontos) vão para um dicionário
+        self._cells = dict(zip(keys, range(len(keys))))
+        self._offsets = offsets
+        self._ids = ids
+
+    def get(self, cell: Tuple[int, int]) -> Optional[Sequence[int]]:
+        index = self._cells.get(cell[0] * CELL_KEY_STRIDE + cell[1])
+        if index is None:
+            return None
+        return self._ids[self._offsets[index]:self._offsets[index + 1]]
+
+
+class GridIndex:
+    """Grade de células lat/lon com as posições dos pontos em cada célula"""
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float], cell_size: float = 0.5):
+        """
+        Args:
+            latitudes: Latitude de cada ponto
+            longitudes: Longitude de cada ponto
+            cell_size: Tamanho da célula em graus
+        """
+        self.cell_size = cell_size
+        self._latitudes = latitudes
+        self._longitudes = longitudes
+        self._cells: Dict[Tuple[int, int], array] = {}
+
+        for position in range(len(latitudes)):
+            cell = self._cell(latitudes[position], longitudes[position])
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                bucket = self._cells[cell] = array('I')
+            bucket.append(position)
+
+    @classmethod
+    def from_tables(cls, latitudes: Sequence[float], longitudes: Sequence[float], cell_keys: Sequence[int],
+                    cell_offsets: Sequence[int], cell_ids: Sequence[int], cell_size: float) -> 'GridIndex':
+        """
+        Cria um índice a partir das tabelas de grid_cells (por exemplo,
+        mapeadas em memória a partir de um arquivo)
+
+        Args:
+            latitudes: Latitude de cada ponto
+            longitudes: Longitude de cada ponto
+            cell_keys: Chaves das células em ordem crescente
+            cell_offsets: Início de cada célula em cell_ids, mais o fim da última
+            cell_ids: Posições dos pontos agrupadas por célula
+            cell_size: Tamanho da célula em graus usado ao montar as tabelas
+
+        Returns:
+            GridIndex que usa as tabelas sem copiá-las
+        """
+        index = cls.__new__(cls)
+        index.cell_size = cell_size
+        index._latitudes = latitudes
+        index._longitudes = longitudes
+        index._cells = _CellTable(cell_keys, cell_offsets, cell_ids)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._latitudes)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Retorna a célula que contém a coordenada"""
+        return math.floor(latitude / self.cell_size), math.floor(longitude / self.cell_size)
+
+    def nearest(self, latitude: float, longitude: float, max_distance_km: float) -> Optional[Tuple[int, float]]:
+        """
+        Busca o ponto mais próximo dentro da distância máxima
+
+        Args:
+            latitude: Latitude da consulta
+            longitude: Longitude da consulta
+            max_distance_km: Distância máxima aceita em quilômetros
+
+        Returns:
+            Tupla (posição, distância em km) ou None se nenhum ponto estiver perto
+        """
+        row, column = self._cell(latitude, longitude)
+
+        # Quantas células percorrer em cada direção para cobrir o raio
+        lat_span = math.ceil(max_distance_km / KM_PER_DEGREE / self.cell_size)
+        cos_lat = max(math.cos(math.radians(min(abs(latitude) + lat_span * self.cell_size, 89.0))), 1e-6)
+        lon_span = min(math.ceil(max_distance_km / (KM_PER_DEGREE * cos_lat) / self.cell_size),
+                       math.ceil(180 / self.cell_size))
+
+        # Número de colunas em meia volta, para ajustar células que atravessam o antimeridiano
+        half_turn = round(180 / self.cell_size)
+
+        best = None
+        best_distance = 0.0
+        for i in range(row - lat_span, row + lat_span + 1):
+            for j in range(column - lon_span, column + lon_span + 1):
+                j_wrapped = (j + half_turn) % (2 * half_turn) - half_turn
+                bucket = self._cells.get((i, j_wrapped))
+                if bucket is None:
+                    continue
+                for position in bucket:
+                    distance = haversine_km(latitude, longitude,
+                                            self._latitudes[position], self._longitudes[position])
+                    if distance <= max_distance_km and (best is None or distance < best_distance):
+                        best = position
+                        best_distance = distance
+
+        return None if best is None else (best, best_distance)
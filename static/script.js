@@ -10,6 +10,8 @@ class WeatherApp {
         this.savedCities = this.loadSavedCities();
         this.cache = new Map();
         this.cacheTimeout = 5 * 60 * 1000; // 5 minutos
+        this.eventSource = null;
+        this.liveUrl = null;
         
         this.init();
     }
@@ -23,12 +25,15 @@ class WeatherApp {
         this.renderSavedCities();
         this.updateLastUpdated();
         
-        // Atualizar dados a cada 10 minutos
-        setInterval(() => {
-            if (this.currentLocation) {
-                this.loadWeatherData(this.currentLocation);
-            }
-        }, 10 * 60 * 1000);
+        // O servidor envia as mudanças pelo fluxo de eventos; sem suporte
+        // a EventSource, atualizar dados a cada 10 minutos
+        if (!window.EventSource) {
+            setInterval(() => {
+                if (this.currentLocation) {
+                    this.loadWeatherData(this.currentLocation);
+                }
+            }, 10 * 60 * 1000);
+        }
     }
 
     /**
@@ -254,6 +259,7 @@ class WeatherApp {
      */
     async loadWeatherData(location) {
         this.currentLocation = location;
+        this.connectLiveUpdates();
         
         try {
             // Carregar dados atuais e previsão em paralelo
@@ -271,6 +277,81 @@ class WeatherApp {
         }
     }
 
+    /**
+     * Conecta ao fluxo de eventos da localização atual e das cidades salvas
+     */
+    connectLiveUpdates() {
+        if (!window.EventSource) {
+            return;
+        }
+
+        const format = location => `${location.lat},${location.lon},${location.name.replace(/;/g, ' ')}`;
+        const locations = this.currentLocation ? [...this.savedCities, this.currentLocation] : this.savedCities;
+        const params = new URLSearchParams({ locations: locations.map(format).join(';') });
+        if (this.currentLocation) {
+            params.set('forecast', format(this.currentLocation));
+        }
+        const url = `${this.apiBase}/stream?${params}`;
+
+        if (url === this.liveUrl) {
+            return;
+        }
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+        this.liveUrl = url;
+
+        if (locations.length === 0) {
+            return;
+        }
+
+        // O navegador reconecta sozinho se a conexão cair
+        this.eventSource = new EventSource(url);
+        this.eventSource.addEventListener('current', event => {
+            this.handleCurrentUpdate(JSON.parse(event.data).data);
+        });
+        this.eventSource.addEventListener('forecast', event => {
+            this.handleForecastUpdate(JSON.parse(event.data).data);
+        });
+    }
+
+    /**
+     * Verifica se os dados recebidos são de uma localização
+     */
+    isSameLocation(location, data) {
+        return Boolean(location) && location.lat === data.latitude && location.lon === data.longitude;
+    }
+
+    /**
+     * Aplica dados atuais recebidos pelo fluxo de eventos
+     */
+    handleCurrentUpdate(data) {
+        this.setCache(`current_${data.latitude}_${data.longitude}`, data);
+
+        if (this.isSameLocation(this.currentLocation, data)) {
+            this.renderCurrentWeather(data);
+            this.updateLastUpdated();
+        }
+
+        if (this.savedCities.some(city => this.isSameLocation(city, data))) {
+            // Vários eventos chegam juntos ao conectar: redesenhar uma vez
+            clearTimeout(this.savedCitiesTimer);
+            this.savedCitiesTimer = setTimeout(() => this.renderSavedCities(), 100);
+        }
+    }
+
+    /**
+     * Aplica a previsão recebida pelo fluxo de eventos
+     */
+    handleForecastUpdate(data) {
+        if (this.isSameLocation(this.currentLocation, data)) {
+            this.setCache(`forecast_${data.latitude}_${data.longitude}_7`, data);
+            this.renderForecast(data);
+            this.updateLastUpdated();
+        }
+    }
+
     /**
      * Busca dados meteorológicos atuais
      */
@@ -296,6 +377,54 @@ class WeatherApp {
         return data.data;
     }
 
+    /**
+     * Busca dados meteorológicos atuais de várias cidades em uma única requisição
+     */
+    async fetchCurrentWeatherBatch(locations) {
+        const results = locations.map(location =>
+            this.getFromCache(`current_${location.lat}_${location.lon}`)
+        );
+        const missing = locations.filter((_, index) => !results[index]);
+
+        if (missing.length === 0) {
+            return results;
+        }
+
+        try {
+            const response = await fetch(`${this.apiBase}/current/batch`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    locations: missing.map(location => ({
+                        lat: location.lat,
+                        lon: location.lon,
+                        location: location.name
+                    }))
+                })
+            });
+
+            const data = await response.json();
+
+            if (!response.ok) {
+                throw new Error(data.error || 'Erro ao obter dados atuais');
+            }
+
+            let next = 0;
+            return results.map((cached, index) => {
+                if (cached) {
+                    return cached;
+                }
+                const weather = data.data[next++];
+                if (weather) {
+                    this.setCache(`current_${locations[index].lat}_${locations[index].lon}`, weather);
+                }
+                return weather;
+            });
+        } catch (error) {
+            return results;
+        }
+    }
+
     /**
      * Busca previsão meteorológica
      */
@@ -525,17 +654,12 @@ class WeatherApp {
         content.innerHTML = '<div class="loading"><div class="loading-spinner"></div><p>Carregando cidades salvas...</p></div>';
         
         try {
-            // Carregar dados de todas as cidades salvas
-            const citiesData = await Promise.all(
-                this.savedCities.map(async city => {
-                    try {
-                        const data = await this.fetchCurrentWeather(city);
-                        return { ...city, weather: data };
-                    } catch (error) {
-                        return { ...city, weather: null };
-                    }
-                })
-            );
+            // Carregar dados de todas as cidades salvas em uma única requisição
+            const weatherList = await this.fetchCurrentWeatherBatch(this.savedCities);
+            const citiesData = this.savedCities.map((city, index) => ({
+                ...city,
+                weather: weatherList[index]
+            }));
             
             const html = `
                 <div class="saved-cities-grid">
@@ -619,6 +743,7 @@ class WeatherApp {
         } catch (error) {
             console.error('Erro ao salvar cidades:', error);
         }
+        this.connectLiveUpdates();
     }
 
     /**
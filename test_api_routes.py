@@ -3,7 +3,9 @@ Testes de integração para as rotas da API
 """
 import pytest
 import json
+from datetime import datetime
 from unittest.mock import patch, Mock
+from src.models.weather import ForecastData, WeatherData, WeatherService, live_feed
 
 
 class TestWeatherAPIRoutes:
@@ -18,7 +20,7 @@ class TestWeatherAPIRoutes:
         assert data['status'] == 'healthy'
         assert 'timestamp' in data
     
-    @patch('src.models.weather.WeatherService.get_current_weather')
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
     def test_current_weather_success(self, mock_weather, client):
         """Testa endpoint de dados meteorológicos atuais com sucesso"""
         # Mock do serviço meteorológico
@@ -58,7 +60,7 @@ class TestWeatherAPIRoutes:
         data = json.loads(response.data)
         assert 'error' in data
     
-    @patch('src.models.weather.WeatherService.get_current_weather')
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
     def test_current_weather_service_error(self, mock_weather, client):
         """Testa endpoint de dados atuais com erro no serviço"""
         # Mock retornando None (erro)
@@ -72,7 +74,38 @@ class TestWeatherAPIRoutes:
         data = json.loads(response.data)
         assert 'error' in data
     
-    @patch('src.models.weather.WeatherService.get_forecast')
+    @patch('src.models.weather.WeatherService.get_current_weather_batch')
+    def test_current_weather_batch_success(self, mock_batch, client):
+        """Testa endpoint em lote de dados meteorológicos atuais"""
+        mock_weather_data = Mock()
+        mock_weather_data.to_dict.return_value = {'location': 'São Paulo', 'temperature': 25.0}
+        mock_batch.return_value = [mock_weather_data, None]
+        
+        response = client.post('/api/weather/current/batch', json={
+            'locations': [
+                {'lat': -23.5505, 'lon': -46.6333, 'location': 'São Paulo'},
+                {'lat': -25.4284, 'lon': -49.2733}
+            ]
+        })
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['data'][0]['location'] == 'São Paulo'
+        assert data['data'][1] is None
+        mock_batch.assert_called_once_with([
+            (-23.5505, -46.6333, 'São Paulo'),
+            (-25.4284, -49.2733, '')
+        ])
+    
+    def test_current_weather_batch_invalid_body(self, client):
+        """Testa endpoint em lote com corpo inválido"""
+        response = client.post('/api/weather/current/batch', json={'locations': [{'lat': 'x'}]})
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'error' in data
+    
+    @patch('src.models.weather.WeatherService.get_forecast_async')
     def test_forecast_success(self, mock_forecast, client):
         """Testa endpoint de previsão com sucesso"""
         # Mock do serviço de previsão
@@ -101,6 +134,99 @@ class TestWeatherAPIRoutes:
         assert data['data']['location'] == 'São Paulo'
         assert len(data['data']['daily_forecast']) == 1
     
+    @patch('src.models.weather.WeatherService.get_forecast_async')
+    def test_forecast_columns_layout(self, mock_forecast, client):
+        """Testa previsão no layout em colunas"""
+        mock_forecast.return_value = ForecastData(
+            location='São Paulo',
+            latitude=-23.5505,
+            longitude=-46.6333,
+            daily_forecast=[],
+            hourly_forecast=[
+                {'time': '2025-07-04T20:00', 'temperature': 25.0},
+                {'time': '2025-07-04T21:00', 'temperature': 24.0}
+            ]
+        )
+        
+        response = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333&layout=columns')
+        
+        assert response.status_code == 200
+        hourly = json.loads(response.data)['data']['hourly_forecast']
+        assert hourly == {'time': ['2025-07-04T20:00', '2025-07-04T21:00'], 'temperature': [25.0, 24.0]}
+    
+    @patch('src.models.weather.WeatherService.get_forecast_async')
+    def test_forecast_hour_window(self, mock_forecast, client):
+        """Testa repasse da janela de horas e ETag diferente por recorte"""
+        mock_forecast.return_value = ForecastData(
+            location='São Paulo', latitude=-23.5505, longitude=-46.6333,
+            daily_forecast=[], hourly_forecast=[], version='v1'
+        )
+        
+        first = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333&days=3&hour_offset=24&hours=12')
+        second = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333&days=3&hour_offset=36&hours=12')
+        
+        assert first.status_code == 200
+        mock_forecast.assert_any_call(-23.5505, -46.6333, '', 3, 24, 12)
+        assert first.headers['ETag'] != second.headers['ETag']
+    
+    def test_forecast_invalid_hour_window(self, client):
+        """Testa janela de horas fora do horizonte da previsão"""
+        for query in ('hour_offset=-1', 'hour_offset=384', 'hours=0', 'hours=385', 'days=0'):
+            response = client.get(f'/api/weather/forecast?lat=-23.5505&lon=-46.6333&{query}')
+            assert response.status_code == 400, query
+    
+    def test_forecast_invalid_layout(self, client):
+        """Testa previsão com layout inválido"""
+        response = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333&layout=xml')
+        
+        assert response.status_code == 400
+    
+    @patch('src.models.weather.msgpack', None)
+    def test_forecast_msgpack_unavailable(self, client):
+        """Testa resposta 406 quando o msgpack não está instalado"""
+        response = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333',
+                              headers={'Accept': 'application/msgpack'})
+        
+        assert response.status_code == 406
+    
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
+    def test_current_weather_msgpack(self, mock_weather, client):
+        """Testa negociação do formato MessagePack pelo cabeçalho Accept"""
+        mock_weather.return_value = Mock(age=0)
+        mock_weather.return_value.to_dict.return_value = {'temperature': 25.0}
+        fake_msgpack = Mock()
+        fake_msgpack.packb.return_value = b'\x81\xa4data'
+        
+        with patch('src.models.weather.msgpack', fake_msgpack):
+            response = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333',
+                                  headers={'Accept': 'application/msgpack'})
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/msgpack'
+        assert response.data == b'\x81\xa4data'
+        assert 'Accept' in response.headers['Vary']
+        fake_msgpack.packb.assert_called_once_with({'data': {'temperature': 25.0}}, use_bin_type=True)
+    
+    @patch('src.models.weather.WeatherService.get_forecast_async')
+    def test_forecast_msgpack_round_trip(self, mock_forecast, client):
+        """Testa o MessagePack real: decodificado, traz os mesmos dados da resposta JSON"""
+        msgpack = pytest.importorskip('msgpack')
+        mock_forecast.return_value = WeatherService._parse_forecast({
+            'current': {'time': '2025-07-04T20:00', 'temperature_2m': 25.5, 'weather_code': 1},
+            'daily': {'time': ['2025-07-04', '2025-07-05'], 'temperature_2m_max': [25.0, 26.5],
+                      'temperature_2m_min': [15.0, 14.5], 'weather_code': [1, 61], 'precipitation_sum': [0.0, 3.2]},
+            'hourly': {'time': ['2025-07-04T00:00', '2025-07-04T01:00'], 'temperature_2m': [18.0, 17.5],
+                       'relative_humidity_2m': [70, 72], 'wind_speed_10m': [5.0, 4.0], 'weather_code': [1, 2]}
+        }, -23.5505, -46.6333)
+        
+        for layout in ('rows', 'columns'):
+            url = f'/api/weather/forecast?lat=-23.5505&lon=-46.6333&layout={layout}'
+            packed = client.get(f'{url}&format=msgpack')
+            
+            assert packed.status_code == 200
+            assert packed.mimetype == 'application/msgpack'
+            assert msgpack.unpackb(packed.data, raw=False) == json.loads(client.get(url).data)
+    
     def test_forecast_invalid_days(self, client):
         """Testa endpoint de previsão com número de dias inválido"""
         response = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333&days=20')
@@ -133,6 +259,17 @@ class TestWeatherAPIRoutes:
         assert data['count'] == 1
         assert data['data'][0]['name'] == 'São Paulo, SP'
     
+    @patch('src.models.weather.GeocodingService.search_cities_async')
+    def test_search_cities_upstream_error(self, mock_search, client):
+        """Testa endpoint de busca com falha na API de geocodificação"""
+        mock_search.return_value = None
+        
+        response = client.get('/api/weather/search?q=Curitiba')
+        
+        assert response.status_code == 500
+        data = json.loads(response.data)
+        assert 'error' in data
+    
     def test_search_location_missing_query(self, client):
         """Testa endpoint de busca sem query"""
         response = client.get('/api/weather/search')
@@ -195,6 +332,120 @@ class TestWeatherAPIRoutes:
         assert 'error' in data
 
 
+class TestStreamRoute:
+    """Testes para o fluxo de eventos (/stream)"""
+    
+    @staticmethod
+    def _weather(latitude, longitude, temperature=25.0):
+        """Dados atuais como retornados pela consulta em lote"""
+        return WeatherData(
+            location='', latitude=latitude, longitude=longitude, temperature=temperature,
+            humidity=65, wind_speed=10.5, wind_direction=180, weather_code=1,
+            timestamp=datetime(2025, 7, 4, 20, 0), description='Principalmente limpo'
+        )
+    
+    @staticmethod
+    def _next_event(stream):
+        """Lê o próximo evento do fluxo, ignorando comentários e o intervalo de reconexão"""
+        for chunk in stream:
+            text = chunk.decode('utf-8')
+            if text.startswith((':', 'retry:')):
+                continue
+            fields = dict(line.split(': ', 1) for line in text.strip().split('\n'))
+            return fields['event'], json.loads(fields['data'])['data']
+        raise AssertionError('Fluxo encerrado sem eventos')
+    
+    @patch('src.models.weather.STREAM_HEARTBEAT', 0.05)
+    @patch('src.models.weather.WeatherService._fetch_current_weather_batch_async')
+    def test_stream_pushes_only_changes(self, mock_fetch, client):
+        """Testa o envio inicial e depois apenas das mudanças"""
+        mock_fetch.side_effect = lambda coordinates: [self._weather(lat, lon) for lat, lon in coordinates]
+        
+        response = client.get('/api/weather/stream?locations=-23.5505,-46.6333,São Paulo', buffered=False)
+        try:
+            stream = iter(response.response)
+            assert response.status_code == 200
+            assert response.mimetype == 'text/event-stream'
+            assert 'Content-Encoding' not in response.headers
+            
+            kind, data = self._next_event(stream)
+            assert kind == 'current'
+            assert data['location'] == 'São Paulo'
+            assert data['latitude'] == -23.5505
+            assert data['temperature'] == 25.0
+            
+            # Sem mudança, só o comentário que mantém a conexão
+            assert live_feed.refresh() == 0
+            assert next(stream) == b': keepalive\n\n'
+            
+            WeatherService.clear_cache()
+            mock_fetch.side_effect = lambda coordinates: [self._weather(lat, lon, 27.0) for lat, lon in coordinates]
+            assert live_feed.refresh() == 1
+            
+            kind, data = self._next_event(stream)
+            assert data['temperature'] == 27.0
+        finally:
+            response.close()
+        
+        assert live_feed.subscription_count() == 0
+        assert live_feed.topics() == []
+    
+    @patch('src.models.weather.WeatherService._fetch_current_weather_batch_async')
+    def test_stream_clients_share_upstream_fetch(self, mock_fetch, client):
+        """Testa que clientes na mesma localização compartilham a consulta à API"""
+        mock_fetch.side_effect = lambda coordinates: [self._weather(lat, lon) for lat, lon in coordinates]
+        
+        first = client.get('/api/weather/stream?locations=-23.5505,-46.6333,São Paulo', buffered=False)
+        second = client.get('/api/weather/stream?locations=-23.5512,-46.6341,Sé', buffered=False)
+        try:
+            _, first_data = self._next_event(iter(first.response))
+            _, second_data = self._next_event(iter(second.response))
+            
+            assert mock_fetch.call_count == 1
+            assert live_feed.stats()['topics'] == 1
+            assert first_data['location'] == 'São Paulo'
+            assert (second_data['location'], second_data['latitude']) == ('Sé', -23.5512)
+        finally:
+            first.close()
+            second.close()
+    
+    @patch('src.models.weather.WeatherService._fetch_forecast_batch_async')
+    def test_stream_forecast_window(self, mock_fetch, client):
+        """Testa eventos de previsão com o recorte pedido"""
+        mock_fetch.side_effect = lambda coordinates: [ForecastData(
+            location='', latitude=lat, longitude=lon,
+            daily_forecast=[{'date': f'2025-07-0{day + 4}'} for day in range(3)],
+            hourly_forecast=[{'time': hour} for hour in range(72)]
+        ) for lat, lon in coordinates]
+        
+        response = client.get('/api/weather/stream?forecast=-23.5505,-46.6333&days=2&hour_offset=6&hours=12',
+                              buffered=False)
+        try:
+            kind, data = self._next_event(iter(response.response))
+        finally:
+            response.close()
+        
+        assert kind == 'forecast'
+        assert len(data['daily_forecast']) == 2
+        assert [row['time'] for row in data['hourly_forecast']] == list(range(6, 18))
+    
+    def test_stream_invalid_params(self, client):
+        """Testa parâmetros ausentes ou inválidos"""
+        for query in ('', 'locations=abc', 'locations=-23.5;x', 'forecast=-23.5,-46.6&days=0',
+                      'locations=-23.5,-46.6&layout=xml'):
+            response = client.get(f'/api/weather/stream?{query}')
+            assert response.status_code == 400, query
+        assert live_feed.subscription_count() == 0
+    
+    @patch('src.models.weather.STREAM_MAX_CLIENTS', 0)
+    def test_stream_client_limit(self, client):
+        """Testa recusa de novas conexões acima do limite"""
+        response = client.get('/api/weather/stream?locations=-23.5505,-46.6333')
+        
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+
+
 class TestStaticRoutes:
     """Testes para rotas estáticas"""
     
@@ -0,0 +1,79 @@
+"""
+Testes para os arquivos estáticos versionados e pré-comprimidos
+"""
+import gzip
+import re
+from unittest.mock import patch
+from src.main import app
+from src.models.assets import StaticAssets
+
+
+class TestStaticAssets:
+    """Testes para o pipeline de arquivos estáticos"""
+
+    def test_index_references_fingerprinted_assets(self, client):
+        """Testa que o HTML aponta para os nomes versionados e é revalidado"""
+        with client.get('/') as response:
+            html = response.get_data(as_text=True)
+
+        assert re.search(r'href="/styles\.[0-9a-f]{12}\.css"', html)
+        assert re.search(r'src="/script\.[0-9a-f]{12}\.js"', html)
+        assert 'https://cdnjs.cloudflare.com' in html
+        assert response.headers['Cache-Control'] == 'public, no-cache'
+
+    def test_fingerprinted_asset_is_immutable(self, client):
+        """Testa cache imutável de um ano para o nome versionado"""
+        url = StaticAssets.url_for('styles.css')
+
+        with client.get(url) as response:
+            versioned = response.data
+        with client.get('/styles.css') as original:
+            pass
+
+        assert url != '/styles.css'
+        assert response.status_code == 200
+        assert response.mimetype == 'text/css'
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+        assert versioned == original.data
+        assert 'immutable' not in original.headers['Cache-Control']
+
+    def test_precompressed_variant(self, client):
+        """Testa que a versão gzip vem pronta da memória"""
+        url = StaticAssets.url_for('script.js')
+
+        with patch('src.models.compression.Compression.compress') as mock_compress:
+            with client.get(url, headers={'Accept-Encoding': 'gzip'}) as response:
+                compressed = response.data
+
+        mock_compress.assert_not_called()
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['ETag'].endswith('-gzip"')
+        assert 'Accept-Encoding' in response.headers['Vary']
+        with client.get(url, headers={'Accept-Encoding': ''}) as plain:
+            assert gzip.decompress(compressed) == plain.data
+
+    def test_unknown_path_serves_index(self, client):
+        """Testa que rotas do frontend recebem a página inicial"""
+        with client.get('/cidades/sao-paulo') as response:
+            assert response.status_code == 200
+            assert b'Aplicativo do Tempo com IA' in response.data
+
+    def test_build_rewrites_only_known_files(self, tmp_path):
+        """Testa o versionamento a partir de uma pasta qualquer"""
+        (tmp_path / 'index.html').write_text(
+            '<link href="app.css"><script src="/app.js"></script><img src="/missing.png">', encoding='utf-8'
+        )
+        (tmp_path / 'app.css').write_text('body { color: red; }', encoding='utf-8')
+        (tmp_path / 'app.js').write_text('console.log(1);', encoding='utf-8')
+
+        try:
+            StaticAssets.build(str(tmp_path))
+            with app.test_request_context('/'):
+                html = StaticAssets.response('index.html').get_data(as_text=True)
+
+            assert f'href="{StaticAssets.url_for("app.css")}"' in html
+            assert f'src="{StaticAssets.url_for("app.js")}"' in html
+            assert 'src="/missing.png"' in html
+        finally:
+            StaticAssets.init_app(app)
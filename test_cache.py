@@ -0,0 +1,105 @@
+"""
+Testes para o cache em memória com TTL e LRU
+"""
+from unittest.mock import patch
+from src.models.cache import TTLCache
+
+
+class TestTTLCache:
+    """Testes para a classe TTLCache"""
+    
+    def test_set_and_get(self):
+        """Testa armazenamento e leitura de um valor"""
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('chave', 'valor')
+        
+        assert cache.get('chave') == 'valor'
+        assert cache.get('ausente') is None
+    
+    @patch('src.models.cache.time.monotonic')
+    def test_entry_expires(self, mock_monotonic):
+        """Testa expiração de entradas após o TTL"""
+        mock_monotonic.return_value = 1000.0
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('chave', 'valor', ttl=30)
+        
+        mock_monotonic.return_value = 1029.0
+        assert cache.get('chave') == 'valor'
+        
+        mock_monotonic.return_value = 1030.0
+        assert cache.get('chave') is None
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self):
+        """Testa remoção da entrada menos usada recentemente"""
+        cache = TTLCache(max_entries=2, default_ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        
+        # Acessar 'a' torna 'b' a entrada menos recente
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+    
+    def test_stats_counters(self):
+        """Testa contadores de acertos e falhas"""
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('chave', 'valor')
+        cache.get('chave')
+        cache.get('chave')
+        cache.get('ausente')
+        
+        stats = cache.stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['size'] == 1
+    
+    def test_lookup_without_count(self):
+        """Testa consultas não contadas, com o resultado final contado depois por record"""
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('chave', 'valor')
+        cache.lookup('chave', count=False)
+        cache.lookup('ausente', count=False)
+        cache.record(None)
+        cache.record(True)
+        
+        stats = cache.stats()
+        assert (stats['hits'], stats['stale_hits'], stats['misses']) == (0, 1, 1)
+    
+    def test_clear(self):
+        """Testa limpeza do cache"""
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('chave', 'valor')
+        cache.get('chave')
+        cache.clear()
+        
+        assert len(cache) == 0
+        assert cache.stats()['hits'] == 0
+    
+    @patch('src.models.cache.time.monotonic')
+    def test_lookup_stale_entry(self, mock_monotonic):
+        """Testa leitura de entradas expiradas dentro do prazo de max_stale"""
+        mock_monotonic.return_value = 1000.0
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('chave', 'valor', ttl=30, max_stale=60)
+        
+        mock_monotonic.return_value = 1010.0
+        entry = cache.lookup('chave', allow_stale=True)
+        assert entry.value == 'valor'
+        assert entry.age == 10.0
+        assert entry.stale is False
+        
+        mock_monotonic.return_value = 1045.0
+        assert cache.get('chave') is None
+        entry = cache.lookup('chave', allow_stale=True)
+        assert entry.stale is True
+        assert entry.age == 45.0
+        assert cache.stats()['stale_hits'] == 1
+        
+        mock_monotonic.return_value = 1090.0
+        assert cache.lookup('chave', allow_stale=True) is None
+        assert len(cache) == 0
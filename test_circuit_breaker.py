@@ -0,0 +1,74 @@
+"""
+Testes para o disjuntor de chamadas externas
+"""
+from unittest.mock import patch
+from src.models.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """Testes para a classe CircuitBreaker"""
+    
+    def test_opens_after_consecutive_failures(self):
+        """Testa abertura após o limite de falhas seguidas"""
+        breaker = CircuitBreaker(failure_threshold=3)
+        
+        for _ in range(3):
+            assert breaker.allow_request() is True
+            breaker.record(False)
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.stats()['rejected'] == 1
+    
+    def test_success_resets_failures(self):
+        """Testa que um sucesso zera a contagem de falhas"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        
+        breaker.record(False)
+        breaker.record(True)
+        breaker.record(False)
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_slow_calls_count_as_failures(self):
+        """Testa que chamadas lentas contam como falhas"""
+        breaker = CircuitBreaker(failure_threshold=2, slow_call_seconds=1.0)
+        
+        breaker.record(True, duration=1.5)
+        breaker.record(True, duration=2.0)
+        
+        assert breaker.state == CircuitBreaker.OPEN
+    
+    @patch('src.models.circuit_breaker.time.monotonic')
+    def test_half_open_allows_single_probe(self, mock_monotonic):
+        """Testa que, após o tempo de espera, só uma chamada de teste é liberada"""
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record(False)
+        
+        mock_monotonic.return_value = 129.0
+        assert breaker.allow_request() is False
+        
+        mock_monotonic.return_value = 130.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+        
+        breaker.record(True)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+    
+    @patch('src.models.circuit_breaker.time.monotonic')
+    def test_failed_probe_reopens(self, mock_monotonic):
+        """Testa que uma chamada de teste com falha reabre o disjuntor"""
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record(False)
+        
+        mock_monotonic.return_value = 130.0
+        assert breaker.allow_request() is True
+        breaker.record(False)
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        mock_monotonic.return_value = 159.0
+        assert breaker.allow_request() is False
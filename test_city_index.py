@@ -0,0 +1,88 @@
+"""
+Testes para o índice local de cidades
+"""
+import pytest
+from src.models.city_index import CityIndex, normalize_text
+from src.models.geocoding import Location
+
+
+@pytest.fixture
+def index():
+    """Índice pequeno com cidades de exemplo"""
+    return CityIndex([
+        ('são paulo', Location('São Paulo, SP', -23.5505, -46.6333, 'Brasil', 'SP')),
+        ('rio de janeiro', Location('Rio de Janeiro, RJ', -22.9068, -43.1729, 'Brasil', 'RJ')),
+        ('são josé dos campos', Location('São José dos Campos, SP', -23.2237, -45.9009, 'Brasil', 'SP')),
+        ('campinas', Location('Campinas, SP', -22.9056, -47.0608, 'Brasil', 'SP')),
+        ('campo grande', Location('Campo Grande, MS', -20.4697, -54.6201, 'Brasil', 'MS')),
+    ])
+
+
+class TestNormalizeText:
+    """Testes para a função normalize_text"""
+    
+    def test_removes_accents_and_case(self):
+        """Testa remoção de acentos e conversão para minúsculas"""
+        assert normalize_text('São José') == 'sao jose'
+        assert normalize_text('GOIÂNIA') == 'goiania'
+    
+    def test_collapses_whitespace(self):
+        """Testa remoção de espaços repetidos"""
+        assert normalize_text('  rio   de  janeiro ') == 'rio de janeiro'
+
+
+class TestCityIndex:
+    """Testes para a classe CityIndex"""
+    
+    def test_accent_insensitive_match(self, index):
+        """Testa busca sem acentos"""
+        results = index.search('sao paulo')
+        
+        assert results[0].name == 'São Paulo, SP'
+    
+    def test_exact_match_ranked_first(self, index):
+        """Testa que o nome exato vem antes dos prefixos"""
+        results = index.search('campinas')
+        
+        assert [r.name for r in results] == ['Campinas, SP']
+    
+    def test_name_prefix_before_word_match(self, index):
+        """Testa ordenação entre prefixo do nome e palavras internas"""
+        results = index.search('camp')
+        
+        assert [r.name for r in results] == [
+            'Campinas, SP',
+            'Campo Grande, MS',
+            'São José dos Campos, SP'
+        ]
+    
+    def test_all_words_match(self, index):
+        """Testa busca por várias palavras fora de ordem"""
+        results = index.search('campos jose')
+        
+        assert results[0].name == 'São José dos Campos, SP'
+    
+    def test_limit_and_determinism(self, index):
+        """Testa limite de resultados e ordem estável"""
+        first = index.search('sao', limit=1)
+        second = index.search('SÃO', limit=1)
+        
+        assert len(first) == 1
+        assert first == second
+    
+    def test_empty_and_unknown_query(self, index):
+        """Testa query vazia e sem correspondência"""
+        assert index.search('') == []
+        assert index.search('   ') == []
+        assert index.search('xyz') == []
+    
+    def test_short_prefix_follows_entry_order(self):
+        """Testa prefixo curto com muitos nomes: as primeiras entradas, sem depender da ordem alfabética"""
+        names = [f'{"sz" if i % 2 else "sa"}{i:03d}' for i in range(200)]
+        index = CityIndex((name, name) for name in names)
+        
+        # Exato primeiro, depois os prefixos na ordem original, mesmo com chaves alfabeticamente menores adiante
+        assert index.search('s', limit=4) == ['sa000', 'sz001', 'sa002', 'sz003']
+        assert index.search('sz199', limit=3) == ['sz199']
+        assert index.search('sa19', limit=3) == ['sa190', 'sa192', 'sa194']
+
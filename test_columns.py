@@ -0,0 +1,75 @@
+"""
+Testes para as tabelas em colunas
+"""
+from array import array
+import pytest
+from src.models.columns import ColumnTable, map_column, typed_column
+
+
+class TestColumnHelpers:
+    """Testes para as funções de conversão de colunas"""
+    
+    def test_typed_column(self):
+        """Testa conversão para vetor tipado"""
+        column = typed_column([1.5, 2, 3.25])
+        
+        assert isinstance(column, array)
+        assert list(column) == [1.5, 2.0, 3.25]
+    
+    def test_typed_column_with_nulls(self):
+        """Testa que colunas com nulos permanecem como lista"""
+        values = [1.0, None, 3.0]
+        
+        assert typed_column(values) is values
+    
+    def test_map_column(self):
+        """Testa tradução dos códigos em lote"""
+        codes = array('h', [0, 3, 0, 42])
+        
+        assert map_column(codes, {0: 'limpo', 3: 'nublado'}, '?') == ['limpo', 'nublado', 'limpo', '?']
+
+
+class TestColumnTable:
+    """Testes para a classe ColumnTable"""
+    
+    @pytest.fixture
+    def table(self):
+        return ColumnTable({
+            'time': ['00:00', '01:00', '02:00', '03:00'],
+            'temperature': array('d', [20.0, 19.5, 19.0, 18.5])
+        })
+    
+    def test_rows_built_on_access(self, table):
+        """Testa montagem das linhas por índice e iteração"""
+        assert len(table) == 4
+        assert table[1] == {'time': '01:00', 'temperature': 19.5}
+        assert table[-1]['time'] == '03:00'
+        assert list(table)[2] == {'time': '02:00', 'temperature': 19.0}
+        
+        with pytest.raises(IndexError):
+            table[4]
+    
+    def test_slice_is_view(self, table):
+        """Testa que fatias compartilham as colunas"""
+        view = table[1:3]
+        
+        assert isinstance(view, ColumnTable)
+        assert len(view) == 2
+        assert view[0]['time'] == '01:00'
+        assert list(view.column('temperature')) == [19.5, 19.0]
+        assert table[:10] == table
+    
+    def test_equality_with_rows(self, table):
+        """Testa comparação com uma lista de dicionários"""
+        assert table[:1] == [{'time': '00:00', 'temperature': 20.0}]
+        assert table.to_rows() == list(table)
+    
+    def test_from_rows_and_to_columns(self):
+        """Testa conversão de linhas para colunas"""
+        rows = [{'time': 'a', 'value': 1}, {'time': 'b', 'value': 2}]
+        
+        table = ColumnTable.from_rows(rows)
+        
+        assert table.to_columns() == {'time': ['a', 'b'], 'value': [1, 2]}
+        assert table[1:].to_columns() == {'time': ['b'], 'value': [2]}
+        assert ColumnTable.from_rows([]).to_columns() == {}
@@ -0,0 +1,87 @@
+"""
+Testes para a compressão de respostas e o provedor JSON
+"""
+import gzip
+import json
+from datetime import datetime
+from unittest.mock import Mock, patch
+from src.main import app
+from src.models.compression import Compression
+
+
+class TestCompression:
+    """Testes para a compressão negociada pelo Accept-Encoding"""
+    
+    @patch('src.models.weather.WeatherService.get_forecast_async')
+    def test_gzip_json_response(self, mock_forecast, client):
+        """Testa compressão gzip de uma resposta JSON grande"""
+        mock_forecast.return_value = Mock(age=0)
+        mock_forecast.return_value.to_dict.return_value = {'hourly_forecast': [{'temperature': 20.0}] * 200}
+        
+        response = client.get('/api/weather/forecast?lat=1&lon=2', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        data = json.loads(gzip.decompress(response.data))
+        assert len(data['data']['hourly_forecast']) == 200
+    
+    def test_small_response_not_compressed(self, client):
+        """Testa que respostas pequenas não são comprimidas"""
+        response = client.get('/api/weather/test', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in response.headers
+        assert json.loads(response.data)['status'] == 'OK'
+    
+    def test_not_compressed_without_accept_encoding(self, client):
+        """Testa que nada é comprimido sem Accept-Encoding"""
+        response = client.get('/script.js', headers={'Accept-Encoding': ''})
+        response.close()
+        
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_static_asset_compressed(self, client):
+        """Testa compressão de arquivos estáticos"""
+        with client.get('/script.js', headers={'Accept-Encoding': ''}) as response:
+            plain = response.data
+        
+        response = client.get('/script.js', headers={'Accept-Encoding': 'gzip, deflate'})
+        response.close()
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == plain
+        assert response.headers['ETag'].endswith('-gzip"')
+        assert 'Accept-Ranges' not in response.headers
+    
+    def test_static_asset_revalidation(self, client):
+        """Testa 304 para arquivo estático comprimido já armazenado pelo cliente"""
+        with client.get('/script.js', headers={'Accept-Encoding': 'gzip'}) as response:
+            etag = response.headers['ETag']
+        
+        with client.get('/script.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}) as response:
+            assert response.status_code == 304
+            assert response.data == b''
+    
+    def test_brotli_preferred_when_available(self):
+        """Testa preferência por brotli quando o módulo está instalado"""
+        with patch('src.models.compression.brotli', object()):
+            assert Compression.available_encodings() == ['br', 'gzip']
+        with patch('src.models.compression.brotli', None):
+            assert Compression.available_encodings() == ['gzip']
+
+
+class TestFastJSONProvider:
+    """Testes para o provedor JSON do aplicativo"""
+    
+    def test_round_trip(self):
+        """Testa serialização compatível com o provedor padrão"""
+        payload = {'b': 1, 'a': 'São Paulo', 'data': datetime(2025, 7, 4, 20, 0)}
+        
+        text = app.json.dumps(payload)
+        
+        assert text.index('"a"') < text.index('"b"')
+        assert app.json.loads(text) == {'a': 'São Paulo', 'b': 1, 'data': 'Fri, 04 Jul 2025 20:00:00 GMT'}
+    
+    def test_big_integers_fall_back(self):
+        """Testa valores não suportados pelo orjson"""
+        assert app.json.loads(app.json.dumps({'n': 2 ** 70})) == {'n': 2 ** 70}
@@ -0,0 +1,159 @@
+"""
+Testes para ETag, Cache-Control e respostas 304 dos endpoints de clima
+"""
+from datetime import datetime
+from unittest.mock import Mock, patch
+from src.models.weather import ForecastData, WeatherService, WeatherData
+
+
+def make_weather(**overrides):
+    """Cria um WeatherData de teste"""
+    values = dict(
+        location="São Paulo",
+        latitude=-23.5505,
+        longitude=-46.6333,
+        temperature=25.0,
+        humidity=65,
+        wind_speed=10.0,
+        wind_direction=180,
+        weather_code=1,
+        timestamp=datetime(2025, 7, 4, 20, 0),
+        version="abc123"
+    )
+    values.update(overrides)
+    return WeatherData(**values)
+
+
+class TestConditionalGet:
+    """Testes para revalidação com If-None-Match"""
+    
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
+    def test_etag_and_cache_control(self, mock_weather, client):
+        """Testa ETag forte e max-age com a validade do cache, descontada pelos caches a partir de Age"""
+        mock_weather.return_value = make_weather(age=100)
+        
+        response = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333')
+        
+        etag, weak = response.get_etag()
+        assert etag and not weak
+        assert response.cache_control.max_age == WeatherService.CURRENT_CACHE_TTL
+        assert response.headers['Age'] == '100'
+        assert response.cache_control.public is True
+    
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
+    def test_not_modified(self, mock_weather, client):
+        """Testa resposta 304 quando o conteúdo não mudou (mesmo com idade diferente)"""
+        mock_weather.return_value = make_weather(age=10)
+        etag = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333').headers['ETag']
+        
+        mock_weather.return_value = make_weather(age=40)
+        response = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333',
+                              headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+    
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
+    def test_changed_content_returns_body(self, mock_weather, client):
+        """Testa que uma nova versão do conteúdo gera outro ETag"""
+        mock_weather.return_value = make_weather()
+        etag = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333').headers['ETag']
+        
+        mock_weather.return_value = make_weather(version="def456")
+        response = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333',
+                              headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
+    def test_degraded_not_cacheable(self, mock_weather, client):
+        """Testa que dados desatualizados exigem revalidação"""
+        mock_weather.return_value = make_weather(stale=True, degraded=True)
+        
+        response = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333')
+        
+        assert response.cache_control.no_cache
+        assert response.cache_control.max_age is None
+    
+    @patch('src.models.weather.WeatherService.get_current_weather_async')
+    def test_etag_ignores_stale_and_degraded(self, mock_weather, client):
+        """Testa que o mesmo conteúdo servido como degradado continua sendo revalidado"""
+        mock_weather.return_value = make_weather()
+        etag = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333').headers['ETag']
+        
+        mock_weather.return_value = make_weather(stale=True, degraded=True)
+        response = client.get('/api/weather/current?lat=-23.5505&lon=-46.6333',
+                              headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.cache_control.no_cache
+    
+    @patch('src.models.compression.Compression.compress')
+    @patch('src.models.weather._encode_response')
+    @patch('src.models.weather.WeatherService.get_forecast_async')
+    def test_not_modified_skips_serialization(self, mock_forecast, mock_encode, mock_compress, client):
+        """Testa que o 304 é decidido antes de serializar e comprimir, também para ETags de versões comprimidas"""
+        mock_forecast.return_value = ForecastData(
+            location='São Paulo', latitude=-23.5505, longitude=-46.6333,
+            daily_forecast=[], hourly_forecast=[], version='v1', age=30
+        )
+        with patch('src.models.weather._matching_etag', return_value=None):
+            client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333')
+        etag = mock_encode.return_value.set_etag.call_args[0][0]
+        mock_encode.reset_mock()
+        
+        response = client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333',
+                              headers={'If-None-Match': f'"{etag}-gzip"', 'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.get_etag() == (f'{etag}-gzip', False)
+        assert response.headers['Age'] == '30'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        mock_encode.assert_not_called()
+        mock_compress.assert_not_called()
+    
+    def test_forecast_content_version(self):
+        """Testa a versão da previsão: independe do nome e muda com qualquer valor das séries"""
+        forecast = WeatherService._parse_forecast({
+            'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [25.0], 'temperature_2m_min': [15.0],
+                      'weather_code': [1], 'precipitation_sum': [0.0]},
+            'hourly': {'time': ['2025-07-04T00:00', '2025-07-04T01:00'], 'temperature_2m': [18.0, 17.5],
+                       'relative_humidity_2m': [70, 72], 'wind_speed_10m': [5.0, 4.0], 'weather_code': [1, 1]}
+        }, -23.55, -46.63)
+        changed = WeatherService._parse_forecast({
+            'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [25.0], 'temperature_2m_min': [15.0],
+                      'weather_code': [1], 'precipitation_sum': [0.0]},
+            'hourly': {'time': ['2025-07-04T00:00', '2025-07-04T01:00'], 'temperature_2m': [18.0, 17.0],
+                       'relative_humidity_2m': [70, 72], 'wind_speed_10m': [5.0, 4.0], 'weather_code': [1, 1]}
+        }, -23.55, -46.63)
+        
+        version = WeatherService._content_version(forecast)
+        
+        assert version == WeatherService._content_version(ForecastData(
+            location='Sampa', latitude=-23.55, longitude=-46.63, age=99,
+            daily_forecast=forecast.daily_forecast, hourly_forecast=forecast.hourly_forecast
+        ))
+        assert version != WeatherService._content_version(changed)
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_content_version_ignores_age_and_location(self, mock_get):
+        """Testa que a versão do conteúdo depende só dos dados da API"""
+        mock_get.return_value = Mock()
+        mock_get.return_value.raise_for_status.return_value = None
+        mock_get.return_value.json.return_value = {
+            'current': {'temperature_2m': 20.0},
+            'daily': {'time': [], 'temperature_2m_max': [], 'temperature_2m_min': [], 'weather_code': [],
+                      'precipitation_sum': []},
+            'hourly': {'time': [], 'temperature_2m': [], 'relative_humidity_2m': [], 'wind_speed_10m': [],
+                       'weather_code': []}
+        }
+        
+        first = WeatherService.get_current_weather(-23.5505, -46.6333, "São Paulo")
+        second = WeatherService.get_current_weather(-23.5505, -46.6333, "Sampa")
+        
+        assert first.version
+        assert first.version == second.version
@@ -0,0 +1,114 @@
+"""
+Testes para a base offline de cidades mapeada em memória
+"""
+import pytest
+from src.models.gazetteer import CityRow, Gazetteer, build_gazetteer, read_admin1_names, read_geonames
+
+
+@pytest.fixture
+def gazetteer_path(tmp_path):
+    """Arquivo de gazetteer com algumas cidades"""
+    path = str(tmp_path / 'gazetteer.bin')
+    build_gazetteer([
+        CityRow('Santos', -23.9608, -46.3336, 'São Paulo', 'BR', 433656),
+        CityRow('São Paulo', -23.5475, -46.6361, 'São Paulo', 'BR', 10021295),
+        CityRow('Rio Claro', -22.4114, -47.5614, 'São Paulo', 'BR', 186253),
+        CityRow('Rio de Janeiro', -22.9028, -43.2075, 'Rio de Janeiro', 'BR', 6023699),
+        CityRow('Lisboa', 38.7167, -9.1333, '', 'PT', 517802),
+    ], path)
+    return path
+
+
+@pytest.fixture
+def gazetteer(gazetteer_path):
+    """Gazetteer aberto a partir do arquivo de teste"""
+    table = Gazetteer(gazetteer_path)
+    yield table
+    table.close()
+
+
+class TestGazetteer:
+    """Testes para a classe Gazetteer"""
+    
+    def test_rows_ordered_by_population(self, gazetteer):
+        """Testa que as linhas são gravadas por população decrescente"""
+        assert len(gazetteer) == 5
+        assert gazetteer.location(0).name == 'São Paulo, São Paulo'
+        assert gazetteer.location(1).name == 'Rio de Janeiro, Rio de Janeiro'
+    
+    def test_location_fields(self, gazetteer):
+        """Testa conversão de uma linha em Location"""
+        location = gazetteer.search('lisboa')[0]
+        
+        assert location.name == 'Lisboa'
+        assert location.latitude == 38.7167
+        assert location.longitude == -9.1333
+        assert location.country == 'PT'
+    
+    def test_search_accent_insensitive_prefix(self, gazetteer):
+        """Testa busca por prefixo sem acentos"""
+        assert gazetteer.search('sao pa')[0].name == 'São Paulo, São Paulo'
+    
+    def test_search_ranks_by_population(self, gazetteer):
+        """Testa que resultados do mesmo nível seguem a população"""
+        results = gazetteer.search('rio')
+        
+        assert [r.name for r in results] == [
+            'Rio de Janeiro, Rio de Janeiro',
+            'Rio Claro, São Paulo'
+        ]
+    
+    def test_search_word_match(self, gazetteer):
+        """Testa busca por palavra no meio do nome"""
+        assert gazetteer.search('claro')[0].name == 'Rio Claro, São Paulo'
+    
+    def test_short_prefix_with_limit(self, gazetteer):
+        """Testa prefixo de um caractere: as mais populosas primeiro, parando no limite"""
+        assert [r.name for r in gazetteer.search('s', limit=2)] == [
+            'São Paulo, São Paulo',
+            'Santos, São Paulo'
+        ]
+        assert [r.name for r in gazetteer.search('R', limit=5)] == [
+            'Rio de Janeiro, Rio de Janeiro',
+            'Rio Claro, São Paulo'
+        ]
+    
+    def test_name_ranks_stored_in_file(self, gazetteer):
+        """Testa que a inversa do índice de nomes vem pronta do arquivo, sem ser recalculada"""
+        index = gazetteer.index
+        
+        assert isinstance(index._name_ranks, memoryview)
+        assert [index._name_ids[rank] for rank in index._name_rank_table()] == list(range(len(gazetteer)))
+    
+    def test_spatial_index_stored_in_file(self, gazetteer):
+        """Testa a grade da busca reversa lida do arquivo"""
+        position, distance = gazetteer.spatial_index.nearest(-23.96, -46.33, max_distance_km=20)
+        
+        assert gazetteer.location(position).name == 'Santos, São Paulo'
+        assert distance < 1
+        assert gazetteer.spatial_index.nearest(0.0, 0.0, max_distance_km=20) is None
+    
+    def test_invalid_file(self, tmp_path):
+        """Testa abertura de arquivo em formato inválido"""
+        path = tmp_path / 'invalido.bin'
+        path.write_bytes(b'x' * 64)
+        
+        with pytest.raises(ValueError):
+            Gazetteer(str(path))
+
+
+class TestGeoNamesReader:
+    """Testes para a leitura de exportações do GeoNames"""
+    
+    def test_read_geonames(self, tmp_path):
+        """Testa leitura de linhas TSV com nomes de estados"""
+        admin1 = tmp_path / 'admin1.txt'
+        admin1.write_text('BR.27\tSão Paulo\tSao Paulo\t3448433\n', encoding='utf-8')
+        cities = tmp_path / 'cities.txt'
+        fields = ['3448439', 'São Paulo', 'Sao Paulo', '', '-23.5475', '-46.63611', 'P', 'PPLA',
+                  'BR', '', '27', '3550308', '', '', '10021295', '', '760', 'America/Sao_Paulo', '2023-01-01']
+        cities.write_text('\t'.join(fields) + '\ninvalida\n', encoding='utf-8')
+        
+        rows = list(read_geonames(str(cities), read_admin1_names(str(admin1))))
+        
+        assert rows == [CityRow('São Paulo', -23.5475, -46.63611, 'São Paulo', 'BR', 10021295)]
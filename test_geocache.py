@@ -0,0 +1,81 @@
+"""
+Testes para o cache persistente de geocodificação
+"""
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch
+from src.models.geocache import PersistentCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Caminho de um arquivo SQLite temporário"""
+    return str(tmp_path / 'cache.sqlite3')
+
+
+class TestPersistentCache:
+    """Testes para a classe PersistentCache"""
+    
+    def test_set_and_get(self, cache_path):
+        """Testa armazenamento e leitura de valores JSON"""
+        cache = PersistentCache(cache_path)
+        cache.set('chave', [{'name': 'São Paulo', 'lat': -23.55}])
+        
+        assert cache.get('chave') == [{'name': 'São Paulo', 'lat': -23.55}]
+        assert cache.get('ausente') is None
+        assert cache.stats() == {'hits': 1, 'misses': 1}
+    
+    def test_survives_new_instance(self, cache_path):
+        """Testa que os dados persistem entre instâncias (reinícios)"""
+        PersistentCache(cache_path).set('chave', {'valor': 1})
+        
+        assert PersistentCache(cache_path).get('chave') == {'valor': 1}
+    
+    def test_wal_mode(self, cache_path):
+        """Testa que o banco usa o modo WAL"""
+        cache = PersistentCache(cache_path)
+        cache.set('chave', 1)
+        
+        mode = sqlite3.connect(cache_path).execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+    
+    @patch('src.models.geocache.time.time')
+    def test_entry_expires(self, mock_time, cache_path):
+        """Testa expiração das entradas"""
+        mock_time.return_value = 1000.0
+        cache = PersistentCache(cache_path)
+        cache.set('chave', 'valor', ttl=60)
+        
+        mock_time.return_value = 1059.0
+        assert cache.get('chave') == 'valor'
+        
+        mock_time.return_value = 1060.0
+        assert cache.get('chave') is None
+    
+    def test_prune_keeps_newest_entries(self, cache_path):
+        """Testa limite de tamanho mantendo as entradas mais recentes"""
+        cache = PersistentCache(cache_path, max_entries=3)
+        for i in range(5):
+            cache.set(f'chave{i}', i)
+        cache.prune()
+        
+        assert len(cache) == 3
+        assert cache.get('chave0') is None
+        assert cache.get('chave4') == 4
+    
+    def test_concurrent_threads(self, cache_path):
+        """Testa gravação concorrente a partir de várias threads"""
+        cache = PersistentCache(cache_path)
+        
+        def write(n):
+            for i in range(20):
+                cache.set(f'{n}:{i}', i)
+        
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(cache) == 80
@@ -1,9 +1,12 @@
 """
 Testes para o serviço de geocodificação
 """
+import asyncio
 import pytest
+import httpx
 from unittest.mock import patch, Mock
 from src.models.geocoding import GeocodingService, Location
+from src.models.gazetteer import CityRow, build_gazetteer
 
 
 class TestGeocodingService:
@@ -58,6 +61,35 @@ class TestGeocodingService:
         # Todos devem retornar o mesmo resultado
         assert results_lower[0].name == results_upper[0].name == results_mixed[0].name
     
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_search_accent_insensitive_is_local(self, mock_get):
+        """Testa que buscas sem acento são atendidas sem consultar a rede"""
+        results = GeocodingService.search_locations("sao paulo")
+        
+        assert results[0].name == "São Paulo, SP"
+        mock_get.assert_not_called()
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_search_uses_offline_gazetteer(self, mock_get, tmp_path):
+        """Testa que cidades fora da lista pré-definida vêm da base offline"""
+        path = str(tmp_path / 'gazetteer.bin')
+        build_gazetteer([
+            CityRow('Santos', -23.9608, -46.3336, 'São Paulo', 'BR', 433656),
+            CityRow('São Paulo', -23.5475, -46.6361, 'São Paulo', 'BR', 10021295),
+        ], path)
+        
+        with patch.object(GeocodingService, 'GAZETTEER_PATH', path), \
+             patch.object(GeocodingService, '_gazetteer', None):
+            santos = GeocodingService.search_locations("santos")
+            sao_paulo = GeocodingService.search_locations("são paulo")
+            GeocodingService._gazetteer.close()
+        
+        assert santos[0].name == "Santos, São Paulo"
+        # A cidade pré-definida não é repetida pela base offline
+        assert sao_paulo[0].name == "São Paulo, SP"
+        assert "São Paulo, São Paulo" not in [r.name for r in sao_paulo]
+        mock_get.assert_not_called()
+    
     def test_search_limit_parameter(self):
         """Testa parâmetro de limite de resultados"""
         results_3 = GeocodingService.search_locations("são", limit=3)
@@ -79,7 +111,7 @@ class TestGeocodingService:
         # Pode retornar lista vazia ou tentar busca online
         assert isinstance(results, list)
     
-    @patch('src.models.geocoding.requests.get')
+    @patch('src.models.geocoding.AsyncHttpClient.get')
     def test_search_nominatim_success(self, mock_get):
         """Testa busca online via Nominatim com sucesso"""
         # Mock da resposta do Nominatim
@@ -107,7 +139,7 @@ class TestGeocodingService:
         assert results[0].latitude == -23.5505
         assert results[0].longitude == -46.6333
     
-    @patch('src.models.geocoding.requests.get')
+    @patch('src.models.geocoding.AsyncHttpClient.get')
     def test_search_nominatim_error(self, mock_get):
         """Testa tratamento de erro na busca online"""
         # Mock de erro na requisição
@@ -118,7 +150,7 @@ class TestGeocodingService:
         
         assert results == []
     
-    @patch('src.models.geocoding.requests.get')
+    @patch('src.models.geocoding.AsyncHttpClient.get')
     def test_reverse_geocode_success(self, mock_get):
         """Testa geocodificação reversa com sucesso"""
         # Mock da resposta do Nominatim
@@ -135,28 +167,28 @@ class TestGeocodingService:
         mock_get.return_value = mock_response
         
         # Executar teste
-        result = GeocodingService.get_location_by_coordinates(-23.5505, -46.6333)
+        result = GeocodingService.get_location_by_coordinates(-21.1331, -44.2617)
         
         # Verificações
         assert result is not None
         assert isinstance(result, Location)
-        assert result.latitude == -23.5505
-        assert result.longitude == -46.6333
+        assert result.latitude == -21.1331
+        assert result.longitude == -44.2617
         assert "São Paulo" in result.name
     
-    @patch('src.models.geocoding.requests.get')
+    @patch('src.models.geocoding.AsyncHttpClient.get')
     def test_reverse_geocode_error(self, mock_get):
         """Testa tratamento de erro na geocodificação reversa"""
         # Mock de erro na requisição
         mock_get.side_effect = Exception("Erro de conexão")
         
         # Executar teste
-        result = GeocodingService.get_location_by_coordinates(-23.5505, -46.6333)
+        result = GeocodingService.get_location_by_coordinates(-21.1331, -44.2617)
         
         # Verificações
         assert result is None
     
-    @patch('src.models.geocoding.requests.get')
+    @patch('src.models.geocoding.AsyncHttpClient.get')
     def test_reverse_geocode_api_error_response(self, mock_get):
         """Testa resposta de erro da API na geocodificação reversa"""
         # Mock da resposta com erro
@@ -166,8 +198,122 @@ class TestGeocodingService:
         mock_get.return_value = mock_response
         
         # Executar teste
-        result = GeocodingService.get_location_by_coordinates(-23.5505, -46.6333)
+        result = GeocodingService.get_location_by_coordinates(-21.1331, -44.2617)
         
         # Verificações
         assert result is None
 
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_reverse_geocode_known_city_is_local(self, mock_get):
+        """Testa que coordenadas próximas de uma cidade conhecida não consultam a rede"""
+        result = GeocodingService.get_location_by_coordinates(-23.5600, -46.6400)
+        
+        assert result.name == "São Paulo, SP"
+        assert result.latitude == -23.5600
+        assert result.longitude == -46.6400
+        assert result.country == "Brasil"
+        mock_get.assert_not_called()
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_search_cities_open_meteo(self, mock_get):
+        """Testa busca de cidades na API de geocodificação da Open-Meteo"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'results': [
+                {'name': 'Curitiba', 'latitude': -25.42, 'longitude': -49.27,
+                 'country': 'Brasil', 'admin1': 'Paraná'}
+            ]
+        }
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        cities = GeocodingService.search_cities("Curitiba")
+        
+        assert cities == [{
+            'name': 'Curitiba, Paraná, Brasil',
+            'lat': -25.42,
+            'lon': -49.27,
+            'country': 'Brasil',
+            'admin1': 'Paraná'
+        }]
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_search_cities_async_no_results(self, mock_get):
+        """Testa busca assíncrona sem resultados"""
+        mock_response = Mock()
+        mock_response.json.return_value = {}
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        cities = asyncio.run(GeocodingService.search_cities_async("CidadeInexistente"))
+        
+        assert cities == []
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_search_nominatim_persistent_cache(self, mock_get, cache_geocodificacao):
+        """Testa que resultados do Nominatim são reaproveitados do cache persistente"""
+        mock_response = Mock()
+        mock_response.json.return_value = [
+            {
+                'lat': '-21.1331',
+                'lon': '-44.2617',
+                'address': {'city': 'São João del-Rei', 'state': 'Minas Gerais', 'country': 'Brasil'}
+            }
+        ]
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        first = GeocodingService._search_nominatim("São João del-Rei")
+        second = GeocodingService._search_nominatim("sao joao DEL-REI")
+        
+        assert mock_get.call_count == 1
+        assert second == first
+        assert cache_geocodificacao.stats()['hits'] == 1
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_reverse_geocode_persistent_cache_quantized(self, mock_get):
+        """Testa reaproveitamento da geocodificação reversa para coordenadas próximas"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'address': {'town': 'Tiradentes', 'state': 'Minas Gerais', 'country': 'Brasil'}
+        }
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        GeocodingService.get_location_by_coordinates(-21.11012, -44.17441)
+        result = GeocodingService.get_location_by_coordinates(-21.11034, -44.17398)
+        
+        assert mock_get.call_count == 1
+        assert result.name == "Tiradentes, Minas Gerais"
+        assert result.latitude == -21.11034
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_search_cities_errors_not_cached(self, mock_get):
+        """Testa que falhas na busca da Open-Meteo não são armazenadas"""
+        mock_get.side_effect = httpx.ConnectError("Erro de conexão")
+        
+        assert GeocodingService.search_cities("Curitiba") is None
+        assert GeocodingService.search_cities("Curitiba") is None
+        assert mock_get.call_count == 2
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_nominatim_rate_limited(self, mock_get, limitador_nominatim):
+        """Testa que o Nominatim não é chamado quando o limitador recusa"""
+        with patch.object(limitador_nominatim, 'acquire', return_value=False):
+            assert GeocodingService._search_nominatim("Cidade Inexistente") == []
+            assert GeocodingService.get_location_by_coordinates(-21.1331, -44.2617) is None
+        
+        mock_get.assert_not_called()
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_nominatim_base_url_configurable(self, mock_get):
+        """Testa que as requisições ao Nominatim usam o endereço configurado"""
+        mock_get.side_effect = Exception("Erro de conexão")
+        
+        with patch.object(GeocodingService, 'NOMINATIM_BASE_URL', 'http://127.0.0.1:8900'):
+            GeocodingService._search_nominatim("São Paulo")
+            GeocodingService.get_location_by_coordinates(-21.1331, -44.2617)
+        
+        urls = [call.args[0] for call in mock_get.call_args_list]
+        assert urls == ['http://127.0.0.1:8900/search', 'http://127.0.0.1:8900/reverse']
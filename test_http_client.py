@@ -0,0 +1,75 @@
+"""
+Testes para o cliente HTTP compartilhado
+"""
+import asyncio
+import threading
+import httpx
+import pytest
+from src.models.http_client import AsyncHttpClient
+
+
+class TestAsyncHttpClient:
+    """Testes para a classe AsyncHttpClient"""
+    
+    def teardown_method(self):
+        AsyncHttpClient.close()
+    
+    def test_requests_run_on_shared_loop(self):
+        """Testa que requisições de event loops diferentes usam o loop compartilhado"""
+        threads = []
+        
+        def handler(request):
+            threads.append(threading.current_thread().name)
+            return httpx.Response(200, json={'ok': True})
+        
+        AsyncHttpClient.get_loop()
+        AsyncHttpClient._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        async def fetch():
+            response = await AsyncHttpClient.get('https://api.open-meteo.com/v1/forecast', params={'a': 1})
+            return response.json()
+        
+        assert asyncio.run(fetch()) == {'ok': True}
+        assert asyncio.run(fetch()) == {'ok': True}
+        assert threads == ['async-http-client', 'async-http-client']
+    
+    def test_run_waits_on_shared_loop(self):
+        """Testa que run executa a corrotina no loop compartilhado e devolve o resultado à thread síncrona"""
+        async def current_thread():
+            return threading.current_thread().name
+        
+        assert AsyncHttpClient.run(current_thread()) == 'async-http-client'
+    
+    def test_run_rejects_shared_loop_thread(self):
+        """Testa que run chamado dentro do loop compartilhado falha em vez de travar"""
+        async def nested():
+            return AsyncHttpClient.run(asyncio.sleep(0))
+        
+        with pytest.raises(RuntimeError):
+            AsyncHttpClient.run(nested(), timeout=5)
+    
+    def test_timeouts(self):
+        """Testa o timeout padrão e o informado pelo chamador, com o de conexão centralizado"""
+        timeouts = []
+        
+        def handler(request):
+            timeouts.append(request.extensions['timeout'])
+            return httpx.Response(200)
+        
+        AsyncHttpClient.get_loop()
+        AsyncHttpClient._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        AsyncHttpClient.run(AsyncHttpClient.get('https://api.open-meteo.com/v1/forecast'))
+        AsyncHttpClient.run(AsyncHttpClient.get('https://nominatim.openstreetmap.org/search',
+                                                timeout=AsyncHttpClient.NOMINATIM_TIMEOUT))
+        
+        assert timeouts[0]['read'] == AsyncHttpClient.WEATHER_TIMEOUT
+        assert timeouts[1]['read'] == AsyncHttpClient.NOMINATIM_TIMEOUT
+        assert timeouts[1]['connect'] == AsyncHttpClient.CONNECT_TIMEOUT
+    
+    def test_close_restarts_loop(self):
+        """Testa que um novo event loop é criado após o fechamento"""
+        loop = AsyncHttpClient.get_loop()
+        AsyncHttpClient.close()
+        
+        assert AsyncHttpClient.get_loop() is not loop
@@ -0,0 +1,137 @@
+"""
+Testes para a publicação de atualizações aos clientes conectados
+"""
+import pytest
+from src.models.live import LiveFeed, Subscription
+
+
+@pytest.fixture
+def versions():
+    """Versão atual de cada tópico consultado pelo fluxo"""
+    return {}
+
+
+def make_feed(versions):
+    """Fluxo com consulta falsa que registra os tópicos de cada chamada"""
+    calls = []
+
+    def fetch(topics):
+        calls.append(list(topics))
+        return [versions.get(topic) for topic in topics]
+
+    feed = LiveFeed(fetch, interval=60, name='test-live-feed')
+    feed.calls = calls
+    return feed
+
+
+@pytest.fixture
+def feed(versions, monkeypatch):
+    """Fluxo sem a thread de consulta: os testes chamam refresh diretamente"""
+    feed = make_feed(versions)
+    monkeypatch.setattr(feed, 'start', lambda: None)
+    return feed
+
+
+class TestSubscription:
+    """Testes para a fila de atualizações de um cliente"""
+
+    def test_pending_updates_are_coalesced(self):
+        """Testa que só a atualização mais recente de cada tópico é entregue"""
+        subscription = Subscription(['a', 'b'])
+
+        subscription.push('a', 1)
+        subscription.push('b', 2)
+        subscription.push('a', 3)
+
+        assert subscription.get(timeout=0) == [('b', 2), ('a', 3)]
+        assert subscription.get(timeout=0) == []
+
+    def test_close_releases_waiter(self):
+        """Testa que encerrar a inscrição libera a espera"""
+        subscription = Subscription(['a'])
+        subscription.close()
+
+        assert subscription.get(timeout=5) == []
+        assert subscription.closed
+
+
+class TestLiveFeed:
+    """Testes para a classe LiveFeed"""
+
+    def test_new_topic_is_fetched_right_away(self, versions):
+        """Testa que um tópico sem valor antecipa a consulta em segundo plano"""
+        versions['a'] = 'v1'
+        feed = make_feed(versions)
+
+        try:
+            subscription = feed.subscribe(['a'])
+
+            assert subscription.get(timeout=5) == [('a', 'v1')]
+            assert feed.calls == [['a']]
+        finally:
+            feed.stop(timeout=5)
+
+    def test_publishes_only_changes(self, feed, versions):
+        """Testa que valores sem mudança de versão não são reenviados"""
+        versions['a'] = 'v1'
+        subscription = feed.subscribe(['a'])
+        feed.refresh()
+        subscription.get(timeout=0)
+
+        assert feed.refresh() == 0
+        assert subscription.get(timeout=0) == []
+
+        versions['a'] = 'v2'
+        assert feed.refresh() == 1
+        assert subscription.get(timeout=0) == [('a', 'v2')]
+
+    def test_one_fetch_for_all_subscribers(self, feed, versions):
+        """Testa que clientes no mesmo tópico compartilham a consulta"""
+        versions.update(a='v1', b='v1')
+        first = feed.subscribe(['a', 'b'])
+        feed.refresh()
+        assert first.get(timeout=0) == [('a', 'v1'), ('b', 'v1')]
+
+        second = feed.subscribe(['a'])
+        versions['a'] = 'v2'
+        feed.refresh()
+
+        assert feed.calls[-1] == ['a', 'b']
+        assert len(feed.calls) == 2
+        # O valor conhecido enfileirado na inscrição foi substituído pela mudança
+        assert second.get(timeout=0) == [('a', 'v2')]
+        assert first.get(timeout=0) == [('a', 'v2')]
+
+    def test_late_subscriber_receives_latest_value(self, feed, versions):
+        """Testa que um cliente novo recebe o valor conhecido sem nova consulta"""
+        versions['a'] = 'v1'
+        feed.subscribe(['a'])
+        feed.refresh()
+
+        late = feed.subscribe(['a'])
+
+        assert late.get(timeout=0) == [('a', 'v1')]
+        assert len(feed.calls) == 1
+
+    def test_unsubscribe_stops_fetching_topic(self, feed, versions):
+        """Testa que tópicos sem inscritos deixam de ser consultados"""
+        versions['a'] = 'v1'
+        subscription = feed.subscribe(['a'])
+        feed.refresh()
+
+        feed.unsubscribe(subscription)
+
+        assert subscription.closed
+        assert feed.topics() == []
+        assert feed.refresh() == 0
+        assert len(feed.calls) == 1
+        assert feed.stats()['subscriptions'] == 0
+
+    def test_failed_topic_is_not_published(self, feed, versions):
+        """Testa que tópicos com erro (None) não geram atualização"""
+        versions['a'] = 'v1'
+        subscription = feed.subscribe(['a', 'b'])
+
+        assert feed.refresh() == 1
+        assert subscription.get(timeout=0) == [('a', 'v1')]
+        assert feed.stats()['published'] == 1
@@ -0,0 +1,149 @@
+"""
+Testes para as métricas no formato do Prometheus
+"""
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from src.models.geocoding import GeocodingService
+from src.models.http_client import AsyncHttpClient
+from src.models.metrics import Counter, Metrics, MetricsRegistry
+from src.models.weather import WeatherService
+
+
+class TestMetricTypes:
+    """Testes para contadores, medidores e histogramas"""
+    
+    def test_counter_render(self):
+        """Testa formato de um contador com rótulos"""
+        registry = MetricsRegistry()
+        counter = registry.counter('calls_total', 'Chamadas', ('provider',))
+        counter.inc(provider='nominatim')
+        counter.inc(2, provider='nominatim')
+        
+        text = registry.render()
+        
+        assert '# TYPE calls_total counter' in text
+        assert 'calls_total{provider="nominatim"} 3' in text
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Testa faixas cumulativas, soma e contagem do histograma"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latência', buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+        
+        text = registry.render()
+        
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'latency_seconds_sum 4.25' in text
+        assert 'latency_seconds_count 4' in text
+    
+    def test_invalid_labels(self):
+        """Testa erro ao usar rótulos diferentes dos declarados"""
+        counter = Counter('x_total', 'X', ('provider',))
+        
+        with pytest.raises(ValueError):
+            counter.inc(route='/')
+    
+    def test_collectors_merged_by_name(self):
+        """Testa que coletores diferentes compartilham HELP/TYPE da mesma métrica"""
+        registry = MetricsRegistry()
+        registry.register_collector(lambda: [('hits', 'gauge', 'Acertos', [({'cache': 'a'}, 1)])])
+        registry.register_collector(lambda: [('hits', 'gauge', 'Acertos', [({'cache': 'b'}, 2)])])
+        
+        text = registry.render()
+        
+        assert text.count('# TYPE hits gauge') == 1
+        assert 'hits{cache="a"} 1' in text and 'hits{cache="b"} 2' in text
+
+
+class TestMetricsEndpoint:
+    """Testes para a instrumentação do aplicativo"""
+    
+    @pytest.fixture(autouse=True)
+    def limpar_metricas(self):
+        Metrics.registry.clear()
+        yield
+        Metrics.registry.clear()
+    
+    def test_request_latency_by_route(self, client):
+        """Testa histograma de latência por padrão de rota"""
+        client.get('/api/weather/test')
+        
+        assert Metrics.REQUEST_DURATION.count(route='/api/weather/test', method='GET', status='200') == 1
+        assert Metrics.REQUESTS_IN_FLIGHT.value() == 0
+    
+    def test_metrics_endpoint(self, client):
+        """Testa o endpoint /metrics"""
+        client.get('/api/weather/test')
+        
+        response = client.get('/metrics')
+        text = response.get_data(as_text=True)
+        
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        assert 'weather_http_request_duration_seconds_count{route="/api/weather/test",method="GET",status="200"} 1' in text
+        assert 'weather_cache_hit_ratio{cache="weather"}' in text
+        assert 'weather_circuit_open{provider="open-meteo-forecast"} 0' in text
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_weather_cache_hit_ratio_counts_each_request_once(self, mock_get, client):
+        """Testa a fração de acertos: cada requisição conta uma vez, mesmo consultando duas chaves"""
+        mock_get.return_value = Mock()
+        mock_get.return_value.json.return_value = {
+            'current': {'time': '2025-07-04T20:00', 'temperature_2m': 25.0},
+            'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [25.0], 'temperature_2m_min': [15.0],
+                      'weather_code': [1], 'precipitation_sum': [0.0]},
+            'hourly': {'time': ['2025-07-04T00:00'], 'temperature_2m': [18.0], 'relative_humidity_2m': [70],
+                       'wind_speed_10m': [5.0], 'weather_code': [1]}
+        }
+        
+        # Ausência, depois acerto da previsão e acerto dos dados atuais que vieram com ela
+        client.get('/api/weather/current?lat=-23.5505&lon=-46.6333')
+        client.get('/api/weather/forecast?lat=-23.5505&lon=-46.6333')
+        client.get('/api/weather/current?lat=-23.5505&lon=-46.6333')
+        
+        samples = dict((name, values) for name, _, _, values in WeatherService.collect_metrics())
+        assert dict((labels['result'], value) for labels, value in samples['weather_cache_lookups_total']) == {
+            'hit': 2, 'stale': 0, 'miss': 1
+        }
+        assert samples['weather_cache_hit_ratio'] == [({'cache': 'weather'}, 2 / 3)]
+        assert mock_get.call_count == 1
+    
+    @patch('src.models.geocoding.AsyncHttpClient.get')
+    def test_geocoding_cache_hit_ratio_counts_each_request_once(self, mock_get):
+        """Testa a fração de acertos da busca de cidades: uma ausência e um acerto"""
+        mock_get.return_value = Mock()
+        mock_get.return_value.json.return_value = {'results': [{'name': 'Curitiba', 'latitude': -25.43,
+                                                                'longitude': -49.27, 'country': 'Brasil'}]}
+        
+        GeocodingService.search_cities('Curitiba')
+        GeocodingService.search_cities('Curitiba')
+        
+        stats = GeocodingService._persistent_cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+    
+    def test_upstream_latency_and_errors(self):
+        """Testa métricas das chamadas às APIs externas por provedor"""
+        responses = [httpx.Response(503), httpx.ReadTimeout("timeout")]
+        
+        def handler(request):
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        
+        AsyncHttpClient.get_loop()
+        AsyncHttpClient._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            AsyncHttpClient.run(AsyncHttpClient.get('https://example.com', provider='nominatim-search'))
+            with pytest.raises(httpx.TimeoutException):
+                AsyncHttpClient.run(AsyncHttpClient.get('https://example.com', provider='nominatim-search'))
+        finally:
+            AsyncHttpClient.close()
+        
+        assert Metrics.UPSTREAM_DURATION.count(provider='nominatim-search') == 2
+        assert Metrics.UPSTREAM_ERRORS.value(provider='nominatim-search', reason='http_5xx') == 1
+        assert Metrics.UPSTREAM_ERRORS.value(provider='nominatim-search', reason='timeout') == 1
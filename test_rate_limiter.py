@@ -0,0 +1,93 @@
+"""
+Testes para o limitador de taxa
+"""
+import threading
+from unittest.mock import patch
+from src.models.rate_limiter import RateLimiter
+
+
+class TestRateLimiter:
+    """Testes para a classe RateLimiter"""
+    
+    @patch('src.models.rate_limiter.time.sleep')
+    @patch('src.models.rate_limiter.time.monotonic')
+    def test_spaces_requests(self, mock_monotonic, mock_sleep):
+        """Testa que as requisições são espaçadas conforme a taxa"""
+        mock_monotonic.return_value = 100.0
+        limiter = RateLimiter(rate=1.0)
+        
+        assert limiter.acquire() is True
+        assert limiter.acquire() is True
+        assert limiter.acquire() is True
+        
+        waits = [call.args[0] for call in mock_sleep.call_args_list]
+        assert waits == [1.0, 2.0]
+    
+    @patch('src.models.rate_limiter.time.sleep')
+    @patch('src.models.rate_limiter.time.monotonic')
+    def test_burst(self, mock_monotonic, mock_sleep):
+        """Testa que o burst permite requisições imediatas quando ocioso"""
+        mock_monotonic.return_value = 100.0
+        limiter = RateLimiter(rate=2.0, burst=3)
+        
+        for _ in range(3):
+            assert limiter.acquire() is True
+        mock_sleep.assert_not_called()
+        
+        limiter.acquire()
+        mock_sleep.assert_called_once_with(0.5)
+    
+    @patch('src.models.rate_limiter.time.sleep')
+    @patch('src.models.rate_limiter.time.monotonic')
+    def test_fails_fast_when_wait_exceeds_timeout(self, mock_monotonic, mock_sleep):
+        """Testa recusa imediata quando a espera passaria do timeout"""
+        mock_monotonic.return_value = 100.0
+        limiter = RateLimiter(rate=1.0)
+        
+        assert limiter.acquire(timeout=1.5) is True
+        assert limiter.acquire(timeout=1.5) is True
+        assert limiter.acquire(timeout=1.5) is False
+        
+        # A recusa não consome horário: a próxima vaga continua em 2 s
+        mock_monotonic.return_value = 101.0
+        assert limiter.acquire(timeout=1.5) is True
+        assert limiter.stats()['rejected'] == 1
+    
+    def test_queue_depth_limit(self):
+        """Testa recusa quando a fila de espera está cheia"""
+        limiter = RateLimiter(rate=1.0, max_queue=1)
+        release = threading.Event()
+        
+        def fake_sleep(seconds):
+            release.wait(5)
+        
+        with patch('src.models.rate_limiter.time.sleep', side_effect=fake_sleep):
+            limiter.acquire()
+            waiter = threading.Thread(target=limiter.acquire)
+            waiter.start()
+            
+            # Aguarda a thread entrar na fila
+            for _ in range(100):
+                if limiter.stats()['waiting'] == 1:
+                    break
+                threading.Event().wait(0.01)
+            
+            assert limiter.acquire() is False
+            release.set()
+            waiter.join()
+        
+        assert limiter.stats()['waiting'] == 0
+    
+    @patch('src.models.rate_limiter.time.sleep')
+    @patch('src.models.rate_limiter.time.time')
+    def test_shared_state_between_instances(self, mock_time, mock_sleep, tmp_path):
+        """Testa que instâncias com o mesmo arquivo dividem a taxa (como processos)"""
+        mock_time.return_value = 1000.0
+        path = str(tmp_path / 'nominatim.rate')
+        first = RateLimiter(rate=1.0, state_path=path)
+        second = RateLimiter(rate=1.0, state_path=path)
+        
+        first.acquire()
+        second.acquire()
+        
+        mock_sleep.assert_called_once_with(1.0)
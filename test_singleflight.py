@@ -0,0 +1,75 @@
+"""
+Testes para o agrupamento de chamadas em andamento
+"""
+import threading
+import time
+import pytest
+from src.models.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Testes para a classe SingleFlight"""
+    
+    def test_returns_result(self):
+        """Testa execução simples sem concorrência"""
+        flight = SingleFlight()
+        
+        assert flight.do('chave', lambda x: x * 2, 21) == 42
+        assert flight.in_flight() == 0
+    
+    def test_concurrent_calls_are_coalesced(self):
+        """Testa que chamadas concorrentes com a mesma chave executam uma vez"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return 'resultado'
+        
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('chave', slow_fetch)))
+        leader.start()
+        started.wait(timeout=5)
+        
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do('chave', slow_fetch)))
+            for _ in range(5)
+        ]
+        for thread in followers:
+            thread.start()
+        
+        # Aguardar até que todos os seguidores estejam esperando
+        while flight.shared < 5:
+            time.sleep(0.001)
+        release.set()
+        
+        for thread in [leader] + followers:
+            thread.join(timeout=5)
+        
+        assert len(calls) == 1
+        assert results == ['resultado'] * 6
+        assert flight.executions == 1
+    
+    def test_error_propagates_and_is_not_retained(self):
+        """Testa que exceções são repassadas e a chave é liberada"""
+        flight = SingleFlight()
+        
+        def failing():
+            raise ValueError("falha")
+        
+        with pytest.raises(ValueError):
+            flight.do('chave', failing)
+        
+        assert flight.do('chave', lambda: 'ok') == 'ok'
+    
+    def test_different_keys_run_separately(self):
+        """Testa que chaves diferentes não são agrupadas"""
+        flight = SingleFlight()
+        
+        assert flight.do('a', lambda: 1) == 1
+        assert flight.do('b', lambda: 2) == 2
+        assert flight.executions == 2
@@ -0,0 +1,66 @@
+"""
+Testes para o índice espacial em grade
+"""
+import pytest
+from src.models.spatial_index import GridIndex, grid_cells, haversine_km
+
+
+class TestHaversine:
+    """Testes para a função haversine_km"""
+    
+    def test_known_distance(self):
+        """Testa distância conhecida entre São Paulo e Rio de Janeiro"""
+        distance = haversine_km(-23.5505, -46.6333, -22.9068, -43.1729)
+        
+        assert 355 < distance < 365
+    
+    def test_same_point(self):
+        """Testa distância nula para o mesmo ponto"""
+        assert haversine_km(10.0, 20.0, 10.0, 20.0) == 0
+
+
+class TestGridIndex:
+    """Testes para a classe GridIndex"""
+    
+    @pytest.fixture
+    def index(self):
+        """Índice com alguns pontos, incluindo vizinhos de células diferentes"""
+        return GridIndex(
+            latitudes=[-23.5505, -22.9068, -23.4538, 0.1, 10.0],
+            longitudes=[-46.6333, -43.1729, -46.5333, 179.9, -179.99],
+            cell_size=0.5
+        )
+    
+    def test_nearest_point(self, index):
+        """Testa busca do ponto mais próximo"""
+        position, distance = index.nearest(-23.56, -46.64, max_distance_km=20)
+        
+        assert position == 0
+        assert distance < 2
+    
+    def test_nearest_across_cells(self, index):
+        """Testa busca em células vizinhas"""
+        position, _ = index.nearest(-23.49, -46.50, max_distance_km=20)
+        
+        assert position == 2
+    
+    def test_nothing_within_distance(self, index):
+        """Testa que pontos além da distância máxima são ignorados"""
+        assert index.nearest(-30.0, -20.0, max_distance_km=50) is None
+    
+    def test_antimeridian(self, index):
+        """Testa busca perto do antimeridiano"""
+        position, _ = index.nearest(0.1, -179.95, max_distance_km=30)
+        
+        assert position == 3
+    
+    def test_from_tables_matches_built_index(self, index):
+        """Testa que a grade montada em tabelas ordenadas encontra os mesmos pontos"""
+        latitudes = [-23.5505, -22.9068, -23.4538, 0.1, 10.0]
+        longitudes = [-46.6333, -43.1729, -46.5333, 179.9, -179.99]
+        tables = GridIndex.from_tables(latitudes, longitudes, *grid_cells(latitudes, longitudes, 0.5),
+                                       cell_size=0.5)
+        
+        for latitude, longitude in [(-23.56, -46.64), (-23.49, -46.50), (0.1, -179.95), (10.0, 179.99),
+                                    (-30.0, -20.0)]:
+            assert tables.nearest(latitude, longitude, 30) == index.nearest(latitude, longitude, 30)
@@ -0,0 +1,97 @@
+"""
+Testes para o aquecimento do cache e o endpoint de prontidão
+"""
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from src.models.warmup import WarmUp, parse_locations
+from src.models.weather import WeatherService
+
+
+def _batch_response(url, params=None, **kwargs):
+    """Resposta em lote da Open-Meteo com um item por coordenada"""
+    count = len(params['latitude'].split(','))
+    item = {'current': {'time': '2025-07-04T20:00', 'temperature_2m': 20.0, 'weather_code': 1}}
+    if 'daily' in params:
+        item.update({
+            'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [25.0], 'temperature_2m_min': [15.0],
+                      'weather_code': [1], 'precipitation_sum': [0.0]},
+            'hourly': {'time': ['2025-07-04T00:00'], 'temperature_2m': [18.0], 'relative_humidity_2m': [70],
+                       'wind_speed_10m': [5.0], 'weather_code': [1]}
+        })
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = [item] * count
+    return response
+
+
+@pytest.fixture(autouse=True)
+def prontidao():
+    """Restaura o estado de prontidão depois de cada teste"""
+    yield
+    WarmUp._ready.set()
+
+
+class TestWarmUp:
+    """Testes para o aquecimento do cache na inicialização"""
+    
+    def test_parse_locations(self):
+        """Testa a leitura da lista de localizações configurada"""
+        locations = parse_locations("-23.55,-46.63,São Paulo; -25.43,-49.27 ;inválida;1,x")
+        
+        assert locations == [(-23.55, -46.63, 'São Paulo'), (-25.43, -49.27, '')]
+    
+    def test_default_locations_use_builtin_cities(self):
+        """Testa que, sem configuração, as cidades embutidas são aquecidas"""
+        with patch.object(WarmUp, 'WARMUP_LOCATIONS', ''):
+            locations = WarmUp.default_locations()
+        
+        assert (-23.5505, -46.6333, 'São Paulo, SP') in locations
+    
+    @patch('src.models.weather.AsyncHttpClient.get', side_effect=_batch_response)
+    def test_run_fills_cache_in_batches(self, mock_get):
+        """Testa que o aquecimento usa requisições em lote e preenche o cache"""
+        locations = [(float(i), 10.0, f'Cidade {i}') for i in range(5)]
+        
+        with patch.object(WarmUp, 'WARMUP_CHUNK_SIZE', 2):
+            stats = WarmUp.run(locations)
+        
+        # 3 lotes de previsão, que também trazem os dados atuais
+        assert mock_get.call_count == 3
+        assert stats['warmed'] == 5 and stats['failed'] == 0 and not stats['timed_out']
+        assert WarmUp.is_ready()
+        
+        WeatherService.get_current_weather(3.0, 10.0)
+        WeatherService.get_forecast(4.0, 10.0, days=16, hour_offset=48)
+        assert mock_get.call_count == 3
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_run_respects_time_budget(self, mock_get):
+        """Testa que o processo fica pronto quando o tempo limite se esgota"""
+        release = threading.Event()
+        
+        def slow_response(url, params=None, **kwargs):
+            release.wait(5)
+            return _batch_response(url, params)
+        mock_get.side_effect = slow_response
+        
+        try:
+            with patch.object(WarmUp, 'WARMUP_TIMEOUT', 0.05):
+                stats = WarmUp.run([(1.0, 2.0, '')])
+        finally:
+            release.set()
+        
+        assert stats['timed_out'] is True
+        assert WarmUp.is_ready()
+    
+    def test_ready_endpoint(self, client):
+        """Testa 503 durante o aquecimento e 200 depois"""
+        WarmUp._ready.clear()
+        response = client.get('/ready')
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'warming'
+        
+        WarmUp._ready.set()
+        response = client.get('/ready')
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'ready'
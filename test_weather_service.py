@@ -1,12 +1,28 @@
 """
 Testes unitários para o serviço meteorológico
 """
+import asyncio
+import threading
+import time
+import httpx
 import pytest
 from unittest.mock import patch, Mock
+from src.main import app
 from src.models.weather import WeatherService, WeatherData, ForecastData
 from datetime import datetime
 
 
+def with_forecast(current):
+    """Resposta da Open-Meteo à requisição de previsão, que também traz os dados atuais"""
+    return {
+        'current': current,
+        'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [25.0], 'temperature_2m_min': [15.0],
+                  'weather_code': [1], 'precipitation_sum': [0.0]},
+        'hourly': {'time': ['2025-07-04T00:00'], 'temperature_2m': [18.0], 'relative_humidity_2m': [70],
+                   'wind_speed_10m': [5.0], 'weather_code': [1]}
+    }
+
+
 class TestWeatherService:
     """Testes para a classe WeatherService"""
     
@@ -16,21 +32,19 @@ class TestWeatherService:
         assert WeatherService.WEATHER_CODES[61] == "Chuva leve"
         assert WeatherService.WEATHER_CODES[95] == "Tempestade"
     
-    @patch('src.models.weather.requests.get')
+    @patch('src.models.weather.AsyncHttpClient.get')
     def test_get_current_weather_success(self, mock_get):
         """Testa obtenção bem-sucedida de dados meteorológicos atuais"""
         # Mock da resposta da API
         mock_response = Mock()
-        mock_response.json.return_value = {
-            'current': {
-                'time': '2025-07-04T20:00:00',
-                'temperature_2m': 25.5,
-                'relative_humidity_2m': 65,
-                'wind_speed_10m': 10.2,
-                'wind_direction_10m': 180,
-                'weather_code': 1
-            }
-        }
+        mock_response.json.return_value = with_forecast({
+            'time': '2025-07-04T20:00:00',
+            'temperature_2m': 25.5,
+            'relative_humidity_2m': 65,
+            'wind_speed_10m': 10.2,
+            'wind_direction_10m': 180,
+            'weather_code': 1
+        })
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -48,7 +62,7 @@ class TestWeatherService:
         assert result.location == "São Paulo"
         assert result.description == "Principalmente limpo"
     
-    @patch('src.models.weather.requests.get')
+    @patch('src.models.weather.AsyncHttpClient.get')
     def test_get_current_weather_api_error(self, mock_get):
         """Testa tratamento de erro da API"""
         # Mock de erro na requisição
@@ -60,7 +74,7 @@ class TestWeatherService:
         # Verificações
         assert result is None
     
-    @patch('src.models.weather.requests.get')
+    @patch('src.models.weather.AsyncHttpClient.get')
     def test_get_forecast_success(self, mock_get):
         """Testa obtenção bem-sucedida de previsão meteorológica"""
         # Mock da resposta da API
@@ -96,6 +110,532 @@ class TestWeatherService:
         assert result.daily_forecast[0]['temperature_min'] == 18.0
         assert result.hourly_forecast[0]['temperature'] == 25.0
     
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_forecast_columnar_with_nulls(self, mock_get):
+        """Testa previsão em colunas com valores nulos e mais de 24 horas"""
+        hours = 48
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'daily': {
+                'time': ['2025-07-04'],
+                'temperature_2m_max': [None],
+                'temperature_2m_min': [18.0],
+                'weather_code': [None],
+                'precipitation_sum': [0.0]
+            },
+            'hourly': {
+                'time': [f'2025-07-04T{i:02d}:00' for i in range(hours)],
+                'temperature_2m': [float(i) for i in range(hours)],
+                'relative_humidity_2m': [60] * hours,
+                'wind_speed_10m': [5.0] * hours,
+                'weather_code': [61] * hours
+            }
+        }
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        result = WeatherService.get_forecast(-23.5505, -46.6333, days=2)
+        
+        assert result.daily_forecast[0]['temperature_max'] is None
+        assert result.daily_forecast[0]['description'] == "Desconhecido"
+        assert len(result.hourly_forecast) == 24
+        assert result.hourly_forecast[23]['temperature'] == 23.0
+        assert result.hourly_forecast[0]['description'] == "Chuva leve"
+        assert len(result.to_dict()['hourly_forecast']) == 24
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_forecast_horizons_share_one_fetch(self, mock_get):
+        """Testa que dias e janelas de horas diferentes saem da mesma consulta"""
+        days, hours = 16, 16 * 24
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'daily': {
+                'time': [f'2025-07-{4 + i:02d}' for i in range(days)],
+                'temperature_2m_max': [float(i) for i in range(days)],
+                'temperature_2m_min': [0.0] * days,
+                'weather_code': [0] * days,
+                'precipitation_sum': [0.0] * days
+            },
+            'hourly': {
+                'time': [f'h{i}' for i in range(hours)],
+                'temperature_2m': [float(i) for i in range(hours)],
+                'relative_humidity_2m': [50] * hours,
+                'wind_speed_10m': [1.0] * hours,
+                'weather_code': [0] * hours
+            }
+        }
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        three = WeatherService.get_forecast(-23.5505, -46.6333, days=3)
+        fourteen = WeatherService.get_forecast(-23.5505, -46.6333, days=14, hour_offset=48, hours=6)
+        tail = WeatherService.get_forecast(-23.5505, -46.6333, hour_offset=hours - 2, hours=24)
+        
+        assert mock_get.call_count == 1
+        _, kwargs = mock_get.call_args
+        assert kwargs['params']['forecast_days'] == WeatherService.MAX_FORECAST_DAYS
+        assert len(three.daily_forecast) == 3 and len(three.hourly_forecast) == 24
+        assert len(fourteen.daily_forecast) == 14
+        assert [row['temperature'] for row in fourteen.hourly_forecast] == [48.0, 49.0, 50.0, 51.0, 52.0, 53.0]
+        assert [row['time'] for row in tail.hourly_forecast] == [f'h{hours - 2}', f'h{hours - 1}']
+        # Os recortes são visões sobre as colunas da entrada em cache
+        assert fourteen.hourly_forecast._columns is three.hourly_forecast._columns
+    
+    @staticmethod
+    def _combined_response():
+        """Resposta da Open-Meteo com previsão e dados atuais"""
+        response = Mock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = {
+            'current': {'time': '2025-07-04T20:00', 'temperature_2m': 21.0, 'wind_direction_10m': 90,
+                        'weather_code': 2},
+            'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [25.0], 'temperature_2m_min': [15.0],
+                      'weather_code': [1], 'precipitation_sum': [0.0]},
+            'hourly': {'time': ['2025-07-04T00:00'], 'temperature_2m': [18.0], 'relative_humidity_2m': [70],
+                       'wind_speed_10m': [5.0], 'weather_code': [1]}
+        }
+        return response
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_current_then_forecast_single_request(self, mock_get):
+        """Testa que /current e /forecast da mesma localização fazem uma única consulta"""
+        mock_get.return_value = self._combined_response()
+        
+        current = WeatherService.get_current_weather(-23.5505, -46.6333, "São Paulo")
+        forecast = WeatherService.get_forecast(-23.5505, -46.6333, "São Paulo")
+        
+        assert mock_get.call_count == 1
+        _, kwargs = mock_get.call_args
+        assert kwargs['params']['current'] == WeatherService.CURRENT_FIELDS
+        assert 'daily' in kwargs['params']
+        assert current.temperature == 21.0 and current.wind_direction == 90
+        assert current.latitude == -23.5505
+        assert forecast.daily_forecast[0]['temperature_max'] == 25.0
+        assert 'current' not in forecast.to_dict()
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_forecast_then_current_single_request(self, mock_get):
+        """Testa dados atuais servidos a partir da previsão em cache"""
+        mock_get.return_value = self._combined_response()
+        
+        WeatherService.get_forecast(-23.5505, -46.6333)
+        current = WeatherService.get_current_weather(-23.5505, -46.6333, "São Paulo")
+        
+        assert mock_get.call_count == 1
+        assert current.location == "São Paulo"
+        assert current.description == "Parcialmente nublado"
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_current_then_forecast_single_request_async(self, mock_get):
+        """Testa a consulta combinada nas versões assíncronas"""
+        async def fake_get(url, params=None, **kwargs):
+            return httpx.Response(200, json=self._combined_response().json(), request=httpx.Request('GET', url))
+        mock_get.side_effect = fake_get
+        
+        async def run():
+            current = await WeatherService.get_current_weather_async(-23.5505, -46.6333)
+            forecast = await WeatherService.get_forecast_async(-23.5505, -46.6333)
+            return current, forecast
+        
+        current, forecast = asyncio.run(run())
+        
+        assert mock_get.call_count == 1
+        assert current.temperature == 21.0
+        assert len(forecast.daily_forecast) == 1
+    
+    def test_concurrent_current_and_forecast_routes_single_request(self):
+        """Testa que /current e /forecast pedidos juntos (como faz a página) geram uma única consulta"""
+        calls = []
+        
+        def slow_get(url, params=None, **kwargs):
+            calls.append(params)
+            time.sleep(0.1)
+            return httpx.Response(200, json=self._combined_response().json(), request=httpx.Request('GET', url))
+        
+        async def slow_get_async(url, params=None, **kwargs):
+            return await asyncio.to_thread(slow_get, url, params)
+        
+        responses = {}
+        def request(path):
+            responses[path] = app.test_client().get(f'/api/weather/{path}?lat=-23.5505&lon=-46.6333')
+        
+        with patch('src.models.weather.AsyncHttpClient.get', side_effect=slow_get), \
+                patch('src.models.weather.AsyncHttpClient.get', side_effect=slow_get_async):
+            threads = [threading.Thread(target=request, args=(path,)) for path in ('current', 'forecast')]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+            
+            # Com os dados atuais expirados, /current usa a previsão em cache sem nova consulta
+            WeatherService._cache.delete(WeatherService._cache_key('current', -23.5505, -46.6333))
+            assert WeatherService.get_current_weather(-23.5505, -46.6333).temperature == 21.0
+        
+        assert len(calls) == 1
+        assert 'daily' in calls[0]
+        assert responses['current'].status_code == responses['forecast'].status_code == 200
+        assert responses['current'].get_json()['data']['temperature'] == 21.0
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_route_cache_hit_stays_on_request_thread(self, mock_get):
+        """Testa que as rotas respondem o cache sem passar pelo event loop compartilhado"""
+        mock_get.return_value = self._combined_response()
+        WeatherService.get_forecast(-23.5505, -46.6333)
+        
+        with patch('src.models.weather.AsyncHttpClient.run') as mock_run:
+            current = app.test_client().get('/api/weather/current?lat=-23.5505&lon=-46.6333')
+            forecast = app.test_client().get('/api/weather/forecast?lat=-23.5505&lon=-46.6333&days=1')
+        
+        mock_run.assert_not_called()
+        assert current.status_code == forecast.status_code == 200
+        assert current.get_json()['data']['temperature'] == 21.0
+        assert mock_get.call_count == 1
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_current_without_forecast_option(self, mock_get):
+        """Testa a consulta só dos dados atuais quando a opção está desligada"""
+        mock_get.return_value = self._combined_response()
+        
+        with patch.object(WeatherService, 'CURRENT_FROM_FORECAST', False):
+            WeatherService.get_current_weather(-23.5505, -46.6333)
+            WeatherService.get_forecast(-23.5505, -46.6333)
+        
+        assert mock_get.call_count == 2
+        assert 'daily' not in mock_get.call_args_list[0].kwargs['params']
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_uses_cache(self, mock_get):
+        """Testa que consultas repetidas são atendidas pelo cache"""
+        mock_response = Mock()
+        mock_response.json.return_value = with_forecast({
+            'time': '2025-07-04T20:00:00',
+            'temperature_2m': 25.5,
+            'relative_humidity_2m': 65,
+            'wind_speed_10m': 10.2,
+            'wind_direction_10m': 180,
+            'weather_code': 1
+        })
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        first = WeatherService.get_current_weather(-23.5505, -46.6333, "São Paulo")
+        second = WeatherService.get_current_weather(-23.5505, -46.6333, "Sampa")
+        
+        assert mock_get.call_count == 1
+        assert first.temperature == second.temperature == 25.5
+        assert second.location == "Sampa"
+        assert WeatherService.cache_stats()['hits'] == 1
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_error_not_cached(self, mock_get):
+        """Testa que falhas na API não são armazenadas no cache"""
+        mock_get.side_effect = Exception("Erro de conexão")
+        
+        WeatherService.get_current_weather(-23.5505, -46.6333)
+        WeatherService.get_current_weather(-23.5505, -46.6333)
+        
+        assert mock_get.call_count == 2
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_concurrent_requests_coalesced(self, mock_get):
+        """Testa que requisições simultâneas para a mesma coordenada geram uma chamada"""
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = with_forecast({'temperature_2m': 21.0})
+            return response
+        mock_get.side_effect = slow_get
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                WeatherService.get_current_weather(-23.5505, -46.6333)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        
+        assert mock_get.call_count == 1
+        assert [r.temperature for r in results] == [21.0] * 8
+    
+    @patch('src.models.cache.time.monotonic')
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_stale_while_revalidate(self, mock_get, mock_monotonic):
+        """Testa que dados expirados são servidos enquanto a atualização roda em segundo plano"""
+        temperatures = iter([20.0, 22.0])
+        
+        def fake_get(*args, **kwargs):
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = with_forecast({'temperature_2m': next(temperatures)})
+            return response
+        mock_get.side_effect = fake_get
+        
+        mock_monotonic.return_value = 1000.0
+        first = WeatherService.get_current_weather(-23.5505, -46.6333)
+        assert first.temperature == 20.0
+        assert first.stale is False
+        
+        # Após expirar, o valor antigo é devolvido imediatamente
+        mock_monotonic.return_value = 1000.0 + WeatherService.FORECAST_CACHE_TTL + 5
+        stale = WeatherService.get_current_weather(-23.5505, -46.6333)
+        assert stale.temperature == 20.0
+        assert stale.stale is True
+        assert stale.age == WeatherService.FORECAST_CACHE_TTL + 5
+        
+        deadline = time.time() + 5
+        while WeatherService._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+        
+        refreshed = WeatherService.get_current_weather(-23.5505, -46.6333)
+        assert mock_get.call_count == 2
+        assert refreshed.temperature == 22.0
+        assert refreshed.stale is False
+    
+    @patch('src.models.cache.time.monotonic')
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_current_from_forecast_respects_current_ttl(self, mock_get, mock_monotonic):
+        """Testa que a previsão ainda fresca não serve como frescos dados atuais além de CURRENT_CACHE_TTL"""
+        temperatures = iter([20.0, 22.0, 24.0])
+        
+        def fake_get(*args, **kwargs):
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = with_forecast({'temperature_2m': next(temperatures)})
+            return response
+        mock_get.side_effect = fake_get
+        
+        mock_monotonic.return_value = 1000.0
+        WeatherService.get_forecast(-23.5505, -46.6333)
+        
+        # Previsão dentro do prazo, dados atuais fora: servidos como desatualizados enquanto a previsão é atualizada
+        mock_monotonic.return_value = 1000.0 + WeatherService.CURRENT_CACHE_TTL + 5
+        stale = WeatherService.get_current_weather(-23.5505, -46.6333)
+        assert stale.temperature == 20.0
+        assert stale.stale is True
+        assert stale.age == WeatherService.CURRENT_CACHE_TTL + 5
+        
+        deadline = time.time() + 5
+        while WeatherService._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+        
+        refreshed = WeatherService.get_current_weather(-23.5505, -46.6333)
+        assert refreshed.temperature == 22.0
+        assert refreshed.stale is False
+        assert mock_get.call_count == 2
+        
+        # Além de CURRENT_CACHE_TTL + STALE_MAX_AGE, a consulta é refeita antes de responder
+        WeatherService._cache.delete(WeatherService._cache_key('current', -23.5505, -46.6333))
+        mock_monotonic.return_value += WeatherService.CURRENT_CACHE_TTL + WeatherService.STALE_MAX_AGE
+        refetched = WeatherService.get_current_weather(-23.5505, -46.6333)
+        assert refetched.temperature == 24.0
+        assert refetched.stale is False
+        assert refetched.age == 0
+        assert mock_get.call_count == 3
+    
+    @patch('src.models.cache.time.monotonic')
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_too_old_is_refetched(self, mock_get, mock_monotonic):
+        """Testa que dados mais antigos que STALE_MAX_AGE não são servidos"""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = with_forecast({'temperature_2m': 20.0})
+        mock_get.return_value = mock_response
+        
+        mock_monotonic.return_value = 1000.0
+        WeatherService.get_current_weather(-23.5505, -46.6333)
+        
+        mock_monotonic.return_value = 1000.0 + WeatherService.FORECAST_CACHE_TTL + WeatherService.STALE_MAX_AGE
+        result = WeatherService.get_current_weather(-23.5505, -46.6333)
+        
+        assert mock_get.call_count == 2
+        assert result.stale is False
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_batch(self, mock_get):
+        """Testa consulta em lote com uma única requisição e ordem preservada"""
+        mock_response = Mock()
+        mock_response.json.return_value = [
+            {'current': {'time': '2025-07-04T20:00', 'temperature_2m': 25.0, 'weather_code': 1}},
+            {'current': {'time': '2025-07-04T20:00', 'temperature_2m': 18.0, 'weather_code': 3}}
+        ]
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        results = WeatherService.get_current_weather_batch([
+            (-23.5505, -46.6333, "São Paulo"),
+            (-25.4284, -49.2733, "Curitiba"),
+            (-23.5505, -46.6333, "Sampa")
+        ])
+        
+        assert mock_get.call_count == 1
+        _, kwargs = mock_get.call_args
+        assert kwargs['params']['latitude'] == '-23.55,-25.43'
+        assert [r.location for r in results] == ["São Paulo", "Curitiba", "Sampa"]
+        assert [r.temperature for r in results] == [25.0, 18.0, 25.0]
+        assert results[1].description == "Nublado"
+        
+        # Segunda consulta deve ser atendida pelo cache
+        WeatherService.get_current_weather(-25.4284, -49.2733)
+        assert mock_get.call_count == 1
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_batch_chunks(self, mock_get):
+        """Testa divisão das coordenadas em várias requisições"""
+        def fake_get(url, params=None, **kwargs):
+            count = len(params['latitude'].split(','))
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = [
+                {'current': {'temperature_2m': float(i)}} for i in range(count)
+            ]
+            return response
+        mock_get.side_effect = fake_get
+        
+        locations = [(float(i), 0.0) for i in range(5)]
+        with patch.object(WeatherService, 'BATCH_CHUNK_SIZE', 2):
+            results = WeatherService.get_current_weather_batch(locations)
+        
+        assert mock_get.call_count == 3
+        assert all(r is not None for r in results)
+        assert [r.latitude for r in results] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_batch_error(self, mock_get):
+        """Testa lote com falha na API"""
+        mock_get.side_effect = Exception("Erro de conexão")
+        
+        results = WeatherService.get_current_weather_batch([(1.0, 2.0), (3.0, 4.0)])
+        
+        assert results == [None, None]
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_nearby_coordinates_share_tile(self, mock_get):
+        """Testa que coordenadas próximas usam a mesma consulta e mantêm as coordenadas pedidas"""
+        mock_response = Mock()
+        mock_response.json.return_value = with_forecast({'temperature_2m': 22.0, 'weather_code': 0})
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        first = WeatherService.get_current_weather(-23.55052, -46.63331)
+        second = WeatherService.get_current_weather(-23.54710, -46.62990)
+        
+        assert mock_get.call_count == 1
+        _, kwargs = mock_get.call_args
+        assert (kwargs['params']['latitude'], kwargs['params']['longitude']) == (-23.55, -46.63)
+        assert (first.latitude, first.longitude) == (-23.55052, -46.63331)
+        assert (second.latitude, second.longitude) == (-23.5471, -46.6299)
+        assert second.location == "-23.5471, -46.6299"
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_coordinate_grid_configurable(self, mock_get):
+        """Testa grade mais larga e a desativação do arredondamento"""
+        mock_get.side_effect = Exception("Erro de conexão")
+        
+        with patch.object(WeatherService, 'COORDINATE_GRID', 0.25):
+            assert WeatherService._cache_key('current', -23.5505, -46.6333) == ('current', -23.5, -46.75)
+        with patch.object(WeatherService, 'COORDINATE_GRID', 0):
+            WeatherService.get_forecast(-23.5505, -46.6333, days=3)
+        
+        _, kwargs = mock_get.call_args
+        assert (kwargs['params']['latitude'], kwargs['params']['longitude']) == (-23.5505, -46.6333)
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_forecast_batch(self, mock_get):
+        """Testa previsão em lote com uma única requisição e cache por localização"""
+        def forecast(temperature):
+            return {
+                'daily': {'time': ['2025-07-04'], 'temperature_2m_max': [temperature],
+                          'temperature_2m_min': [10.0], 'weather_code': [1], 'precipitation_sum': [0.0]},
+                'hourly': {'time': ['2025-07-04T00:00'], 'temperature_2m': [15.0],
+                           'relative_humidity_2m': [80], 'wind_speed_10m': [5.0], 'weather_code': [1]}
+            }
+        mock_response = Mock()
+        mock_response.json.return_value = [forecast(25.0), forecast(18.0)]
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        results = WeatherService.get_forecast_batch([(-23.5505, -46.6333, "São Paulo"), (-25.4284, -49.2733)], 1)
+        
+        assert mock_get.call_count == 1
+        _, kwargs = mock_get.call_args
+        assert kwargs['params']['longitude'] == '-46.63,-49.27'
+        assert kwargs['params']['forecast_days'] == WeatherService.MAX_FORECAST_DAYS
+        assert [r.location for r in results] == ["São Paulo", "-25.4284, -49.2733"]
+        assert [r.daily_forecast[0]['temperature_max'] for r in results] == [25.0, 18.0]
+        
+        # A previsão individual da mesma localização vem do cache
+        WeatherService.get_forecast(-25.4284, -49.2733, days=1)
+        assert mock_get.call_count == 1
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_current_weather_async_success(self, mock_get):
+        """Testa obtenção assíncrona de dados meteorológicos atuais"""
+        mock_response = Mock()
+        mock_response.json.return_value = with_forecast(
+            {'time': '2025-07-04T20:00', 'temperature_2m': 19.5, 'weather_code': 3}
+        )
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        result = asyncio.run(WeatherService.get_current_weather_async(-25.4284, -49.2733, "Curitiba"))
+        
+        assert result.location == "Curitiba"
+        assert result.temperature == 19.5
+        assert result.description == "Nublado"
+        
+        # O cache é compartilhado com a API síncrona
+        assert WeatherService.get_current_weather(-25.4284, -49.2733).temperature == 19.5
+        assert mock_get.call_count == 1
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_get_forecast_async_error(self, mock_get):
+        """Testa tratamento de erro na previsão assíncrona"""
+        mock_get.side_effect = httpx.ConnectError("Erro de conexão")
+        
+        result = asyncio.run(WeatherService.get_forecast_async(-25.4284, -49.2733, "Curitiba", 3))
+        
+        assert result is None
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_circuit_opens_and_serves_last_good(self, mock_get):
+        """Testa que o disjuntor aberto evita a API e serve o último dado válido"""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = with_forecast({'temperature_2m': 21.0})
+        mock_get.return_value = mock_response
+        WeatherService.get_current_weather(-23.5505, -46.6333)
+        WeatherService._cache.clear()
+        
+        mock_get.reset_mock()
+        mock_get.side_effect = Exception("Timeout")
+        with patch.object(WeatherService._circuit, 'failure_threshold', 2):
+            for _ in range(2):
+                WeatherService.get_current_weather(1.0, 2.0)
+            
+            result = WeatherService.get_current_weather(-23.5505, -46.6333, "São Paulo")
+        
+        assert mock_get.call_count == 2
+        assert WeatherService.circuit_stats()['state'] == 'open'
+        assert result.temperature == 21.0
+        assert result.location == "São Paulo"
+        assert result.degraded is True
+        assert result.to_dict()['stale'] is True
+    
+    @patch('src.models.weather.AsyncHttpClient.get')
+    def test_circuit_open_without_last_good(self, mock_get):
+        """Testa disjuntor aberto sem dado anterior para a localização"""
+        mock_get.side_effect = Exception("Timeout")
+        with patch.object(WeatherService._circuit, 'failure_threshold', 1):
+            WeatherService.get_current_weather(1.0, 2.0)
+            assert WeatherService.get_forecast(1.0, 2.0) is None
+            assert WeatherService.get_current_weather_batch([(3.0, 4.0)]) == [None]
+        
+        assert mock_get.call_count == 1
+    
     def test_weather_data_to_dict(self):
         """Testa conversão de WeatherData para dicionário"""
         weather_data = WeatherData(
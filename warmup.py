@@ -0,0 +1,160 @@
+"""
+Aquecimento do cache na inicialização e verificação de prontidão (/ready)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import Flask, jsonify
+
+from src.models.geocoding import GeocodingService
+from src.routes.weather import WeatherService
+
+
+def parse_locations(value: str) -> List[Tuple]:
+    """
+    Interpreta uma lista de localizações no formato "lat,lon[,nome];lat,lon[,nome]"
+
+    Args:
+        value: Texto com as localizações
+
+    Returns:
+        Lista de tuplas (latitude, longitude, nome)
+    """
+    locations = []
+    for item in value.split(';'):
+        parts = [part.strip() for part in item.split(',', 2)]
+        if len(parts) < 2 or not parts[0]:
+            continue
+        try:
+            locations.append((float(parts[0]), float(parts[1]), parts[2] if len(parts) > 2 else ''))
+        except ValueError:
+            print(f"Localização inválida para aquecimento: {item!r}")
+    return locations
+
+
+class WarmUp:
+    """
+    Pré-carrega dados atuais e previsões das cidades mais consultadas
+
+    Cada previsão aquecida atende qualquer número de dias e janela de horas
+    e traz também os dados atuais da localização.
+
+    O aquecimento roda em segundo plano ao iniciar o aplicativo, com
+    requisições em lote e número limitado de requisições simultâneas.
+    /ready responde 503 até o aquecimento terminar ou o tempo limite
+    (WARMUP_TIMEOUT) se esgotar, para que o balanceador só envie tráfego a
+    processos com o cache quente.
+    """
+
+    # Desativado por padrão; WARMUP_ENABLED=1 liga
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', '0').lower() in ('1', 'true', 'yes')
+    # Localizações "lat,lon[,nome];..." (padrão: tabela de cidades embutida)
+    WARMUP_LOCATIONS = os.environ.get('WARMUP_LOCATIONS', '')
+    # Tempo máximo, em segundos, antes de declarar o processo pronto mesmo com o cache incompleto
+    WARMUP_TIMEOUT = float(os.environ.get('WARMUP_TIMEOUT', '20'))
+    WARMUP_CONCURRENCY = 4
+    WARMUP_CHUNK_SIZE = 20
+
+    _ready = threading.Event()
+    _thread: Optional[threading.Thread] = None
+    _stats: Dict = {}
+
+    @classmethod
+    def init_app(cls, app: Flask, locations: Optional[Sequence[Tuple]] = None) -> None:
+        """
+        Registra /ready e inicia o aquecimento (se ativado)
+
+        Args:
+            app: Aplicativo Flask
+            locations: Localizações a aquecer (padrão: WARMUP_LOCATIONS ou a tabela embutida)
+        """
+        app.add_url_rule('/ready', 'ready', cls.ready_view)
+        if not cls.WARMUP_ENABLED:
+            cls._stats = {'enabled': False}
+            cls._ready.set()
+            return
+        cls.start(locations)
+
+    @classmethod
+    def default_locations(cls) -> List[Tuple]:
+        """Localizações configuradas ou, sem configuração, as cidades embutidas"""
+        if cls.WARMUP_LOCATIONS:
+            return parse_locations(cls.WARMUP_LOCATIONS)
+        return [(city.latitude, city.longitude, city.name) for city in GeocodingService.BRAZILIAN_CITIES.values()]
+
+    @classmethod
+    def start(cls, locations: Optional[Sequence[Tuple]] = None) -> threading.Thread:
+        """Inicia o aquecimento em segundo plano"""
+        cls._ready.clear()
+        cls._thread = threading.Thread(target=cls.run, args=(locations,), name='weather-warmup', daemon=True)
+        cls._thread.start()
+        return cls._thread
+
+    @classmethod
+    def run(cls, locations: Optional[Sequence[Tuple]] = None) -> Dict:
+        """
+        Executa o aquecimento e marca o processo como pronto ao final
+
+        Args:
+            locations: Localizações a aquecer (padrão: default_locations())
+
+        Returns:
+            Estatísticas do aquecimento
+        """
+        try:
+            cls._stats = cls._warm(cls.default_locations() if locations is None else list(locations))
+            print(f"Aquecimento do cache concluído: {cls._stats}")
+        except Exception as e:
+            print(f"Erro no aquecimento do cache: {e}")
+            cls._stats = {'enabled': True, 'error': str(e)}
+        finally:
+            # Um aquecimento com erro não pode deixar o processo fora do balanceador
+            cls._ready.set()
+        return cls._stats
+
+    @classmethod
+    def _warm(cls, locations: List[Tuple]) -> Dict:
+        """Consulta os lotes de localizações dentro do tempo limite"""
+        start = time.monotonic()
+
+        chunks = [locations[i:i + cls.WARMUP_CHUNK_SIZE] for i in range(0, len(locations), cls.WARMUP_CHUNK_SIZE)]
+        executor = ThreadPoolExecutor(max_workers=cls.WARMUP_CONCURRENCY, thread_name_prefix='weather-warmup')
+        try:
+            futures = {}
+            for chunk in chunks:
+                # A previsão em lote também traz e guarda as condições atuais
+                futures[executor.submit(WeatherService.get_forecast_batch, chunk)] = len(chunk)
+            done, pending = wait(futures, timeout=cls.WARMUP_TIMEOUT)
+        finally:
+            # Lotes ainda não iniciados são descartados; os em andamento terminam sozinhos
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        warmed = failed = 0
+        for future in done:
+            results = future.result() if future.exception() is None else [None] * futures[future]
+            warmed += sum(1 for item in results if item is not None)
+            failed += sum(1 for item in results if item is None)
+
+        return {
+            'enabled': True,
+            'locations': len(locations),
+            # Localizações carregadas ou com erro
+            'warmed': warmed,
+            'failed': failed,
+            'timed_out': bool(pending),
+            'duration': round(time.monotonic() - start, 3)
+        }
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._ready.is_set()
+
+    @classmethod
+    def ready_view(cls):
+        """Endpoint de prontidão: 200 quando o aquecimento terminou, 503 durante"""
+        if not cls.is_ready():
+            return jsonify({'status': 'warming'}), 503
+        return jsonify(dict(cls._stats, status='ready'))